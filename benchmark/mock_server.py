@@ -0,0 +1,197 @@
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+from zenlog import log
+
+from client.HttpRecorder import load_fixtures, make_exchange_key
+from client.RateLimiter import RateLimit, TokenBucket
+
+INJECTED_ERROR_STATUS = 503
+THROTTLED_STATUS = 429
+
+EndpointBehavior = namedtuple('EndpointBehavior', ['pattern', 'latency', 'jitter', 'error_rate', 'rate_limit'])
+MockServerStatistics = namedtuple('MockServerStatistics', [
+	'replayed_count', 'missing_count', 'injected_error_count', 'throttled_count'
+])
+
+
+def parse_endpoint_behavior(descriptor, pattern=None):
+	"""Parses the behavior (latency and jitter in seconds, error rate, rate limit) of the endpoints matching pattern."""
+
+	requests_per_minute = descriptor.get('requests_per_minute')
+	return EndpointBehavior(
+		re.compile(pattern or descriptor.get('pattern', '')),
+		float(descriptor.get('latency', 0)),
+		float(descriptor.get('jitter', 0)),
+		float(descriptor.get('error_rate', 0)),
+		RateLimit(float(requests_per_minute), int(descriptor.get('burst', 1))) if requests_per_minute else None)
+
+
+def load_endpoint_behaviors(descriptor):
+	"""Loads endpoint behaviors from a descriptor with (optional) 'endpoints' and 'default' entries; the first matching endpoint applies."""
+
+	descriptor = descriptor or {}
+	endpoint_behaviors = [parse_endpoint_behavior(endpoint_descriptor) for endpoint_descriptor in descriptor.get('endpoints', [])]
+	endpoint_behaviors.append(parse_endpoint_behavior(descriptor.get('default', {}), ''))
+	return endpoint_behaviors
+
+
+def _make_any_host_key(key):
+	(method, _, path, body) = key
+	return (method, path, body)
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+	protocol_version = 'HTTP/1.1'
+
+	def do_GET(self):
+		# pylint: disable=invalid-name
+		self.server.handle_exchange(self, None)
+
+	def do_POST(self):
+		# pylint: disable=invalid-name
+		content_length = int(self.headers.get('Content-Length', 0))
+		self.server.handle_exchange(self, self.rfile.read(content_length).decode('utf8') if content_length else None)
+
+	def send_content(self, status, content_type, content, headers=None):
+		self.send_response(status)
+		self.send_header('Content-Type', content_type or 'application/json')
+		self.send_header('Content-Length', str(len(content)))
+		for (name, value) in (headers or {}).items():
+			self.send_header(name, value)
+
+		self.end_headers()
+		self.wfile.write(content)
+
+	def log_message(self, format, *args):
+		# pylint: disable=redefined-builtin
+		log.debug(f'{self.address_string()} {format % args}')
+
+
+class MockNodeServer(ThreadingHTTPServer):
+	"""
+	HTTP server replaying the responses recorded in a fixture archive, for the hosts named in the Host headers of requests.
+	Responses recorded for the same request are replayed in order, repeating the last one.
+	Requests for hosts without recorded responses are answered with the ones recorded for any other host, because tools pick nodes at random.
+	Each endpoint can be configured to respond with some latency (and jitter), fail with some probability and be rate limited per host.
+	"""
+
+	daemon_threads = True
+
+	def __init__(self, server_address, fixtures, endpoint_behaviors, seed=None):
+		super().__init__(server_address, MockRequestHandler)
+		self.key_to_responses_map = {key: list(responses) for (key, responses) in fixtures.items()}
+		self.any_host_key_to_responses_map = {}
+		for (key, responses) in fixtures.items():
+			self.any_host_key_to_responses_map.setdefault(_make_any_host_key(key), []).extend(responses)
+		self.endpoint_behaviors = endpoint_behaviors
+		self.random = random.Random(seed)
+
+		self.lock = threading.Lock()
+		self.bucket_map = {}
+		self.replayed_count = 0
+		self.missing_count = 0
+		self.injected_error_count = 0
+		self.throttled_count = 0
+
+	@property
+	def statistics(self):
+		with self.lock:
+			return MockServerStatistics(self.replayed_count, self.missing_count, self.injected_error_count, self.throttled_count)
+
+	def handle_exchange(self, handler, body):
+		"""Responds to the request being handled by handler, with body, as configured by the first endpoint behavior matching it."""
+
+		host = handler.headers.get('Host', '')
+		(behavior_index, behavior) = next(
+			(index, behavior) for (index, behavior) in enumerate(self.endpoint_behaviors) if behavior.pattern.search(handler.path))
+
+		with self.lock:
+			jitter = self.random.uniform(-behavior.jitter, behavior.jitter) if behavior.jitter else 0
+			is_injected_error = behavior.error_rate and self.random.random() < behavior.error_rate
+
+		time.sleep(max(0, behavior.latency + jitter))
+
+		if behavior.rate_limit:
+			wait_time = self._get_bucket(host, behavior_index, behavior.rate_limit).try_take()
+			if wait_time:
+				self._count('throttled_count')
+				handler.send_content(THROTTLED_STATUS, None, b'{}', {'Retry-After': str(math.ceil(wait_time))})
+				return
+
+		if is_injected_error:
+			self._count('injected_error_count')
+			handler.send_content(INJECTED_ERROR_STATUS, None, b'{}')
+			return
+
+		key = make_exchange_key(handler.command, host, handler.path, body)
+		with self.lock:
+			responses = self.key_to_responses_map.get(key) or self.any_host_key_to_responses_map.get(_make_any_host_key(key))
+			response = (responses.pop(0) if len(responses) > 1 else responses[0]) if responses else None
+
+		if not response:
+			self._count('missing_count')
+			log.warning(f'no recorded response for {handler.command} {host}{handler.path}')
+			content = json.dumps({'code': 'ResourceNotFound', 'message': f'no recorded response for {handler.path}'}).encode('utf8')
+			handler.send_content(404, None, content)
+			return
+
+		self._count('replayed_count')
+		handler.send_content(*response)
+
+	def _get_bucket(self, host, behavior_index, rate_limit):
+		with self.lock:
+			bucket = self.bucket_map.get((host, behavior_index))
+			if not bucket:
+				bucket = TokenBucket(rate_limit)
+				self.bucket_map[(host, behavior_index)] = bucket
+
+			return bucket
+
+	def _count(self, name):
+		with self.lock:
+			setattr(self, name, getattr(self, name) + 1)
+
+
+def create_mock_server(fixtures_filepath, config, port=0, seed=None):
+	"""Creates a mock server listening on localhost that replays the fixture archive at fixtures_filepath as configured by config."""
+
+	return MockNodeServer(('127.0.0.1', port), load_fixtures(fixtures_filepath), load_endpoint_behaviors(config), seed)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='replays recorded http exchanges with configurable latency, errors and rate limits')
+	parser.add_argument('--fixtures', help='fixture archive recorded with --http-record', required=True)
+	parser.add_argument('--config', help='(optional) yaml file with per endpoint latency, jitter, error rate and rate limits')
+	parser.add_argument('--port', help='listening port', type=int, default=3000)
+	parser.add_argument('--seed', help='(optional) seed of random jitter and errors', type=int)
+	args = parser.parse_args()
+
+	config = None
+	if args.config:
+		with open(args.config, 'rt', encoding='utf8') as infile:
+			config = yaml.load(infile, Loader=yaml.SafeLoader)
+
+	server = create_mock_server(args.fixtures, config, args.port, args.seed)
+	log.info(f'replaying {len(server.key_to_responses_map)} recorded requests on port {server.server_address[1]}')
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+
+	statistics = server.statistics
+	log.info(
+		f'replayed {statistics.replayed_count} responses; {statistics.missing_count} requests were not recorded,'
+		f' {statistics.injected_error_count} failed and {statistics.throttled_count} were throttled')
+
+
+if '__main__' == __name__:
+	main()
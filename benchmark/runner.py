@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import yaml
+from zenlog import log
+
+from .mock_server import create_mock_server
+
+MODES = ('record', 'replay')
+
+
+class BenchmarkResult:
+	def __init__(self, name, run):
+		self.name = name
+		self.run = run
+		self.exit_code = None
+		self.wall_time = 0
+		self.peak_memory = 0
+		self.request_count = 0
+		self.retry_count = 0
+		self.bytes_received = 0
+		self.missing_count = 0
+
+	def to_json(self):
+		return {
+			'name': self.name,
+			'run': self.run,
+			'exitCode': self.exit_code,
+			'wallTime': self.wall_time,
+			'peakMemory': self.peak_memory,
+			'requests': self.request_count,
+			'retries': self.retry_count,
+			'bytesReceived': self.bytes_received,
+			'missingFixtures': self.missing_count
+		}
+
+
+class BenchmarkRunner:
+	"""
+	Runs tools (as child processes) against live nodes while recording their http exchanges, or against mock servers replaying them.
+	Wall time, requests issued (from http metrics) and peak memory are measured for every run.
+	"""
+
+	def __init__(self, config, fixtures_directory, mode, work_directory):
+		self.config = config
+		self.fixtures_directory = Path(fixtures_directory)
+		self.mode = mode
+		self.work_directory = Path(work_directory)
+
+	def run(self, descriptor, run):
+		"""Runs the benchmark described by descriptor once."""
+
+		name = descriptor['name']
+		run_directory = self.work_directory / f'{name}.{run}'
+		run_directory.mkdir(parents=True, exist_ok=True)
+
+		metrics_filepath = run_directory / 'http_metrics.json'
+		fixtures_filepath = self.fixtures_directory / f'{name}.jsonl.gz'
+		command = [sys.executable, '-m', descriptor['module']]
+		command += [str(arg).format(output=run_directory) for arg in descriptor.get('args', [])]
+		command += ['--http-metrics', str(metrics_filepath)]
+
+		server = None
+		if 'record' == self.mode:
+			self.fixtures_directory.mkdir(parents=True, exist_ok=True)
+			command += ['--http-record', str(fixtures_filepath)]
+		else:
+			server = create_mock_server(fixtures_filepath, descriptor.get('server', self.config.get('server')), seed=run)
+			threading.Thread(target=server.serve_forever, daemon=True).start()
+			command += ['--http-replay', f'http://127.0.0.1:{server.server_address[1]}']
+
+		result = BenchmarkResult(name, run)
+		log.info(f'running {name} ({self.mode} {run})')
+		try:
+			with open(run_directory / 'output.log', 'wb') as log_file:
+				start_time = time.monotonic()
+				process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)  # pylint: disable=consider-using-with
+
+				# rusage of the waited process, unlike of all children, gives the peak memory of this run only (ru_maxrss is in KiB on linux)
+				(_, status, rusage) = os.wait4(process.pid, 0)
+				result.wall_time = time.monotonic() - start_time
+				result.exit_code = os.waitstatus_to_exitcode(status)
+				result.peak_memory = rusage.ru_maxrss * 1024
+		finally:
+			if server:
+				server.shutdown()
+				server.server_close()
+				result.missing_count = server.statistics.missing_count
+
+		_add_http_metrics(result, metrics_filepath)
+		log.info(
+			f'{name} ({self.mode} {run}) exited with {result.exit_code} after {result.wall_time:.2f}s:'
+			f' {result.request_count} requests, {result.retry_count} retries, {result.bytes_received} bytes received,'
+			f' {result.peak_memory / 1024 / 1024:.1f} MiB peak memory')
+		if result.missing_count:
+			log.warning(f'{name} made {result.missing_count} requests without recorded responses')
+
+		return result
+
+
+def _add_http_metrics(result, metrics_filepath):
+	# metrics are only written when the tool exits normally (or with an exception), not when it is killed
+	if not metrics_filepath.exists():
+		return
+
+	with open(metrics_filepath, 'rt', encoding='utf8') as infile:
+		for json_metrics in json.load(infile):
+			result.request_count += json_metrics['requests']
+			result.retry_count += json_metrics['retries']
+			result.bytes_received += json_metrics['bytesReceived']
+
+
+def _run_all(runner, descriptors, repeat):
+	# recording more than once would only overwrite the fixture archive
+	return [runner.run(descriptor, run) for descriptor in descriptors for run in range(1 if 'record' == runner.mode else repeat)]
+
+
+def main():
+	parser = argparse.ArgumentParser(description='measures wall time, requests issued and peak memory of tools against recorded traffic')
+	parser.add_argument('--config', help='yaml file describing benchmarks and mock server behavior', required=True)
+	parser.add_argument('--fixtures', help='directory containing fixture archives', required=True)
+	parser.add_argument('--mode', help='record live traffic or replay it', choices=MODES, default='replay')
+	parser.add_argument('--output', help='(optional) file to which results are written as json')
+	parser.add_argument('--names', help='(optional) names of benchmarks to run', nargs='+')
+	parser.add_argument('--repeat', help='number of runs of each benchmark', type=int, default=1)
+	parser.add_argument('--work-directory', help='(optional) directory in which tool outputs and logs are kept (temporary by default)')
+	args = parser.parse_args()
+
+	with open(args.config, 'rt', encoding='utf8') as infile:
+		config = yaml.load(infile, Loader=yaml.SafeLoader)
+
+	descriptors = [descriptor for descriptor in config['benchmarks'] if not args.names or descriptor['name'] in args.names]
+	if args.work_directory:
+		results = _run_all(BenchmarkRunner(config, args.fixtures, args.mode, args.work_directory), descriptors, args.repeat)
+	else:
+		with tempfile.TemporaryDirectory() as work_directory:
+			results = _run_all(BenchmarkRunner(config, args.fixtures, args.mode, work_directory), descriptors, args.repeat)
+
+	if args.output:
+		with open(args.output, 'wt', encoding='utf8') as outfile:
+			json.dump([result.to_json() for result in results], outfile, indent=2)
+
+
+if '__main__' == __name__:
+	main()
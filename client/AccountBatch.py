@@ -0,0 +1,26 @@
+from zenlog import log
+
+MAX_ACCOUNTS_PER_BATCH_REQUEST = 100
+
+
+def split_account_batches(addresses):
+	"""Splits addresses into batches no larger than the maximum number of accounts accepted by a single batch request."""
+
+	addresses = [str(address) for address in addresses]
+	return [addresses[i:i + MAX_ACCOUNTS_PER_BATCH_REQUEST] for i in range(0, len(addresses), MAX_ACCOUNTS_PER_BATCH_REQUEST)]
+
+
+def order_account_infos(addresses, account_infos):
+	"""Orders account infos returned by batch requests (in any order) like addresses, with None in place of missing accounts."""
+
+	address_to_account_info_map = {str(account_info.address): account_info for account_info in account_infos}
+
+	ordered_account_infos = []
+	for address in addresses:
+		account_info = address_to_account_info_map.get(str(address))
+		if not account_info:
+			log.warning(f'unable to retrieve account info for account {address}')
+
+		ordered_account_infos.append(account_info)
+
+	return ordered_account_infos
@@ -0,0 +1,58 @@
+from binascii import unhexlify
+
+from symbolchain.CryptoTypes import PublicKey
+
+
+class AccountMatchContext:
+	"""
+	Precomputed state for classifying the transactions of a single account.
+	Built once per account so that matching signers, recipients and mosaics reduces to byte comparisons and dict lookups.
+	"""
+
+	def __init__(self, network, address, mosaic_ids=()):
+		self.network = network
+		self.address_bytes = address.bytes
+		self.mosaic_ids = frozenset(mosaic_ids)
+
+		# signer public keys repeat heavily across an account history, so each one is only converted once
+		self.public_key_to_address_bytes_map = {}
+
+	def is_signer(self, public_key):
+		"""Returns True when the (hex encoded) public key belongs to the account."""
+
+		address_bytes = self.public_key_to_address_bytes_map.get(public_key)
+		if address_bytes is None:
+			address_bytes = self.network.public_key_to_address(PublicKey(public_key)).bytes
+			self.public_key_to_address_bytes_map[public_key] = address_bytes
+
+		return self.address_bytes == address_bytes
+
+	def is_address(self, hex_address):
+		"""Returns True when the (hex encoded) address is the account address."""
+
+		return self.address_bytes == unhexlify(hex_address)
+
+	def is_accepted_mosaic(self, mosaic_id):
+		return mosaic_id in self.mosaic_ids
+
+
+class AccountMatchContexts:
+	"""Match contexts of all accounts whose transactions are parsed by a client, each created by create_context on first use."""
+
+	def __init__(self, create_context):
+		self.create_context = create_context
+		self.address_to_context_map = {}
+
+	def get(self, address):
+		account_match_context = self.address_to_context_map.get(str(address))
+		if not account_match_context:
+			account_match_context = self.create_context(address)
+			self.address_to_context_map[str(address)] = account_match_context
+
+		return account_match_context
+
+
+def parse_transactions(account_match_context, json_response, parse_transaction):
+	"""Parses each transaction (with its meta) in a page of transactions of the account matched by account_match_context."""
+
+	return [parse_transaction(account_match_context, json_transaction_and_meta) for json_transaction_and_meta in json_response['data']]
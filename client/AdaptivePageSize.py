@@ -0,0 +1,38 @@
+from collections import namedtuple
+
+PageSizeLimits = namedtuple('PageSizeLimits', ['min', 'max'])
+
+DEFAULT_TARGET_PAGE_LATENCY = 5
+
+
+class AdaptivePageSize:
+	"""
+	Page size that doubles (up to the server maximum) while pages are fetched well within a target latency,
+	and halves (down to the server minimum) when pages are slow or requests time out.
+	After a timeout, the page size is not grown beyond its reduced value again.
+	"""
+
+	def __init__(self, limits, target_latency=DEFAULT_TARGET_PAGE_LATENCY):
+		self.limits = limits
+		self.target_latency = target_latency
+		self.max_value = limits.max
+		self.value = max(limits.min, limits.max // 4)
+
+	def record_latency(self, latency):
+		if latency < self.target_latency / 2:
+			self.value = min(self.max_value, 2 * self.value)
+		elif latency > self.target_latency:
+			self._halve()
+
+	def record_timeout(self):
+		"""Shrinks the page size after a timeout and returns False when it is already at the minimum."""
+
+		if self.value <= self.limits.min:
+			return False
+
+		self._halve()
+		self.max_value = self.value
+		return True
+
+	def _halve(self):
+		self.value = max(self.limits.min, self.value // 2)
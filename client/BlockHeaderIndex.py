@@ -0,0 +1,196 @@
+import atexit
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+BlockHeaderRecord = namedtuple('BlockHeaderRecord', ['timestamp', 'fee_multiplier', 'hash', 'signer_public_key'])
+
+FILE_HEADER = struct.Struct('<4sII4x')
+FILE_MAGIC = b'BHIX'
+FILE_VERSION = 1
+
+RECORD = struct.Struct('<B3xIQ32s32s')
+RECORD_FLAG_TIMESTAMP = 0x01
+RECORD_FLAG_HASH = 0x02
+RECORD_FLAG_SIGNER_PUBLIC_KEY = 0x04
+
+GROWTH_RECORD_COUNT = 0x10000
+
+
+class BlockHeaderIndex:
+	"""
+	Persistent, memory-mapped index of finalized block headers.
+	Records have a fixed width and are addressed by height, so lookups are O(1).
+	Every field is optional and a record can be filled incrementally; missing fields are returned as None.
+	"""
+
+	def __init__(self, filepath):
+		self.filepath = Path(filepath)
+		self.lock = threading.Lock()
+
+		is_new = not self.filepath.exists() or not self.filepath.stat().st_size
+		self.file = open(self.filepath, 'r+b' if not is_new else 'w+b')  # pylint: disable=consider-using-with
+		if is_new:
+			self.file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, RECORD.size))
+			self.file.truncate(FILE_HEADER.size + GROWTH_RECORD_COUNT * RECORD.size)
+			self.file.flush()
+
+		self.mapped_file = mmap.mmap(self.file.fileno(), 0)
+
+		(magic, version, record_size) = FILE_HEADER.unpack_from(self.mapped_file, 0)
+		if (FILE_MAGIC, FILE_VERSION, RECORD.size) != (magic, version, record_size):
+			self.close()
+			raise ValueError(f'{self.filepath} is not a compatible block header index')
+
+	@property
+	def capacity(self):
+		return (len(self.mapped_file) - FILE_HEADER.size) // RECORD.size
+
+	def find(self, height):
+		"""Finds the (possibly partial) record stored at height or None when nothing is stored."""
+
+		with self.lock:
+			if height >= self.capacity:
+				return None
+
+			(flags, fee_multiplier, timestamp, block_hash, signer_public_key) = RECORD.unpack_from(
+				self.mapped_file,
+				self._offset(height))
+
+		if not flags:
+			return None
+
+		return BlockHeaderRecord(
+			timestamp if flags & RECORD_FLAG_TIMESTAMP else None,
+			fee_multiplier if flags & RECORD_FLAG_TIMESTAMP else None,
+			block_hash if flags & RECORD_FLAG_HASH else None,
+			signer_public_key if flags & RECORD_FLAG_SIGNER_PUBLIC_KEY else None)
+
+	def store(self, height, timestamp=None, fee_multiplier=0, block_hash=None, signer_public_key=None):
+		"""Merges all specified fields into the record stored at height."""
+
+		# pylint: disable=too-many-arguments
+
+		with self.lock:
+			self._reserve(height)
+
+			offset = self._offset(height)
+			(flags, old_fee_multiplier, old_timestamp, old_block_hash, old_signer_public_key) = RECORD.unpack_from(self.mapped_file, offset)
+
+			if timestamp is None:
+				(timestamp, fee_multiplier) = (old_timestamp, old_fee_multiplier)
+			else:
+				flags |= RECORD_FLAG_TIMESTAMP
+
+			if block_hash is None:
+				block_hash = old_block_hash
+			else:
+				flags |= RECORD_FLAG_HASH
+
+			if signer_public_key is None:
+				signer_public_key = old_signer_public_key
+			else:
+				flags |= RECORD_FLAG_SIGNER_PUBLIC_KEY
+
+			RECORD.pack_into(self.mapped_file, offset, flags, fee_multiplier, timestamp, block_hash, signer_public_key)
+
+	def close(self):
+		with self.lock:
+			if self.file.closed:
+				return
+
+			self.mapped_file.flush()
+			self.mapped_file.close()
+			self.file.close()
+
+	@staticmethod
+	def _offset(height):
+		return FILE_HEADER.size + height * RECORD.size
+
+	# this function must be called in context of self.lock
+	def _reserve(self, height):
+		if height < self.capacity:
+			return
+
+		new_capacity = (height // GROWTH_RECORD_COUNT + 1) * GROWTH_RECORD_COUNT
+		new_size = FILE_HEADER.size + new_capacity * RECORD.size
+
+		# another process sharing the file might have already grown it, so never shrink it
+		if os.fstat(self.file.fileno()).st_size < new_size:
+			self.file.truncate(new_size)
+
+		self.mapped_file.close()
+		self.mapped_file = mmap.mmap(self.file.fileno(), 0)
+
+
+class FinalizedHeightTracker:
+	"""
+	Tracks the finalized height of a chain.
+	Refreshes are requested at most once per refresh interval and only for heights above the known finalized height.
+	"""
+
+	def __init__(self, refresh_interval=15):
+		self.refresh_interval = refresh_interval
+
+		self.finalized_height = 0
+		self.last_refresh_time = None
+
+	def should_refresh(self, height):
+		if height <= self.finalized_height:
+			return False
+
+		now = time.monotonic()
+		if self.last_refresh_time is not None and now - self.last_refresh_time < self.refresh_interval:
+			return False
+
+		self.last_refresh_time = now
+		return True
+
+	def update(self, finalized_height):
+		self.finalized_height = max(self.finalized_height, finalized_height)
+
+	def is_finalized(self, height):
+		return height <= self.finalized_height
+
+
+class BlockHeaderIndexRegistry:
+	"""Process-wide registry of block header indexes, one file per network, stored in a single configured directory."""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.directory = None
+		self.indexes = {}
+
+		atexit.register(self.close)
+
+	def configure(self, directory):
+		with self.lock:
+			self.directory = Path(directory) if directory else None
+			if self.directory:
+				self.directory.mkdir(parents=True, exist_ok=True)
+
+	def get(self, name):
+		"""Gets the index for the named network or None when no index directory is configured."""
+
+		with self.lock:
+			if not self.directory:
+				return None
+
+			if name not in self.indexes:
+				self.indexes[name] = BlockHeaderIndex(self.directory / f'{name}.dat')
+
+			return self.indexes[name]
+
+	def close(self):
+		with self.lock:
+			for index in self.indexes.values():
+				index.close()
+
+			self.indexes = {}
+
+
+BLOCK_HEADER_INDEXES = BlockHeaderIndexRegistry()
@@ -0,0 +1,116 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+BlockMetadata = namedtuple('BlockMetadata', ['timestamp', 'fee_multiplier', 'hash', 'signer_public_key'])
+CacheStatistics = namedtuple('CacheStatistics', ['hits', 'misses', 'coalesced', 'size'])
+
+
+class _PendingLookup:
+	def __init__(self):
+		self.event = threading.Event()
+		self.value = None
+		self.error = None
+
+
+class BlockMetadataCache:
+	"""
+	Bounded, thread-safe LRU cache of block metadata.
+	Concurrent lookups of the same key are coalesced so that only one of them calls the loader.
+	"""
+
+	def __init__(self, max_size=100000):
+		self.max_size = max_size
+
+		self.lock = threading.Lock()
+		self.entries = OrderedDict()
+		self.pending_lookups = {}
+
+		self.hits = 0
+		self.misses = 0
+		self.coalesced = 0
+
+	@property
+	def statistics(self):
+		with self.lock:
+			return CacheStatistics(self.hits, self.misses, self.coalesced, len(self.entries))
+
+	def get(self, key, loader):
+		"""
+		Returns the value associated with key, calling loader to retrieve it when it is not cached.
+		When another thread is already loading the same key, waits for and returns its result instead.
+		"""
+
+		with self.lock:
+			if key in self.entries:
+				self.entries.move_to_end(key)
+				self.hits += 1
+				return self.entries[key]
+
+			pending_lookup = self.pending_lookups.get(key)
+			is_owner = pending_lookup is None
+			if is_owner:
+				pending_lookup = _PendingLookup()
+				self.pending_lookups[key] = pending_lookup
+				self.misses += 1
+			else:
+				self.coalesced += 1
+
+		if not is_owner:
+			pending_lookup.event.wait()
+			if pending_lookup.error:
+				raise pending_lookup.error
+
+			return pending_lookup.value
+
+		is_loaded = False
+		try:
+			pending_lookup.value = loader()
+			is_loaded = True
+		except Exception as ex:
+			pending_lookup.error = ex
+			raise
+		finally:
+			with self.lock:
+				del self.pending_lookups[key]
+				if is_loaded:
+					self._insert(key, pending_lookup.value)
+
+			if not is_loaded and not pending_lookup.error:
+				pending_lookup.error = RuntimeError(f'lookup of {key} was interrupted')
+
+			pending_lookup.event.set()
+
+		return pending_lookup.value
+
+	def find(self, key):
+		"""Returns the value associated with key or None when it is not cached, without loading it."""
+
+		with self.lock:
+			if key not in self.entries:
+				self.misses += 1
+				return None
+
+			self.entries.move_to_end(key)
+			self.hits += 1
+			return self.entries[key]
+
+	def put(self, key, value):
+		"""Caches a value that was loaded together with others (e.g. as part of a range of blocks)."""
+
+		with self.lock:
+			self._insert(key, value)
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+
+	# this function must be called in context of self.lock
+	def _insert(self, key, value):
+		self.entries[key] = value
+		self.entries.move_to_end(key)
+
+		while len(self.entries) > self.max_size:
+			self.entries.popitem(last=False)
+
+
+BLOCK_METADATA_CACHE = BlockMetadataCache()
@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+# circuit states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_OPEN_DURATION = 30
+MAX_OPEN_DURATION = 300
+
+DEFAULT_RETRY_RATIO = 0.2
+DEFAULT_MIN_RETRIES_PER_SECOND = 1
+RETRY_BUDGET_WINDOW = 10
+
+CircuitBreakerStatistics = namedtuple('CircuitBreakerStatistics', [
+	'open_count', 'rejected_request_count', 'denied_retry_count', 'open_hosts'
+])
+
+
+class CircuitOpenError(RequestsConnectionError):
+	"""Raised instead of sending a request to a host whose circuit is open."""
+
+
+def make_circuit_key(scheme, host, port):
+	"""Makes the key of the circuit of a host, which is specific to its port because different services of a host fail independently."""
+
+	return f'{host}:{port or (443 if "https" == scheme else 80)}'
+
+
+class RetryBudget:
+	"""
+	Limits retries to a share of all requests sent within a sliding window, plus a small constant allowance.
+	When many requests fail at once, most of them fail immediately instead of all of them retrying.
+	"""
+
+	def __init__(self, ratio=DEFAULT_RETRY_RATIO, min_retries_per_second=DEFAULT_MIN_RETRIES_PER_SECOND, window=RETRY_BUDGET_WINDOW):
+		self.ratio = ratio
+		self.min_retry_count = min_retries_per_second * window
+		self.window = window
+
+		self.buckets = deque()  # [second, request count, retry count]
+		self.request_count = 0
+		self.retry_count = 0
+
+	def deposit(self, now):
+		self._get_bucket(now)[1] += 1
+		self.request_count += 1
+
+	def try_withdraw(self, now):
+		bucket = self._get_bucket(now)
+		if self.retry_count >= self.min_retry_count + self.ratio * self.request_count:
+			return False
+
+		bucket[2] += 1
+		self.retry_count += 1
+		return True
+
+	def _get_bucket(self, now):
+		second = int(now)
+		while self.buckets and self.buckets[0][0] <= second - self.window:
+			(_, request_count, retry_count) = self.buckets.popleft()
+			self.request_count -= request_count
+			self.retry_count -= retry_count
+
+		if not self.buckets or self.buckets[-1][0] != second:
+			self.buckets.append([second, 0, 0])
+
+		return self.buckets[-1]
+
+
+class _HostCircuit:
+	def __init__(self):
+		self.state = CLOSED
+		self.failure_count = 0
+		self.open_duration = DEFAULT_OPEN_DURATION
+		self.retry_time = 0
+
+
+class CircuitBreakers:
+	"""
+	Per host (see make_circuit_key) circuit breakers that stop sending requests to hosts after consecutive failures,
+	which are failed connection attempts and reads or requests still failing with retryable status codes after all of their retries.
+	While a circuit is open, new requests to its host fail immediately; once it has been open for a while,
+	a single probe request is let through, which closes the circuit on success or reopens it (for longer) on failure.
+	Retries of all hosts share a single retry budget, and requests in progress stop retrying once the circuit of their host opens.
+	Only guarded hosts, which have alternatives (like other nodes of a pool), are subject to circuit breakers and the retry budget;
+	requests to all other hosts are always sent and retried.
+	"""
+
+	def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, open_duration=DEFAULT_OPEN_DURATION, retry_budget=None):
+		self.failure_threshold = failure_threshold
+		self.open_duration = open_duration
+		self.retry_budget = retry_budget or RetryBudget()
+
+		self.lock = threading.Lock()
+		self.host_to_circuit_map = {}
+		self.guarded_hosts = set()
+
+		self.open_count = 0
+		self.rejected_request_count = 0
+		self.denied_retry_count = 0
+
+	@property
+	def statistics(self):
+		with self.lock:
+			open_hosts = sorted(host for (host, circuit) in self.host_to_circuit_map.items() if CLOSED != circuit.state)
+			return CircuitBreakerStatistics(self.open_count, self.rejected_request_count, self.denied_retry_count, open_hosts)
+
+	def get_state(self, host):
+		with self.lock:
+			circuit = self.host_to_circuit_map.get(host)
+			return circuit.state if circuit else CLOSED
+
+	def guard(self, hosts):
+		"""Subjects requests to hosts (names, independent of ports) to circuit breakers."""
+
+		with self.lock:
+			self.guarded_hosts.update(hosts)
+
+	def find_circuit_key(self, scheme, host, port):
+		"""Finds the key of the circuit of a host or None when host is not guarded."""
+
+		with self.lock:
+			return make_circuit_key(scheme, host, port) if host in self.guarded_hosts else None
+
+	def before_request(self, host):
+		"""Admits a request to host or raises CircuitOpenError when the circuit of host is open."""
+
+		if not host:
+			return
+
+		now = time.monotonic()
+		with self.lock:
+			circuit = self.host_to_circuit_map.get(host)
+			if circuit and CLOSED != circuit.state:
+				# in both open and half open states, only one probe is allowed per retry interval
+				if now < circuit.retry_time:
+					self.rejected_request_count += 1
+					raise CircuitOpenError(f'circuit for {host} is open')
+
+				circuit.state = HALF_OPEN
+				circuit.retry_time = now + circuit.open_duration
+
+			self.retry_budget.deposit(now)
+
+	def record_success(self, host):
+		if not host:
+			return
+
+		with self.lock:
+			circuit = self.host_to_circuit_map.get(host)
+			if circuit:
+				circuit.state = CLOSED
+				circuit.failure_count = 0
+				circuit.open_duration = self.open_duration
+
+	def is_open(self, host):
+		"""Determines if requests to host are currently being short-circuited."""
+
+		return OPEN == self.get_state(host)
+
+	def record_failure(self, host):
+		"""Records a failed connection or read, or a request to host that failed after all of its retries."""
+
+		if not host:
+			return
+
+		now = time.monotonic()
+		with self.lock:
+			circuit = self.host_to_circuit_map.setdefault(host, _HostCircuit())
+			circuit.failure_count += 1
+			if HALF_OPEN == circuit.state:
+				# probe failed, so wait longer before probing again
+				circuit.state = OPEN
+				circuit.open_duration = min(MAX_OPEN_DURATION, 2 * circuit.open_duration)
+				circuit.retry_time = now + circuit.open_duration
+			elif CLOSED == circuit.state and circuit.failure_count >= self.failure_threshold:
+				circuit.state = OPEN
+				circuit.open_duration = self.open_duration
+				circuit.retry_time = now + circuit.open_duration
+				self.open_count += 1
+
+	def allows_retry(self, host):
+		"""Determines if a failed request to host can be retried, consuming retry budget when it can."""
+
+		if not host:
+			return True
+
+		with self.lock:
+			if not self.retry_budget.try_withdraw(time.monotonic()):
+				self.denied_retry_count += 1
+				return False
+
+			return True
+
+
+CIRCUIT_BREAKERS = CircuitBreakers()
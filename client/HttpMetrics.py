@@ -0,0 +1,199 @@
+import atexit
+import json
+import os
+import re
+import signal
+import tempfile
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from zenlog import log
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+ERROR_STATUS = 'error'
+REJECTED_STATUS = 'rejected'  # not sent because the circuit of the host was open
+OUTPUT_FORMATS = ('json', 'prometheus')
+
+# path segments holding values rather than names are collapsed so that metrics are aggregated per endpoint
+PATH_SEGMENT_PLACEHOLDERS = (
+	(re.compile(r'\d+'), '{number}'),
+	(re.compile(r'[0-9A-Fa-f]{64}'), '{hash}'),
+	(re.compile(r'[0-9A-Fa-f]{16}'), '{id}'),
+	(re.compile(r'[A-Z2-7]{39,40}'), '{address}')
+)
+
+
+def normalize_endpoint(url):
+	"""Converts a (possibly relative) url into an endpoint template with placeholders for values and only the names of query parameters."""
+
+	url_parts = urlsplit(url)
+	segments = []
+	for segment in url_parts.path.split('/'):
+		for (pattern, placeholder) in PATH_SEGMENT_PLACEHOLDERS:
+			if pattern.fullmatch(segment):
+				segment = placeholder
+				break
+
+		segments.append(segment)
+
+	endpoint = '/'.join(segments) or '/'
+	query_names = sorted({name for (name, _) in parse_qsl(url_parts.query, keep_blank_values=True)})
+	if query_names:
+		endpoint += f'?{"&".join(query_names)}'
+
+	return endpoint
+
+
+class EndpointMetrics:
+	def __init__(self):
+		self.request_count = 0
+		self.status_counts = {}
+		self.latency_bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+		self.latency_sum = 0.0
+		self.bytes_received = 0
+		self.retry_count = 0
+		self.backoff_time = 0.0
+
+	def to_json(self):
+		cumulative_count = 0
+		json_buckets = {}
+		for (upper_bound, count) in zip(LATENCY_BUCKETS + ('+Inf',), self.latency_bucket_counts):
+			cumulative_count += count
+			json_buckets[str(upper_bound)] = cumulative_count
+
+		return {
+			'requests': self.request_count,
+			'statusCodes': dict(sorted(self.status_counts.items())),
+			'latency': {'buckets': json_buckets, 'sum': self.latency_sum, 'count': self.request_count},
+			'bytesReceived': self.bytes_received,
+			'retries': self.retry_count,
+			'backoffSeconds': self.backoff_time
+		}
+
+
+class HttpMetrics:
+	"""
+	Process-wide HTTP request metrics aggregated per (host, endpoint template).
+	When configured with an output file, metrics are written to it at exit and whenever the process receives SIGUSR1.
+	"""
+
+	def __init__(self):
+		# reentrant because metrics can be dumped by a signal handler interrupting the main thread while it is recording
+		self.lock = threading.RLock()
+		self.key_to_metrics_map = {}
+
+		self.output_filepath = None
+		self.output_format = 'json'
+		self.is_dump_registered = False
+
+	def configure(self, output_filepath, output_format='json'):
+		"""Enables (or disables when output_filepath is None) writing metrics to output_filepath in json or prometheus text format."""
+
+		if output_format not in OUTPUT_FORMATS:
+			raise ValueError(f'unsupported http metrics format {output_format}')
+
+		self.output_filepath = Path(output_filepath) if output_filepath else None
+		self.output_format = output_format
+		if not self.output_filepath or self.is_dump_registered:
+			return
+
+		atexit.register(self.dump)
+		if hasattr(signal, 'SIGUSR1'):
+			signal.signal(signal.SIGUSR1, lambda _signal_number, _frame: self.dump())
+
+		self.is_dump_registered = True
+
+	def record_request(self, host, url, status, latency, bytes_received):
+		# pylint: disable=too-many-arguments
+
+		with self.lock:
+			metrics = self._get_metrics(host, url)
+			metrics.request_count += 1
+			metrics.status_counts[str(status)] = metrics.status_counts.get(str(status), 0) + 1
+			metrics.latency_bucket_counts[bisect_left(LATENCY_BUCKETS, latency)] += 1
+			metrics.latency_sum += latency
+			metrics.bytes_received += bytes_received
+
+	def record_bytes_received(self, host, url, bytes_received):
+		with self.lock:
+			self._get_metrics(host, url).bytes_received += bytes_received
+
+	def record_retry(self, host, url):
+		with self.lock:
+			self._get_metrics(host, url).retry_count += 1
+
+	def record_backoff(self, host, url, backoff_time):
+		with self.lock:
+			self._get_metrics(host, url).backoff_time += backoff_time
+
+	def _get_metrics(self, host, url):
+		key = (host or '', normalize_endpoint(url))
+		metrics = self.key_to_metrics_map.get(key)
+		if not metrics:
+			metrics = EndpointMetrics()
+			self.key_to_metrics_map[key] = metrics
+
+		return metrics
+
+	def to_json(self):
+		with self.lock:
+			return [
+				{'host': host, 'endpoint': endpoint, **metrics.to_json()}
+				for ((host, endpoint), metrics) in sorted(self.key_to_metrics_map.items())
+			]
+
+	def to_prometheus(self):
+		families = {
+			'requests_total': ('counter', 'number of completed requests', []),
+			'request_duration_seconds': ('histogram', 'request latency including urllib3 retries and backoff', []),
+			'received_bytes_total': ('counter', 'number of (decoded) response body bytes received', []),
+			'retries_total': ('counter', 'number of retries', []),
+			'backoff_seconds_total': ('counter', 'time spent sleeping between retries', [])
+		}
+
+		for json_metrics in self.to_json():
+			labels = f'host="{_escape_label(json_metrics["host"])}",endpoint="{_escape_label(json_metrics["endpoint"])}"'
+			for (status, count) in json_metrics['statusCodes'].items():
+				families['requests_total'][2].append(f'{{{labels},status="{status}"}} {count}')
+
+			json_latency = json_metrics['latency']
+			lines = families['request_duration_seconds'][2]
+			lines.extend(f'_bucket{{{labels},le="{upper_bound}"}} {count}' for (upper_bound, count) in json_latency['buckets'].items())
+			lines.append(f'_sum{{{labels}}} {json_latency["sum"]}')
+			lines.append(f'_count{{{labels}}} {json_latency["count"]}')
+
+			families['received_bytes_total'][2].append(f'{{{labels}}} {json_metrics["bytesReceived"]}')
+			families['retries_total'][2].append(f'{{{labels}}} {json_metrics["retries"]}')
+			families['backoff_seconds_total'][2].append(f'{{{labels}}} {json_metrics["backoffSeconds"]}')
+
+		output_lines = []
+		for (name, (metric_type, description, lines)) in families.items():
+			output_lines.append(f'# HELP http_client_{name} {description}')
+			output_lines.append(f'# TYPE http_client_{name} {metric_type}')
+			output_lines.extend(f'http_client_{name}{line}' for line in lines)
+
+		return '\n'.join(output_lines) + '\n'
+
+	def dump(self):
+		"""Writes all metrics to the configured output file."""
+
+		if not self.output_filepath:
+			return
+
+		content = json.dumps(self.to_json(), indent=2) if 'json' == self.output_format else self.to_prometheus()
+
+		# write to a temporary file first so that readers never see a partially written file
+		with tempfile.NamedTemporaryFile('wt', encoding='utf8', dir=self.output_filepath.parent, delete=False) as outfile:
+			outfile.write(content)
+
+		os.replace(outfile.name, self.output_filepath)
+		log.info(f'wrote http metrics to {self.output_filepath}')
+
+
+def _escape_label(value):
+	return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+HTTP_METRICS = HttpMetrics()
@@ -0,0 +1,34 @@
+from .BlockHeaderIndex import BLOCK_HEADER_INDEXES
+from .HttpMetrics import HTTP_METRICS, OUTPUT_FORMATS
+from .HttpRecorder import HTTP_RECORDER
+from .RateLimiter import RATE_LIMITERS
+from .ResponseCache import RESPONSE_CACHE
+
+
+def add_http_arguments(parser, include_caches=False):
+	"""
+	Adds options for http request metrics, rate limits and recording (or replaying) of http exchanges to parser.
+	When include_caches is set, options for persistent block header indexes and REST response caches are added too.
+	"""
+
+	if include_caches:
+		parser.add_argument('--block-index', help='(optional) directory containing persistent block header indexes')
+		parser.add_argument('--response-cache', help='(optional) directory containing cached REST responses')
+
+	parser.add_argument('--http-metrics', help='(optional) file to which http request metrics are written at exit or on SIGUSR1')
+	parser.add_argument('--http-metrics-format', help='http request metrics format', choices=OUTPUT_FORMATS, default='json')
+	parser.add_argument('--rate-limits', help='(optional) yaml file with per host rate limits overriding the defaults')
+	parser.add_argument('--http-record', help='(optional) fixture archive to which all http exchanges are recorded')
+	parser.add_argument('--http-replay', help='(optional) url of a mock server to which all http requests are redirected')
+
+
+def configure_http(args):
+	"""Configures process-wide http metrics, rate limits, recording and (optionally) caches from options added by add_http_arguments."""
+
+	if hasattr(args, 'block_index'):
+		BLOCK_HEADER_INDEXES.configure(args.block_index)
+		RESPONSE_CACHE.configure(args.response_cache)
+
+	HTTP_METRICS.configure(args.http_metrics, args.http_metrics_format)
+	RATE_LIMITERS.configure(args.rate_limits)
+	HTTP_RECORDER.configure(args.http_record, args.http_replay)
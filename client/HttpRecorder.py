@@ -0,0 +1,133 @@
+import atexit
+import base64
+import gzip
+import json
+import threading
+from urllib.parse import urlsplit
+
+from zenlog import log
+
+
+def make_exchange_key(method, host, path, body):
+	"""Makes the key identifying a request in a fixture archive."""
+
+	return (method, host, path, body or '')
+
+
+def _get_request_path(url_parts):
+	return f'{url_parts.path or "/"}?{url_parts.query}' if url_parts.query else url_parts.path or '/'
+
+
+def _decode_body(body):
+	if body is None or isinstance(body, str):
+		return body
+
+	return body.decode('utf8')
+
+
+def load_fixtures(filepath):
+	"""Loads a fixture archive into a map from exchange key to the (status, content type, content) responses recorded for it, in order."""
+
+	key_to_responses_map = {}
+	with gzip.open(filepath, 'rt', encoding='utf8') as infile:
+		for line in infile:
+			json_exchange = json.loads(line)
+			if 'contentBase64' in json_exchange:
+				content = base64.b64decode(json_exchange['contentBase64'])
+			else:
+				content = json_exchange['content'].encode('utf8')
+
+			key = make_exchange_key(json_exchange['method'], json_exchange['host'], json_exchange['path'], json_exchange['body'])
+			key_to_responses_map.setdefault(key, []).append((json_exchange['status'], json_exchange['contentType'], content))
+
+	return key_to_responses_map
+
+
+class HttpRecorder:
+	"""
+	Process-wide recorder of HTTP exchanges, which are appended to a fixture archive (gzipped json lines) as responses are received.
+	When replaying, requests are instead redirected to a (mock) server, with their original host in the Host header.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.outfile = None
+		self.record_filepath = None
+		self.record_count = 0
+
+		self.replay_url = None
+
+	def configure(self, record_filepath=None, replay_url=None):
+		"""Enables recording all exchanges to record_filepath or redirecting all requests to replay_url."""
+
+		if record_filepath and replay_url:
+			raise ValueError('http exchanges cannot be recorded and replayed at the same time')
+
+		self.replay_url = replay_url.rstrip('/') if replay_url else None
+		if not record_filepath:
+			return
+
+		with self.lock:
+			self.outfile = gzip.open(record_filepath, 'wt', encoding='utf8')
+			self.record_filepath = record_filepath
+
+		atexit.register(self.close)
+
+	def redirect(self, url):
+		"""Gets the url to which a request for url is sent and the Host header it is sent with (None unless replaying)."""
+
+		if not self.replay_url:
+			return (url, None)
+
+		url_parts = urlsplit(url)
+		return (f'{self.replay_url}{_get_request_path(url_parts)}', url_parts.netloc)
+
+	def record(self, method, url, body, response):
+		"""Records the exchange of a request with a response (having status_code, headers and content)."""
+
+		if not self.outfile:
+			return
+
+		self.record_content(method, url, body, response.status_code, response.headers.get('content-type'), response.content)
+
+	def record_content(self, method, url, body, status_code, content_type, content):
+		"""Records the exchange of a request with a response given by its parts."""
+
+		# pylint: disable=too-many-arguments
+		if not self.outfile:
+			return
+
+		url_parts = urlsplit(url)
+		json_exchange = {
+			'method': method,
+			'host': url_parts.netloc,
+			'path': _get_request_path(url_parts),
+			'body': _decode_body(body),
+			'status': status_code,
+			'contentType': content_type
+		}
+
+		try:
+			json_exchange['content'] = content.decode('utf8')
+		except UnicodeDecodeError:
+			json_exchange['contentBase64'] = base64.b64encode(content).decode('ascii')
+
+		line = json.dumps(json_exchange)
+		with self.lock:
+			if self.outfile:
+				self.outfile.write(f'{line}\n')
+				self.record_count += 1
+
+	def close(self):
+		"""Closes the fixture archive being recorded, if any."""
+
+		with self.lock:
+			if not self.outfile:
+				return
+
+			self.outfile.close()
+			self.outfile = None
+			log.info(f'recorded {self.record_count} http exchanges to {self.record_filepath}')
+
+
+HTTP_RECORDER = HttpRecorder()
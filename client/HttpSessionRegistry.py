@@ -0,0 +1,74 @@
+import threading
+from collections import namedtuple
+
+from requests.adapters import DEFAULT_POOLSIZE
+
+from .TimeoutHTTPAdapter import DEFAULT_RETRY_COUNT, DEFAULT_TIMEOUT, create_http_session
+
+HttpSessionStatistics = namedtuple('HttpSessionStatistics', ['session_count', 'reused_session_count', 'request_count', 'connection_count'])
+
+
+class HttpSessionRegistry:
+	"""
+	Process-wide registry of HTTP sessions, one per host (or group of hosts) and session options, created on first use.
+	Connection pools of all sessions are sized for the number of threads that use them concurrently.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.sessions = {}
+		self.pool_size = DEFAULT_POOLSIZE
+		self.reused_session_count = 0
+
+	@property
+	def statistics(self):
+		with self.lock:
+			sessions = list(self.sessions.values())
+			reused_session_count = self.reused_session_count
+
+		request_count = 0
+		connection_count = 0
+		for session in sessions:
+			for connection_pool in self._get_connection_pools(session):
+				request_count += connection_pool.num_requests
+				connection_count += connection_pool.num_connections
+
+		return HttpSessionStatistics(len(sessions), reused_session_count, request_count, connection_count)
+
+	def configure(self, thread_count):
+		"""Sizes connection pools of subsequently created sessions so that thread_count threads never wait for or discard connections."""
+
+		with self.lock:
+			self.pool_size = max(DEFAULT_POOLSIZE, thread_count)
+
+	def get(self, hosts, **kwargs):
+		"""Gets the session for requests to hosts with options (timeout, retry_count, retry_post) from kwargs."""
+
+		hosts = (hosts,) if isinstance(hosts, str) else tuple(sorted(set(hosts)))
+		key = (hosts, kwargs.get('timeout', DEFAULT_TIMEOUT), kwargs.get('retry_count', DEFAULT_RETRY_COUNT), kwargs.get('retry_post', False))
+		with self.lock:
+			session = self.sessions.get(key)
+			if session:
+				self.reused_session_count += 1
+				return session
+
+			session = create_http_session(**{
+				**kwargs,
+				'pool_connections': max(DEFAULT_POOLSIZE, len(hosts)),
+				'pool_size': self.pool_size
+			})
+			self.sessions[key] = session
+			return session
+
+	@staticmethod
+	def _get_connection_pools(session):
+		adapters = {id(adapter): adapter for adapter in session.adapters.values()}.values()
+		for adapter in adapters:
+			pools = adapter.poolmanager.pools
+			for pool_key in pools.keys():
+				connection_pool = pools.get(pool_key)
+				if connection_pool:
+					yield connection_pool
+
+
+HTTP_SESSIONS = HttpSessionRegistry()
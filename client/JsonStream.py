@@ -0,0 +1,205 @@
+import codecs
+import json
+import re
+
+ANY_INDEX = '*'
+STREAM_CHUNK_SIZE = 0x10000
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+_SCALAR_END_PATTERN = re.compile(r'[ \t\n\r,\]}:]')
+_STRING_SPECIAL_PATTERN = re.compile(r'["\\]')
+_STRUCTURE_PATTERN = re.compile(r'["\[\]{}]')
+
+
+class _ValueEndScanner:
+	"""Finds the end of a JSON value that may span several chunks of text, scanning every character only once."""
+
+	def __init__(self, first_character):
+		self.is_scalar = first_character not in '"[{'
+		self.depth = 0
+		self.is_in_string = False
+		self.is_escaped = False
+
+	def scan(self, text, position=0):
+		"""Returns the position in text right after the end of the value or None when the value continues past text."""
+
+		if self.is_scalar:
+			match = _SCALAR_END_PATTERN.search(text, position)
+			return match.start() if match else None
+
+		if self.is_escaped:
+			if position == len(text):
+				return None
+
+			# the character escaped by a backslash ending the previous chunk is skipped
+			self.is_escaped = False
+			position += 1
+
+		while True:
+			match = (_STRING_SPECIAL_PATTERN if self.is_in_string else _STRUCTURE_PATTERN).search(text, position)
+			if not match:
+				return None
+
+			character = match.group()
+			position = match.end()
+			if self.is_in_string:
+				if '\\' == character:
+					if position == len(text):
+						self.is_escaped = True
+						return None
+
+					position += 1
+					continue
+
+				self.is_in_string = False
+			elif '"' == character:
+				self.is_in_string = True
+			elif character in '[{':
+				self.depth += 1
+			else:
+				self.depth -= 1
+
+			if not self.depth and not self.is_in_string:
+				return position
+
+
+class _JsonStreamReader:
+	def __init__(self, chunks):
+		self.chunks = iter(chunks)
+		self.text_decoder = codecs.getincrementaldecoder('utf8')()
+		self.buffer = ''
+		self.position = 0
+		self.is_eof = False
+
+	def fill(self):
+		"""Appends the next chunk to the buffer and returns False when the stream is exhausted."""
+
+		# drop consumed text so that the buffer only ever holds the unprocessed tail of the stream
+		if self.position > STREAM_CHUNK_SIZE:
+			self.buffer = self.buffer[self.position:]
+			self.position = 0
+
+		text = self._read_text()
+		if text is None:
+			return False
+
+		self.buffer += text
+		return True
+
+	def _read_text(self):
+		if self.is_eof:
+			return None
+
+		chunk = next(self.chunks, None)
+		if chunk is None:
+			self.is_eof = True
+			return self.text_decoder.decode(b'', final=True)
+
+		return self.text_decoder.decode(chunk)
+
+	def peek(self):
+		while True:
+			while self.position < len(self.buffer) and self.buffer[self.position] in _WHITESPACE:
+				self.position += 1
+
+			if self.position < len(self.buffer):
+				return self.buffer[self.position]
+
+			if not self.fill():
+				raise json.JSONDecodeError('unexpected end of stream', self.buffer, self.position)
+
+	def expect(self, characters):
+		character = self.peek()
+		if character not in characters:
+			raise json.JSONDecodeError(f'expected one of {characters}', self.buffer, self.position)
+
+		self.position += 1
+		return character
+
+	def decode_value(self):
+		scanner = _ValueEndScanner(self.peek())
+		end_position = scanner.scan(self.buffer, self.position)
+		if end_position is not None:
+			(value, self.position) = _DECODER.raw_decode(self.buffer, self.position)
+			return value
+
+		# the value continues past the buffer, so its pieces are collected until its end is found and then decoded at once
+		# (instead of decoding it again after every chunk)
+		pieces = [self.buffer[self.position:]]
+		while end_position is None:
+			text = self._read_text()
+			if text is None:
+				if not scanner.is_scalar:
+					raise json.JSONDecodeError('unexpected end of stream', ''.join(pieces), 0)
+
+				(text, end_position) = ('', 0)
+			else:
+				end_position = scanner.scan(text)
+
+			pieces.append(text if end_position is None else text[:end_position])
+
+		self.buffer = text[end_position:]
+		self.position = 0
+		return _DECODER.decode(''.join(pieces))
+
+
+def _is_pattern_prefix(path, pattern):
+	if len(path) > len(pattern):
+		return False
+
+	return all(
+		path_part == pattern_part or (ANY_INDEX == pattern_part and isinstance(path_part, int))
+		for (path_part, pattern_part) in zip(path, pattern))
+
+
+def _walk(reader, path, patterns):
+	matching_patterns = [pattern for pattern in patterns if _is_pattern_prefix(path, pattern)]
+	if not matching_patterns or any(len(pattern) == len(path) for pattern in matching_patterns):
+		value = reader.decode_value()
+		if matching_patterns:
+			yield (path, value)
+
+		return
+
+	character = reader.peek()
+	if '{' == character:
+		reader.position += 1
+		if '}' == reader.peek():
+			reader.position += 1
+			return
+
+		while True:
+			key = reader.decode_value()
+			reader.expect(':')
+			yield from _walk(reader, path + (key,), matching_patterns)
+			if '}' == reader.expect(',}'):
+				return
+	elif '[' == character:
+		reader.position += 1
+		if ']' == reader.peek():
+			reader.position += 1
+			return
+
+		index = 0
+		while True:
+			yield from _walk(reader, path + (index,), matching_patterns)
+			if ']' == reader.expect(',]'):
+				return
+
+			index += 1
+	else:
+		reader.decode_value()
+
+
+def iter_json_values(chunks, patterns):
+	"""
+	Incrementally decodes a JSON document from an iterable of byte chunks.
+	Yields (path, value) for every value with a path matching one of patterns, as soon as it has been received.
+	Paths are tuples of object keys and array indexes; ANY_INDEX in a pattern matches any array index.
+	Values that are neither matched nor on the way to a match are decoded and discarded one at a time,
+	so memory use is bounded by the largest single value rather than by the whole document.
+	"""
+
+	yield from _walk(_JsonStreamReader(chunks), (), patterns)
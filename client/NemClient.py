@@ -1,18 +1,44 @@
+import math
+from functools import partial
+
 from symbolchain.CryptoTypes import Hash256, PublicKey
 from symbolchain.nem.Network import Address, Network, NetworkTimestamp
-
+from zenlog import log
+
+from .AccountBatch import order_account_infos, split_account_batches
+from .AccountMatchContext import AccountMatchContext, AccountMatchContexts, parse_transactions
+from .AdaptivePageSize import PageSizeLimits
+from .BlockHeaderIndex import BLOCK_HEADER_INDEXES, FinalizedHeightTracker
+from .BlockMetadataCache import BLOCK_METADATA_CACHE, BlockMetadata
+from .JsonStream import ANY_INDEX
 from .pod import TransactionSnapshot
-from .TimeoutHTTPAdapter import create_http_session
+from .ResponseCache import FINALIZED_POLICY, NODE_PER_BLOCK_POLICY, PER_BLOCK_POLICY, EndpointCachePolicies
+from .RestClientMixin import RestClientMixin
 
 MICROXEM_PER_XEM = 1000000.0
+MAX_ROLLBACK_BLOCKS = 360
+MAX_BLOCKS_PER_SEGMENT = 10  # maximum number of blocks returned by local/chain/blocks-after
+MAX_HISTORICAL_BALANCES_PER_REQUEST = 1000  # maximum number of data points returned by account/historical/get
+PAGE_SIZE_LIMITS = PageSizeLimits(5, 100)
 SUPERNODE_ACCOUNT_PUBLIC_KEY = 'd96366cdd47325e816ff86039a6477ef42772a455023ccddae4a0bd5d27b8d23'
 TRANSACTION_TYPES = {
 	'transfer': 257,
 	'multisig': 4100
 }
 
+RESPONSE_CACHE_POLICIES = EndpointCachePolicies([
+	('POST', r'block/at/public', FINALIZED_POLICY),
+	('GET', r'account/historical/get\?.*', FINALIZED_POLICY),
+	('GET', r'account/(harvests|transfers/all)\?.*', PER_BLOCK_POLICY),
+
+	# state of the queried node, which differs between nodes that are not synced
+	('GET', r'chain/height|account/(get|get/forwarded)\?.*|node/(info|peer-list/reachable)', NODE_PER_BLOCK_POLICY)
+], 60)
+
 
 class AccountInfo:
+	__slots__ = ('address', 'address_name', 'vested_balance', 'balance', 'public_key', 'importance', 'harvested_blocks', 'remote_status')
+
 	def __init__(self, address):
 		self.address = address
 		self.address_name = address
@@ -26,11 +52,19 @@ class AccountInfo:
 		self.remote_status = None
 
 
-class NemClient:
+class NemClient(RestClientMixin):
+	response_cache_policies = RESPONSE_CACHE_POLICIES
+	page_size_limits = PAGE_SIZE_LIMITS
+
 	def __init__(self, host, port=7890, **kwargs):
-		self.session = create_http_session(**kwargs)
+		super().__init__(**kwargs)
 		(self.node_host, self.node_port) = (host, port)
 		self.network = Network.MAINNET
+		self.account_match_contexts = AccountMatchContexts(lambda address: AccountMatchContext(self.network, Address(address)))
+
+		# NEM has no finalization, but blocks deeper than the maximum rollback depth can never change
+		self.finalized_height_tracker = FinalizedHeightTracker()
+		self.is_block_segment_lookup_supported = True
 
 	@staticmethod
 	def from_node_info_dict(dict_node_info, **kwargs):
@@ -42,31 +76,175 @@ class NemClient:
 		return int(json_response['height'])
 
 	def get_harvester_signer_public_key(self, height):
+		record = self._find_block_header_record(height)
+		if record and record.signer_public_key:
+			return PublicKey(record.signer_public_key)
+
 		json_response = self._post_json('block/at/public', {'height': height})
+		if self._block_header_index and self._is_finalized(height):
+			self._index_block(height, json_response)
+
 		return PublicKey(json_response['signer'])
 
 	def get_block_hash(self, height):
+		block_hash = self._find_cached_block_hash(height)
+		if block_hash:
+			return block_hash
+
 		# due to limitation in NEM REST API, we need to query next block to get current block hash
 		# as a result, newest block hash will be unknown
 		json_response = self._post_json('block/at/public', {'height': height + 1})
+		block_hash = self._parse_block_hash(json_response)
 
-		if 'error' in json_response:
-			raise RuntimeError(str(json_response))
+		if self._block_header_index and self._is_finalized(height + 1):
+			self._index_block(height + 1, json_response)
 
-		return Hash256(json_response['prevBlockHash']['data']) if 'prevBlockHash' in json_response else None
+		return block_hash
+
+	def get_block_hashes(self, heights):
+		"""Gets a map of heights to block hashes, retrieving uncached blocks in segments of consecutive blocks."""
+
+		height_to_block_hash_map = {height: self._find_cached_block_hash(height) for height in heights}
+		missing_heights = [height for (height, block_hash) in height_to_block_hash_map.items() if not block_hash]
+		if self.is_block_segment_lookup_supported:
+			for start_height in self._get_block_segment_start_heights(missing_heights):
+				json_response = self._try_post_json('local/chain/blocks-after', self._get_block_segment_params(start_height))
+				if not self._is_block_segment(json_response):
+					log.warning(f'{self.node_host} does not support block segment lookups, falling back to individual requests')
+					self.is_block_segment_lookup_supported = False
+					break
+
+				segment_height_to_block_hash_map = self._cache_block_segment(json_response)
+				if self._block_header_index:
+					self._index_block_segment(json_response, [
+						height for height in segment_height_to_block_hash_map if self._is_finalized(height)
+					])
+
+				for (height, block_hash) in segment_height_to_block_hash_map.items():
+					if height in height_to_block_hash_map:
+						height_to_block_hash_map[height] = block_hash
+
+		# any blocks not retrieved in segments are retrieved individually
+		for height in missing_heights:
+			if not height_to_block_hash_map[height]:
+				height_to_block_hash_map[height] = self.get_block_hash(height)
+
+		return height_to_block_hash_map
 
 	def get_node_info(self):
 		json_response = self._get_json('node/info')
 		return json_response
 
 	def get_peers(self):
-		json_response = self._get_json('node/peer-list/reachable')
-		return json_response['data']
+		return [json_peer for (_, json_peer) in self._get_json_values('node/peer-list/reachable', [('data', ANY_INDEX)])]
 
 	def get_account_info(self, address, forwarded=False):
+		json_response = self._get_json(self._get_account_info_rest_path(address, forwarded))
+		return self._parse_account_info(json_response)
+
+	def get_account_infos(self, addresses, mosaic_id=None):
+		# pylint: disable=unused-argument
+		# mosaic_id is only accepted for parity with SymbolClient, because NEM balances are always in XEM
+		json_accounts_and_meta = []
+		for address_batch in split_account_batches(addresses):
+			json_response = self._try_post_json('account/get/batch', self._get_account_batch_params(address_batch))
+			if isinstance(json_response, dict) and 'data' in json_response:
+				json_accounts_and_meta.extend(json_response['data'])
+				continue
+
+			log.warning(f'{self.node_host} does not support batch account lookups, falling back to individual requests')
+			for address in address_batch:
+				json_response = self._get_json(self._get_account_info_rest_path(address, False))
+				if 'error' not in json_response:
+					json_accounts_and_meta.append(json_response)
+
+		account_infos = [self._parse_account_info(json_account_and_meta) for json_account_and_meta in json_accounts_and_meta]
+		return order_account_infos(addresses, account_infos)
+
+	def get_historical_balance(self, address, height):
+		return self.get_historical_balances(address, [height])[int(height)]
+
+	def get_historical_balances(self, address, heights):
+		"""Gets a map of heights to balances of an account, retrieving ranges of heights in single requests."""
+
+		heights = [int(height) for height in heights]
+		height_to_balance_map = {}
+		for (start_height, end_height, increment) in self._get_historical_balance_ranges(heights):
+			json_response = self._get_json(self._get_historical_balances_rest_path(address, start_height, end_height, increment))
+			height_to_balance_map.update(self._parse_historical_balances(json_response))
+
+		return {height: height_to_balance_map.get(height, 0) for height in heights}
+
+	def get_harvests(self, address, start_id=None, page_size=None):
+		return self.process_harvests_page(address, self.fetch_harvests_page(address, start_id, page_size))
+
+	def fetch_harvests_page(self, address, start_id=None, page_size=None):
+		return self._get_json(self._get_account_page_rest_path('harvests', address, start_id, page_size))
+
+	def process_harvests_page(self, address, json_response):
+		height_to_block_hash_map = self.get_block_hashes(self._get_harvest_heights(json_response))
+		return self._parse_harvests(address, json_response, height_to_block_hash_map)
+
+	def get_transfers(self, address, start_id=None, page_size=None):
+		return self.process_transfers_page(address, self.fetch_transfers_page(address, start_id, page_size))
+
+	def fetch_transfers_page(self, address, start_id=None, page_size=None):
+		return self._get_json(self._get_account_page_rest_path('transfers/all', address, start_id, page_size))
+
+	def process_transfers_page(self, address, json_response):
+		return self._parse_transfers(address, json_response)
+
+	@staticmethod
+	def _parse_block_hash(json_response):
+		if 'error' in json_response:
+			raise RuntimeError(str(json_response))
+
+		return Hash256(json_response['prevBlockHash']['data']) if 'prevBlockHash' in json_response else None
+
+	@staticmethod
+	def _get_account_info_rest_path(address, forwarded):
 		subpath = '/forwarded' if forwarded else ''
-		json_response = self._get_json(f'account/get{subpath}?address={address}')
+		return f'account/get{subpath}?address={address}'
+
+	@staticmethod
+	def _get_historical_balance_ranges(heights):
+		"""
+		Groups heights into (start height, end height, increment) ranges, which together contain all heights.
+		Each range is extended as long as it contains at most the maximum number of data points returned by a single request.
+		"""
 
+		ranges = []
+		(start_height, end_height, increment) = (None, None, 0)
+		for height in sorted(set(heights)):
+			if start_height is not None:
+				extended_increment = math.gcd(increment, height - start_height)
+				if (height - start_height) // extended_increment < MAX_HISTORICAL_BALANCES_PER_REQUEST:
+					(end_height, increment) = (height, extended_increment)
+					continue
+
+				ranges.append((start_height, end_height, increment or 1))
+
+			(start_height, end_height, increment) = (height, height, 0)
+
+		if start_height is not None:
+			ranges.append((start_height, end_height, increment or 1))
+
+		return ranges
+
+	@staticmethod
+	def _get_historical_balances_rest_path(address, start_height, end_height, increment):
+		return f'account/historical/get?address={address}&startHeight={start_height}&endHeight={end_height}&increment={increment}'
+
+	@staticmethod
+	def _parse_historical_balances(json_response):
+		return {int(json_state['height']): float(json_state['balance']) / MICROXEM_PER_XEM for json_state in json_response['data']}
+
+	@staticmethod
+	def _get_account_batch_params(address_batch):
+		return {'data': [{'account': address} for address in address_batch]}
+
+	@staticmethod
+	def _parse_account_info(json_response):
 		json_account = json_response['account']
 		json_meta = json_response['meta']
 
@@ -80,14 +258,7 @@ class NemClient:
 		account_info.remote_status = json_meta['remoteStatus']
 		return account_info
 
-	def get_historical_balance(self, address, height):
-		rest_path = f'account/historical/get?address={address}&startHeight={height}&endHeight={height}&increment=1'
-		json_response = self._get_json(rest_path)
-		return 0 if not json_response['data'] else float(json_response['data'][0]['balance']) / MICROXEM_PER_XEM
-
-	def get_harvests(self, address, start_id=None):
-		json_response = self._get_account_page('harvests', address, start_id)
-
+	def _parse_harvests(self, address, json_response, height_to_block_hash_map):
 		snapshots = []
 		for json_harvest in json_response['data']:
 			snapshot = TransactionSnapshot(address, 'harvest')
@@ -96,38 +267,40 @@ class NemClient:
 			snapshot.amount = int(json_harvest['totalFee']) / MICROXEM_PER_XEM
 			snapshot.height = int(json_harvest['height'])
 			snapshot.collation_id = int(json_harvest['id'])
-			snapshot.hash = self.get_block_hash(snapshot.height)
+			snapshot.hash = height_to_block_hash_map[snapshot.height]
 			snapshots.append(snapshot)
 
 		return snapshots
 
-	def get_transfers(self, address, start_id=None):
-		json_response = self._get_account_page('transfers/all', address, start_id)
+	@staticmethod
+	def _get_harvest_heights(json_response):
+		return list(dict.fromkeys(int(json_harvest['height']) for json_harvest in json_response['data']))
 
-		snapshots = []
-		for json_transaction_and_meta in json_response['data']:
-			json_transaction = json_transaction_and_meta['transaction']
-			json_meta = json_transaction_and_meta['meta']
+	def _parse_transfers(self, address, json_response):
+		return parse_transactions(self.account_match_contexts.get(address), json_response, partial(self._parse_transfer, address))
 
-			if TRANSACTION_TYPES['multisig'] == int(json_transaction['type']):
-				json_transaction = json_transaction['otherTrans']
+	def _parse_transfer(self, address, account_match_context, json_transaction_and_meta):
+		json_transaction = json_transaction_and_meta['transaction']
+		json_meta = json_transaction_and_meta['meta']
 
-			tag = 'supernode' if SUPERNODE_ACCOUNT_PUBLIC_KEY == json_transaction['signer'] else 'transfer'
-			snapshot = TransactionSnapshot(address, tag)
-			snapshot.timestamp = self.network.to_datetime(NetworkTimestamp(json_transaction['timeStamp']))
+		if TRANSACTION_TYPES['multisig'] == int(json_transaction['type']):
+			json_transaction = json_transaction['otherTrans']
 
-			(amount_microxem, fee_microxem) = self._process_xem_changes(snapshot, json_transaction)
+		tag = 'supernode' if SUPERNODE_ACCOUNT_PUBLIC_KEY == json_transaction['signer'] else 'transfer'
+		snapshot = TransactionSnapshot(address, tag)
+		snapshot.timestamp = self.network.to_datetime(NetworkTimestamp(json_transaction['timeStamp']))
 
-			snapshot.amount = amount_microxem / MICROXEM_PER_XEM
-			snapshot.fee_paid = fee_microxem / MICROXEM_PER_XEM
-			snapshot.height = int(json_meta['height'])
-			snapshot.collation_id = json_meta['id']
-			snapshot.hash = Hash256(json_meta['hash']['data'])
-			snapshots.append(snapshot)
+		(amount_microxem, fee_microxem) = self._process_xem_changes(snapshot, account_match_context, json_transaction)
 
-		return snapshots
+		snapshot.amount = amount_microxem / MICROXEM_PER_XEM
+		snapshot.fee_paid = fee_microxem / MICROXEM_PER_XEM
+		snapshot.height = int(json_meta['height'])
+		snapshot.collation_id = json_meta['id']
+		snapshot.hash = Hash256(json_meta['hash']['data'])
+		return snapshot
 
-	def _process_xem_changes(self, snapshot, json_transaction):
+	@staticmethod
+	def _process_xem_changes(snapshot, account_match_context, json_transaction):
 		amount_microxem = 0
 		fee_microxem = 0
 		transaction_type = int(json_transaction['type'])
@@ -146,28 +319,119 @@ class NemClient:
 		else:
 			snapshot.comments = f'unsupported transaction of type {transaction_type}'
 
-		if self._is_signer(snapshot.address, json_transaction):
+		if account_match_context.is_signer(json_transaction['signer']):
 			fee_microxem = -int(json_transaction['fee'])
 
 		return (amount_microxem, fee_microxem)
 
-	def _is_signer(self, address, json_transaction):
-		return Address(address) == self.network.public_key_to_address(PublicKey(json_transaction['signer']))
+	@property
+	def _block_namespace(self):
+		return f'nem.{self.network.name}'
 
-	def _get_account_page(self, name, address, start_id):
+	@property
+	def _block_header_index(self):
+		return BLOCK_HEADER_INDEXES.get(self._block_namespace)
+
+	def _find_block_header_record(self, height):
+		block_header_index = self._block_header_index
+		return block_header_index.find(height) if block_header_index else None
+
+	def _find_cached_block_hash(self, height):
+		record = self._find_block_header_record(height)
+		if record and record.hash:
+			return Hash256(record.hash)
+
+		block_metadata = BLOCK_METADATA_CACHE.find((self._block_namespace, height))
+		return block_metadata.hash if block_metadata else None
+
+	@staticmethod
+	def _get_block_segment_start_heights(heights):
+		# a segment starting at a height contains the blocks at and following it,
+		# so heights close to each other are retrieved together; the nemesis block has no preceding block to query from
+		start_heights = []
+		for height in sorted(height for height in heights if height > 1):
+			if not start_heights or height >= start_heights[-1] + MAX_BLOCKS_PER_SEGMENT:
+				start_heights.append(height)
+
+		return start_heights
+
+	@staticmethod
+	def _get_block_segment_params(start_height):
+		return {'height': start_height - 1}
+
+	@staticmethod
+	def _is_block_segment(json_response):
+		return isinstance(json_response, dict) and 'data' in json_response
+
+	def _cache_block_segment(self, json_response):
+		"""Caches the blocks of a segment and returns a map of their heights to hashes."""
+
+		height_to_block_hash_map = {}
+		for json_block_and_hash in json_response['data']:
+			json_block = json_block_and_hash['block']
+			height = int(json_block['height'])
+			block_hash = Hash256(json_block_and_hash['hash'])
+
+			BLOCK_METADATA_CACHE.put((self._block_namespace, height), BlockMetadata(
+				self.network.to_datetime(NetworkTimestamp(json_block['timeStamp'])),
+				0,
+				block_hash,
+				PublicKey(json_block['signer'])))
+			height_to_block_hash_map[height] = block_hash
+
+		return height_to_block_hash_map
+
+	def _index_block_segment(self, json_response, finalized_heights):
+		for json_block_and_hash in json_response['data']:
+			json_block = json_block_and_hash['block']
+			height = int(json_block['height'])
+			if height in finalized_heights:
+				self._index_block(height, json_block)
+				self._block_header_index.store(height, block_hash=Hash256(json_block_and_hash['hash']).bytes)
+
+	def _index_block(self, height, json_block):
+		# only blocks beyond the rollback depth are immutable and safe to persist, so callers must check finalization first
+		if 'signer' not in json_block:
+			return
+
+		block_header_index = self._block_header_index
+		block_header_index.store(height, json_block['timeStamp'], signer_public_key=PublicKey(json_block['signer']).bytes)
+		if 'prevBlockHash' in json_block:
+			block_header_index.store(height - 1, block_hash=Hash256(json_block['prevBlockHash']['data']).bytes)
+
+	@staticmethod
+	def get_page_end_id(json_response):
+		"""Gets the id of the last harvest or transfer in a page, which identifies the next page, or None when the page is empty."""
+
+		json_items = json_response.get('data')
+		if not json_items:
+			return None
+
+		json_item = json_items[-1]
+		return json_item['meta']['id'] if 'meta' in json_item else json_item['id']
+
+	@staticmethod
+	def _get_account_page_rest_path(name, address, start_id, page_size):
 		rest_path = f'account/{name}?address={address}'
+		if page_size:
+			rest_path += f'&pageSize={page_size}'
+
 		if start_id:
 			rest_path += f'&id={start_id}'
 
-		return self._get_json(rest_path)
+		return rest_path
+
+	@staticmethod
+	def _find_response_height(json_response):
+		# blocks have a height, while historical account states are listed in data
+		if 'height' in json_response:
+			return int(json_response['height'])
+
+		heights = [int(json_item['height']) for json_item in json_response.get('data', [])]
+		return max(heights) if heights else None
 
-	def _get_json(self, rest_path):
-		json_http_headers = {'Content-type': 'application/json'}
-		return self.session.get(f'http://{self.node_host}:{self.node_port}/{rest_path}', headers=json_http_headers).json()
+	def _is_finalized(self, height):
+		if self.finalized_height_tracker.should_refresh(height):
+			self.finalized_height_tracker.update(self.get_chain_height() - MAX_ROLLBACK_BLOCKS)
 
-	def _post_json(self, rest_path, params):
-		json_http_headers = {'Content-type': 'application/json'}
-		return self.session.post(
-			f'http://{self.node_host}:{self.node_port}/{rest_path}',
-			json=params,
-			headers=json_http_headers).json()
+		return self.finalized_height_tracker.is_finalized(height)
@@ -0,0 +1,311 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from requests.exceptions import RequestException
+
+from .CircuitBreaker import CIRCUIT_BREAKERS
+
+LATENCY_SMOOTHING_FACTOR = 0.2
+ERROR_RATE_SMOOTHING_FACTOR = 0.2
+MAX_HEALTHY_ERROR_RATE = 0.5
+UNHEALTHY_RETRY_INTERVAL = 30
+LATENCY_SAMPLE_COUNT = 100
+MIN_HEDGE_LATENCY_SAMPLE_COUNT = 10
+MIN_HEDGE_DELAY = 0.05
+UNKNOWN_LATENCY_ESTIMATE = 0.001
+EXPLORATION_PROBABILITY = 0.05
+MAX_HEDGE_THREADS = 128
+
+# path segments that identify a resource (heights, ids, hashes, addresses) rather than an endpoint
+RESOURCE_PATH_SEGMENT_PATTERN = re.compile(r'^(\d+|[0-9A-Fa-f]{16,}|[A-Z0-9]{39,40})$')
+
+
+def make_endpoint_key(method, url):
+	"""Makes the key of the endpoint of a request, which is shared by all requests differing only by resource or query."""
+
+	path_segments = urlsplit(url).path.split('/')
+	return f'{method} ' + '/'.join('{}' if RESOURCE_PATH_SEGMENT_PATTERN.match(segment) else segment for segment in path_segments)
+
+
+class NodeStatistics:
+	def __init__(self):
+		self.latency = None
+		self.error_rate = 0.0
+		self.last_failure_time = None
+		self.in_flight_count = 0
+		self.endpoint_to_latency_samples_map = {}
+
+	def is_healthy(self, now):
+		if self.error_rate < MAX_HEALTHY_ERROR_RATE:
+			return True
+
+		# give failing nodes an occasional chance to recover
+		return now - self.last_failure_time > UNHEALTHY_RETRY_INTERVAL
+
+	@property
+	def expected_latency(self):
+		# nodes without measurements are optimistically assumed to be fast so that each one is tried
+		latency = UNKNOWN_LATENCY_ESTIMATE if self.latency is None else self.latency
+		return latency * (1 + self.in_flight_count)
+
+
+class NodePool:
+	"""
+	Tracks moving latency and error rates of interchangeable nodes and selects the fastest healthy one for each call.
+	Error rates are measured per call, while latencies are measured per request so that calls sending many requests are comparable.
+	"""
+
+	def __init__(self, hosts, hedge_percentile=0.9):
+		self.hosts = list(hosts)
+		self.hedge_percentile = hedge_percentile
+
+		self.lock = threading.Lock()
+		self.host_to_statistics_map = {host: NodeStatistics() for host in self.hosts}
+
+	def select(self, excluded_hosts=()):
+		"""Selects the fastest healthy host, falling back to the least failing one, and marks a request to it as in flight."""
+
+		now = time.monotonic()
+		with self.lock:
+			candidates = [
+				(host, statistics) for (host, statistics) in self.host_to_statistics_map.items() if host not in excluded_hosts
+			]
+			if not candidates:
+				return None
+
+			random.shuffle(candidates)
+			healthy_candidates = [(host, statistics) for (host, statistics) in candidates if statistics.is_healthy(now)]
+			if healthy_candidates and random.random() < EXPLORATION_PROBABILITY:
+				# occasionally pick any healthy node so that measurements of temporarily slow nodes are refreshed
+				(host, statistics) = healthy_candidates[0]
+			elif healthy_candidates:
+				(host, statistics) = min(healthy_candidates, key=lambda candidate: candidate[1].expected_latency)
+			else:
+				(host, statistics) = min(candidates, key=lambda candidate: candidate[1].error_rate)
+
+			statistics.in_flight_count += 1
+			return host
+
+	def record_latency(self, host, endpoint, latency):
+		with self.lock:
+			statistics = self.host_to_statistics_map[host]
+			statistics.latency = latency if statistics.latency is None else (
+				LATENCY_SMOOTHING_FACTOR * latency + (1 - LATENCY_SMOOTHING_FACTOR) * statistics.latency)
+
+			latency_samples = statistics.endpoint_to_latency_samples_map.get(endpoint)
+			if latency_samples is None:
+				latency_samples = deque(maxlen=LATENCY_SAMPLE_COUNT)
+				statistics.endpoint_to_latency_samples_map[endpoint] = latency_samples
+
+			latency_samples.append(latency)
+
+	def record_success(self, host):
+		with self.lock:
+			statistics = self.host_to_statistics_map[host]
+			statistics.in_flight_count -= 1
+			statistics.error_rate *= 1 - ERROR_RATE_SMOOTHING_FACTOR
+
+	def record_failure(self, host):
+		with self.lock:
+			statistics = self.host_to_statistics_map[host]
+			statistics.in_flight_count -= 1
+			statistics.error_rate = ERROR_RATE_SMOOTHING_FACTOR + (1 - ERROR_RATE_SMOOTHING_FACTOR) * statistics.error_rate
+			statistics.last_failure_time = time.monotonic()
+
+	def release(self, host):
+		"""Ends an in flight request without recording its outcome."""
+
+		with self.lock:
+			self.host_to_statistics_map[host].in_flight_count -= 1
+
+	def get_hedge_delay(self, host, endpoint):
+		"""
+		Gets the time after which a request to endpoint of host should be duplicated to another node
+		or None when hedging is not possible.
+		"""
+
+		with self.lock:
+			if len(self.hosts) < 2:
+				return None
+
+			latency_samples = sorted(self.host_to_statistics_map[host].endpoint_to_latency_samples_map.get(endpoint, ()))
+
+		if len(latency_samples) < MIN_HEDGE_LATENCY_SAMPLE_COUNT:
+			return None
+
+		return max(MIN_HEDGE_DELAY, latency_samples[min(len(latency_samples) - 1, int(len(latency_samples) * self.hedge_percentile))])
+
+
+class NodePoolSession:
+	"""
+	Session of a node in a pool that measures the latency of each request and hedges idempotent requests.
+	GET requests that have not completed within a latency percentile of their endpoint on the node are duplicated to a second node,
+	and the first successful response is used. POST requests and streamed responses are only ever sent to the node.
+	"""
+
+	def __init__(self, node_pool, host, get_node_session):
+		self.node_pool = node_pool
+		self.host = host
+		self.get_node_session = get_node_session
+
+	def get(self, url, **kwargs):
+		endpoint = make_endpoint_key('GET', url)
+		hedge_delay = None if kwargs.get('stream') else self.node_pool.get_hedge_delay(self.host, endpoint)
+		if hedge_delay is None:
+			return self._send(self.host, 'get', endpoint, url, kwargs)
+
+		futures = {_HEDGE_EXECUTOR.submit(self._send, self.host, 'get', endpoint, url, kwargs)}
+		(done_futures, _) = wait(futures, hedge_delay)
+		if not done_futures:
+			hedge_host = self.node_pool.select((self.host,))
+			if hedge_host:
+				futures.add(_HEDGE_EXECUTOR.submit(self._send_hedged, hedge_host, endpoint, url, kwargs))
+
+		error = None
+		while futures:
+			(done_futures, futures) = wait(futures, return_when=FIRST_COMPLETED)
+			for future in done_futures:
+				if future.exception():
+					error = future.exception()
+					continue
+
+				# the slower duplicate is discarded whenever it completes
+				return future.result()
+
+		raise error
+
+	def post(self, url, **kwargs):
+		return self._send(self.host, 'post', make_endpoint_key('POST', url), url, kwargs)
+
+	def _send(self, host, method_name, endpoint, url, kwargs):
+		# pylint: disable=too-many-arguments
+
+		start_time = time.monotonic()
+		response = getattr(self.get_node_session(host), method_name)(_replace_url_host(url, host), **kwargs)
+		if response.ok:
+			# streamed responses are measured until their headers arrive, like by HTTP_METRICS
+			self.node_pool.record_latency(host, endpoint, time.monotonic() - start_time)
+
+		return response
+
+	def _send_hedged(self, host, endpoint, url, kwargs):
+		# duplicates are tracked like calls to their node, so that the node is neither overloaded nor kept if failing
+		try:
+			response = self._send(host, 'get', endpoint, url, kwargs)
+		except RequestException:
+			self.node_pool.record_failure(host)
+			raise
+		except BaseException:
+			self.node_pool.release(host)
+			raise
+
+		self.node_pool.record_success(host)
+		return response
+
+
+def _replace_url_host(url, host):
+	url_parts = urlsplit(url)
+	if host == url_parts.hostname:
+		return url
+
+	return url_parts._replace(netloc=f'{host}:{url_parts.port}' if url_parts.port else host).geturl()
+
+
+class NodePoolClient:
+	"""
+	Api client that sends each call to the best node in a pool instead of a fixed node.
+	Every node is accessed through its own api client, so per node state (supported lookups, cached node state) is never shared.
+	Requests of these clients are sent by NodePoolSession, which hedges slow GET requests.
+	Calls that fail are retried once on another node.
+	"""
+
+	def __init__(self, node_pool, create_api_client):
+		self.node_pool = node_pool
+		self.create_api_client = create_api_client
+
+		self.lock = threading.Lock()
+		self.host_to_api_client_map = {}
+		self.host_to_session_map = {}
+
+	def get_api_client(self, host):
+		"""Gets the api client of a node in the pool."""
+
+		with self.lock:
+			api_client = self.host_to_api_client_map.get(host)
+			if not api_client:
+				api_client = self.create_api_client(host)
+				self.host_to_session_map[host] = api_client.session
+				api_client.session = NodePoolSession(self.node_pool, host, self._get_node_session)
+				self.host_to_api_client_map[host] = api_client
+
+			return api_client
+
+	def _get_node_session(self, host):
+		self.get_api_client(host)
+		with self.lock:
+			return self.host_to_session_map[host]
+
+	def __getattr__(self, name):
+		# properties (like network) are the same for all nodes, so they are read from any node
+		attribute = getattr(self.get_api_client(self.node_pool.hosts[0]), name)
+		if not callable(attribute):
+			return attribute
+
+		def call(*args, **kwargs):
+			return self._call(name, args, kwargs)
+
+		return call
+
+	def _call(self, name, args, kwargs):
+		host = self.node_pool.select()
+		try:
+			return self._call_node(host, name, args, kwargs)
+		except RequestException:
+			failover_host = self.node_pool.select((host,))
+			if not failover_host:
+				raise
+
+		return self._call_node(failover_host, name, args, kwargs)
+
+	def _call_node(self, host, name, args, kwargs):
+		try:
+			result = getattr(self.get_api_client(host), name)(*args, **kwargs)
+		except RequestException:
+			self.node_pool.record_failure(host)
+			raise
+		except BaseException:
+			self.node_pool.release(host)
+			raise
+
+		self.node_pool.record_success(host)
+		return result
+
+
+class NodePoolRegistry:
+	"""Process-wide registry of node pools so that all clients using the same nodes share their measurements."""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.pools = {}
+
+	def get(self, hosts):
+		key = tuple(sorted(set(hosts)))
+		with self.lock:
+			if key not in self.pools:
+				self.pools[key] = NodePool(key)
+
+				# failing nodes of a pool can be avoided, so they are not worth waiting for
+				if len(key) > 1:
+					CIRCUIT_BREAKERS.guard(key)
+
+			return self.pools[key]
+
+
+_HEDGE_EXECUTOR = ThreadPoolExecutor(MAX_HEDGE_THREADS, thread_name_prefix='hedge')
+
+NODE_POOLS = NodePoolRegistry()
@@ -0,0 +1,46 @@
+import struct
+
+PACKET_HEADER = struct.Struct('<II')  # size, type
+
+# matches the default maxPacketDataSize of catapult nodes
+MAX_PACKET_SIZE = 150 * 1024 * 1024
+
+
+class PacketReader:
+	"""Sequentially unpacks fields from a packet payload using precompiled struct layouts, without copying the payload."""
+
+	def __init__(self, buffer):
+		self.buffer = memoryview(buffer)
+		self.position = 0
+
+	@property
+	def remaining_size(self):
+		return len(self.buffer) - self.position
+
+	def read(self, layout):
+		values = layout.unpack_from(self.buffer, self.position)
+		self.position += layout.size
+		return values
+
+	def read_bytes(self, size):
+		if size > self.remaining_size:
+			raise struct.error(f'unable to read {size} bytes at position {self.position} from packet of size {len(self.buffer)}')
+
+		view = self.buffer[self.position:self.position + size]
+		self.position += size
+		return view
+
+
+def receive_into(sock, view):
+	"""Fills view completely from sock and returns the number of bytes received, which is short only when the connection closes."""
+
+	view = memoryview(view)
+	num_bytes_received = 0
+	while num_bytes_received < len(view):
+		num_bytes = sock.recv_into(view[num_bytes_received:])
+		if not num_bytes:
+			break
+
+		num_bytes_received += num_bytes
+
+	return num_bytes_received
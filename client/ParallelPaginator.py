@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PAGE_WINDOW_SIZE = 4
+
+
+class ParallelPaginator:
+	"""
+	Iterates over the pages of an endpoint supporting random page access (e.g. Symbol pageNumber) by fetching a window of pages at once.
+	Pages are yielded in order. Items already yielded in earlier pages (e.g. shifted by new items while paging) are dropped.
+	No pages are requested beyond the first empty page or the first page crossing the cutoff.
+	"""
+
+	def __init__(self, fetch_page, get_item_id, is_past_cutoff=None, window_size=DEFAULT_PAGE_WINDOW_SIZE):
+		self.fetch_page = fetch_page
+		self.get_item_id = get_item_id
+		self.is_past_cutoff = is_past_cutoff or (lambda _: False)
+		self.window_size = window_size
+
+	def __iter__(self):
+		seen_item_ids = set()
+		with ThreadPoolExecutor(self.window_size) as executor:
+			page_number_to_future_map = {}
+			next_page_number = 1
+			next_request_page_number = 1
+			is_last_page_found = False
+			try:
+				while True:
+					while not is_last_page_found and next_request_page_number < next_page_number + self.window_size:
+						page_number_to_future_map[next_request_page_number] = executor.submit(self.fetch_page, next_request_page_number)
+						next_request_page_number += 1
+
+					page = page_number_to_future_map.pop(next_page_number).result()
+					next_page_number += 1
+					if not page:
+						return
+
+					if self.is_past_cutoff(page):
+						# no later page is needed, so only pages already in flight are waited for
+						is_last_page_found = True
+						for future in page_number_to_future_map.values():
+							future.cancel()
+
+					page = [item for item in page if self.get_item_id(item) not in seen_item_ids]
+					seen_item_ids.update(self.get_item_id(item) for item in page)
+					if page:
+						yield page
+
+					if is_last_page_found:
+						return
+			finally:
+				for future in page_number_to_future_map.values():
+					future.cancel()
@@ -0,0 +1,102 @@
+import ssl
+import threading
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+HandshakeStatistics = namedtuple('HandshakeStatistics', ['full', 'resumed'])
+
+
+class PeerSslContext:
+	"""
+	Client SSL context for peer connections, loaded once per certificate directory.
+	TLS sessions are remembered per node so that subsequent connections resume them instead of performing full handshakes.
+	"""
+
+	def __init__(self, certificate_directory, max_session_count=10000):
+		certificate_directory = Path(certificate_directory)
+
+		self.ssl_context = ssl.create_default_context()
+		self.ssl_context.check_hostname = False
+		self.ssl_context.verify_mode = ssl.CERT_NONE
+		self.ssl_context.load_cert_chain(
+			certificate_directory / 'node.full.crt.pem',
+			keyfile=certificate_directory / 'node.key.pem')
+
+		self.max_session_count = max_session_count
+		self.lock = threading.Lock()
+		self.sessions = OrderedDict()
+
+		self.full_handshakes = 0
+		self.resumed_handshakes = 0
+
+	@property
+	def statistics(self):
+		with self.lock:
+			return HandshakeStatistics(self.full_handshakes, self.resumed_handshakes)
+
+	def wrap_socket(self, sock, host, port, do_handshake_on_connect=True):
+		"""
+		Wraps a connected socket, resuming the last TLS session with the node when one is available.
+		When the handshake is deferred (e.g. for non-blocking sockets), record_handshake should be called once it completes.
+		"""
+
+		with self.lock:
+			session = self.sessions.get((host, port))
+
+		try:
+			ssock = self.ssl_context.wrap_socket(sock, do_handshake_on_connect=do_handshake_on_connect, session=session)
+		except ssl.SSLError:
+			self.discard_session(host, port)
+			raise
+
+		if do_handshake_on_connect:
+			self.record_handshake(ssock)
+
+		return ssock
+
+	def record_handshake(self, ssock):
+		with self.lock:
+			if ssock.session_reused:
+				self.resumed_handshakes += 1
+			else:
+				self.full_handshakes += 1
+
+	def save_session(self, ssock, host, port):
+		"""
+		Remembers the TLS session of a connection for resumption.
+		TLS 1.3 session tickets are only delivered after the handshake, so this should be called after a response has been read.
+		"""
+
+		session = ssock.session
+		if not session:
+			return
+
+		with self.lock:
+			self.sessions[(host, port)] = session
+			self.sessions.move_to_end((host, port))
+			if len(self.sessions) > self.max_session_count:
+				self.sessions.popitem(last=False)
+
+	def discard_session(self, host, port):
+		with self.lock:
+			self.sessions.pop((host, port), None)
+
+
+class PeerSslContextRegistry:
+	"""Process-wide registry of peer SSL contexts, one per certificate directory."""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.contexts = {}
+
+	def get(self, certificate_directory):
+		key = Path(certificate_directory).resolve()
+
+		with self.lock:
+			if key not in self.contexts:
+				self.contexts[key] = PeerSslContext(key)
+
+			return self.contexts[key]
+
+
+PEER_SSL_CONTEXTS = PeerSslContextRegistry()
@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PrefetchingPager:
+	"""
+	Iterates over the pages of an endpoint paginated by cursor (e.g. NEM id based pages), which can only be requested one after another.
+	Each next page is requested in the background as soon as its cursor is known, so that it downloads while the current page is processed.
+	"""
+
+	def __init__(self, fetch_page, get_next_cursor, process_page, start_cursor=None):
+		self.fetch_page = fetch_page
+		self.get_next_cursor = get_next_cursor
+		self.process_page = process_page
+		self.start_cursor = start_cursor
+
+	def __iter__(self):
+		with ThreadPoolExecutor(1) as executor:
+			future = executor.submit(self.fetch_page, self.start_cursor)
+			try:
+				while future:
+					page = future.result()
+
+					next_cursor = self.get_next_cursor(page)
+					future = None if next_cursor is None else executor.submit(self.fetch_page, next_cursor)
+
+					processed_page = self.process_page(page)
+					if processed_page:
+						yield processed_page
+			finally:
+				if future:
+					future.cancel()
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import namedtuple
+
+import yaml
+
+DEFAULT_HOST = 'default'
+
+RateLimit = namedtuple('RateLimit', ['requests_per_minute', 'burst'])
+RateLimiterStatistics = namedtuple('RateLimiterStatistics', ['throttled_request_count', 'throttled_time'])
+
+# published limits of public services (mirrored in templates/rate_limits.yaml); nodes are not limited unless configured
+DEFAULT_RATE_LIMITS = {
+	'api.coingecko.com': RateLimit(10, 1),
+	'ip-api.com': RateLimit(15, 1)
+}
+
+
+class TokenBucket:
+	"""
+	Token bucket that refills at a constant rate up to burst tokens.
+	Every request takes a token, possibly in advance, so concurrent callers are spaced out in the order they arrive.
+	"""
+
+	def __init__(self, rate_limit):
+		self.rate = rate_limit.requests_per_minute / 60
+		self.burst = max(1, rate_limit.burst)
+
+		self.lock = threading.Lock()
+		self.tokens = self.burst
+		self.update_time = time.monotonic()
+
+	def reserve(self):
+		"""Takes a token and returns the number of seconds the caller must wait before using it."""
+
+		with self.lock:
+			self._refill()
+			self.tokens -= 1
+			return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+	def try_take(self):
+		"""Takes a token only if one is available now, otherwise returns the number of seconds until one will be."""
+
+		with self.lock:
+			self._refill()
+			if self.tokens >= 1:
+				self.tokens -= 1
+				return 0
+
+			return (1 - self.tokens) / self.rate
+
+	def _refill(self):
+		now = time.monotonic()
+		self.tokens = min(self.burst, self.tokens + (now - self.update_time) * self.rate)
+		self.update_time = now
+
+
+class RateLimiters:
+	"""
+	Process-wide per host rate limiters shared by all threads and sessions.
+	Limits are requests per minute (with a burst allowance) per host name; the 'default' entry, if any, applies to all other hosts.
+	"""
+
+	def __init__(self, rate_limits=None):
+		self.lock = threading.Lock()
+		self.rate_limits = dict(DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits)
+		self.host_to_bucket_map = {}
+
+		self.throttled_request_count = 0
+		self.throttled_time = 0
+
+	@property
+	def statistics(self):
+		with self.lock:
+			return RateLimiterStatistics(self.throttled_request_count, self.throttled_time)
+
+	def configure(self, config_filepath):
+		"""Overrides rate limits with the ones in a yaml file mapping host names to requests_per_minute and (optional) burst."""
+
+		if not config_filepath:
+			return
+
+		with open(config_filepath, 'rt', encoding='utf8') as infile:
+			descriptors = yaml.load(infile, Loader=yaml.SafeLoader) or {}
+
+		with self.lock:
+			for (host, descriptor) in descriptors.items():
+				if descriptor is None:
+					self.rate_limits.pop(host, None)
+				else:
+					self.rate_limits[host] = RateLimit(float(descriptor['requests_per_minute']), int(descriptor.get('burst', 1)))
+
+			self.host_to_bucket_map = {}
+
+	def acquire(self, host):
+		"""Waits until a request can be sent to host and returns the number of seconds waited."""
+
+		wait_time = self._reserve(host)
+		if wait_time:
+			time.sleep(wait_time)
+
+		return wait_time
+
+	def _reserve(self, host):
+		with self.lock:
+			bucket = self.host_to_bucket_map.get(host)
+			if not bucket:
+				rate_limit = self.rate_limits.get(host, self.rate_limits.get(DEFAULT_HOST))
+				if not rate_limit:
+					return 0
+
+				bucket = TokenBucket(rate_limit)
+				self.host_to_bucket_map[host] = bucket
+
+		wait_time = bucket.reserve()
+		if wait_time:
+			with self.lock:
+				self.throttled_request_count += 1
+				self.throttled_time += wait_time
+
+		return wait_time
+
+
+RATE_LIMITERS = RateLimiters()
@@ -8,6 +8,7 @@ from symbolchain.facade.SymbolFacade import SymbolFacade
 from symbolchain.NodeDescriptorRepository import NodeDescriptorRepository
 
 from .NemClient import NemClient
+from .NodePool import NODE_POOLS, NodePoolClient
 from .SymbolClient import SymbolClient
 
 Resources = namedtuple('Resources', [
@@ -34,9 +35,27 @@ def locate_blockchain_client_class(resources):
 	return NemClient if 'nem' == resources.friendly_name else SymbolClient
 
 
-def create_blockchain_api_client(resources, node_role=None, **kwargs):
-	node_host = random.choice(resources.nodes.find_all_by_role(node_role)).host
-	return locate_blockchain_client_class(resources)(node_host, **kwargs)
+def create_blockchain_api_client(resources, node_role=None, use_node_pool=False, **kwargs):
+	"""Creates an api client for a random node with node_role or, when use_node_pool is set, a pooled client over all of them."""
+
+	return create_blockchain_api_client_for_nodes(resources, resources.nodes.find_all_by_role(node_role), use_node_pool, **kwargs)
+
+
+def create_pooled_blockchain_api_client(resources, node_descriptors, **kwargs):
+	"""Creates an api client that sends each call to the fastest healthy node among node_descriptors."""
+
+	node_pool = NODE_POOLS.get(node_descriptor.host for node_descriptor in node_descriptors)
+	api_client_class = locate_blockchain_client_class(resources)
+	return NodePoolClient(node_pool, lambda host: api_client_class(host, **kwargs))
+
+
+def create_blockchain_api_client_for_nodes(resources, node_descriptors, use_node_pool=False, **kwargs):
+	"""Creates an api client for a random node among node_descriptors or, when use_node_pool is set, a pooled client over all of them."""
+
+	if use_node_pool:
+		return create_pooled_blockchain_api_client(resources, node_descriptors, **kwargs)
+
+	return locate_blockchain_client_class(resources)(random.choice(node_descriptors).host, **kwargs)
 
 
 def create_blockchain_facade(resources):
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+# cache lifetimes
+IMMUTABLE = None
+UNCACHED = 0
+
+# endpoint cache policies
+IMMUTABLE_POLICY = 'immutable'
+FINALIZED_POLICY = 'finalized'  # immutable once the height of the response is finalized, per block before
+PER_BLOCK_POLICY = 'per_block'
+NODE_PER_BLOCK_POLICY = 'node_per_block'  # per block and specific to the queried node
+
+CacheEntry = namedtuple('CacheEntry', ['content', 'expiry_time'])
+ResponseCacheStatistics = namedtuple('ResponseCacheStatistics', ['memory_hits', 'disk_hits', 'misses', 'memory_size', 'disk_size'])
+
+
+class ResponseCache:
+	"""
+	Two tier cache of raw REST response bodies keyed by request.
+	Entries are either immutable or expire after a lifetime; both tiers evict least recently used entries beyond their size limits.
+	The optional disk tier survives across runs.
+	"""
+
+	def __init__(self, max_memory_size=64 * 1024 * 1024):
+		self.max_memory_size = max_memory_size
+		self.directory = None
+		self.max_disk_size = 0
+
+		self.lock = threading.Lock()
+		self.entries = OrderedDict()
+		self.memory_size = 0
+		self.disk_size = 0
+
+		self.memory_hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+
+	@property
+	def statistics(self):
+		with self.lock:
+			return ResponseCacheStatistics(self.memory_hits, self.disk_hits, self.misses, self.memory_size, self.disk_size)
+
+	def configure(self, directory, max_disk_size=1024 * 1024 * 1024):
+		"""Enables (or disables when directory is None) the disk tier."""
+
+		with self.lock:
+			self.directory = Path(directory) if directory else None
+			self.max_disk_size = max_disk_size
+			self.disk_size = 0
+			if self.directory:
+				self.directory.mkdir(parents=True, exist_ok=True)
+				self.disk_size = sum(filepath.stat().st_size for filepath in self.directory.glob('*.json'))
+
+	@staticmethod
+	def make_key(*parts):
+		return '|'.join(json.dumps(part, sort_keys=True) if isinstance(part, (dict, list)) else str(part) for part in parts)
+
+	def get(self, key):
+		"""Gets the cached content for key or None when it is not cached or has expired."""
+
+		now = time.time()
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry and self._is_fresh(entry, now):
+				self.entries.move_to_end(key)
+				self.memory_hits += 1
+				return entry.content
+
+			if entry:
+				self._remove(key)
+
+		entry = self._load(key, now)
+
+		with self.lock:
+			if not entry:
+				self.misses += 1
+				return None
+
+			self.disk_hits += 1
+			self._insert(key, entry)
+			return entry.content
+
+	def put(self, key, content, lifetime):
+		"""Caches content for key, forever when lifetime is IMMUTABLE or for lifetime seconds otherwise."""
+
+		if UNCACHED == lifetime:
+			return
+
+		entry = CacheEntry(bytes(content), None if IMMUTABLE == lifetime else time.time() + lifetime)
+		with self.lock:
+			self._insert(key, entry)
+
+		self._store(key, entry)
+
+	def clear(self):
+		with self.lock:
+			self.entries = OrderedDict()
+			self.memory_size = 0
+
+	@staticmethod
+	def _is_fresh(entry, now):
+		return entry.expiry_time is None or now < entry.expiry_time
+
+	def _insert(self, key, entry):
+		if len(entry.content) > self.max_memory_size:
+			return
+
+		if key in self.entries:
+			self._remove(key)
+
+		self.entries[key] = entry
+		self.memory_size += len(entry.content)
+		while self.memory_size > self.max_memory_size:
+			self._remove(next(iter(self.entries)))
+
+	def _remove(self, key):
+		self.memory_size -= len(self.entries.pop(key).content)
+
+	def _get_filepath(self, key):
+		return self.directory / f'{hashlib.sha256(key.encode("utf8")).hexdigest()}.json'
+
+	def _load(self, key, now):
+		if not self.directory:
+			return None
+
+		filepath = self._get_filepath(key)
+		try:
+			with open(filepath, 'rb') as infile:
+				expiry_time = json.loads(infile.readline())
+				entry = CacheEntry(infile.read(), expiry_time)
+		except (OSError, ValueError):
+			return None
+
+		if not self._is_fresh(entry, now):
+			with self.lock:
+				self._unlink(filepath)
+
+			return None
+
+		# touch the file so that disk eviction is least recently used
+		try:
+			os.utime(filepath)
+		except OSError:
+			pass
+
+		return entry
+
+	def _store(self, key, entry):
+		if not self.directory or len(entry.content) > self.max_disk_size:
+			return
+
+		filepath = self._get_filepath(key)
+		with tempfile.NamedTemporaryFile('wb', dir=self.directory, suffix='.tmp', delete=False) as outfile:
+			outfile.write(json.dumps(entry.expiry_time).encode('utf8') + b'\n')
+			outfile.write(entry.content)
+
+		previous_size = filepath.stat().st_size if filepath.exists() else 0
+		os.replace(outfile.name, filepath)
+
+		with self.lock:
+			self.disk_size += filepath.stat().st_size - previous_size
+			if self.disk_size > self.max_disk_size:
+				self._evict_disk()
+
+	def _evict_disk(self):
+		filepaths = sorted(self.directory.glob('*.json'), key=lambda filepath: filepath.stat().st_mtime)
+		for filepath in filepaths:
+			if self.disk_size <= self.max_disk_size * 0.9:
+				break
+
+			self._unlink(filepath)
+
+	def _unlink(self, filepath):
+		try:
+			size = filepath.stat().st_size
+			filepath.unlink()
+			self.disk_size -= size
+		except OSError:
+			pass
+
+
+class EndpointCachePolicies:
+	"""Classifies REST endpoints by (method, rest path pattern) rules; endpoints without a matching rule are not cached."""
+
+	def __init__(self, rules, block_lifetime):
+		self.rules = [(method, re.compile(pattern), policy) for (method, pattern, policy) in rules]
+		self.block_lifetime = block_lifetime
+
+	def find(self, method, rest_path):
+		for (rule_method, pattern, policy) in self.rules:
+			if method == rule_method and pattern.fullmatch(rest_path):
+				return policy
+
+		return None
+
+	def get_lifetime(self, policy, is_finalized):
+		if IMMUTABLE_POLICY == policy or (FINALIZED_POLICY == policy and is_finalized):
+			return IMMUTABLE
+
+		return self.block_lifetime
+
+
+def tee_chunks(chunks, received_chunks):
+	"""Passes through chunks while also appending them to received_chunks."""
+
+	for chunk in chunks:
+		received_chunks.append(chunk)
+		yield chunk
+
+
+RESPONSE_CACHE = ResponseCache()
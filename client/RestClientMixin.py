@@ -0,0 +1,117 @@
+import json
+
+from requests.exceptions import HTTPError
+
+from .HttpSessionRegistry import HTTP_SESSIONS
+from .JsonStream import STREAM_CHUNK_SIZE, iter_json_values
+from .ResponseCache import FINALIZED_POLICY, NODE_PER_BLOCK_POLICY, RESPONSE_CACHE, tee_chunks
+
+# statuses of nodes that do not provide an endpoint (missing, disabled, local only or not implemented), as opposed to failing temporarily
+UNSUPPORTED_ENDPOINT_STATUS_CODES = (401, 403, 404, 405, 501)
+
+
+class RestClientMixin:
+	"""
+	JSON REST transport shared by node api clients, with responses cached as configured by their response_cache_policies.
+	Clients provide node_host, node_port, _block_namespace, _find_response_height and _is_finalized, which refreshes their finalized height.
+	"""
+
+	response_cache_policies = None
+
+	def __init__(self, **kwargs):
+		self.session_kwargs = kwargs
+		self._session = None
+
+	@property
+	def session(self):
+		# sessions are shared by all clients of a host and only looked up once needed,
+		# so clients that are created but never used (e.g. for already visited peers) are cheap
+		if not self._session:
+			self._session = HTTP_SESSIONS.get(self.node_host, **self.session_kwargs)
+
+		return self._session
+
+	@session.setter
+	def session(self, session):
+		self._session = session
+
+	def _find_response_cache_key(self, method, rest_path, params=None):
+		"""Gets the cache policy and key of a request or (None, None) when its response must not be cached."""
+
+		cache_policy = self.response_cache_policies.find(method, rest_path)
+		if not cache_policy:
+			return (None, None)
+
+		scope = f'{self._block_namespace}@{self.node_host}:{self.node_port}' if NODE_PER_BLOCK_POLICY == cache_policy else self._block_namespace
+		return (cache_policy, RESPONSE_CACHE.make_key(scope, method, rest_path, params))
+
+	def _get_response_cache_lifetime(self, cache_policy, json_response):
+		# the finalized height is refreshed as needed, so finalized responses are cached as immutable even without a block header index
+		height = self._find_response_height(json_response) if FINALIZED_POLICY == cache_policy else None
+		return self.response_cache_policies.get_lifetime(cache_policy, height is not None and self._is_finalized(height))
+
+	def _get_json(self, rest_path):
+		return self._request_json('GET', rest_path)
+
+	def _get_json_values(self, rest_path, patterns):
+		(cache_policy, cache_key) = self._find_response_cache_key('GET', rest_path)
+		content = RESPONSE_CACHE.get(cache_key) if cache_key else None
+		if content is not None:
+			yield from iter_json_values([content], patterns)
+			return
+
+		json_http_headers = {'Content-type': 'application/json'}
+		url = f'http://{self.node_host}:{self.node_port}/{rest_path}'
+		with self.session.get(url, headers=json_http_headers, stream=True) as response:
+			if not response.ok:
+				# error objects would not match any pattern, so they are raised instead of silently yielding no values
+				raise HTTPError(f'{rest_path} from {self.node_host} failed with status code {response.status_code}: {response.text}')
+
+			if not cache_key:
+				yield from iter_json_values(response.iter_content(STREAM_CHUNK_SIZE), patterns)
+				return
+
+			# keep the streamed body so that it can be cached after it has been read completely
+			chunks = []
+			chunk_iterator = tee_chunks(response.iter_content(STREAM_CHUNK_SIZE), chunks)
+			yield from iter_json_values(chunk_iterator, patterns)
+			for _ in chunk_iterator:
+				pass
+
+			RESPONSE_CACHE.put(cache_key, b''.join(chunks), self.response_cache_policies.get_lifetime(cache_policy, False))
+
+	def _post_json(self, rest_path, params):
+		return self._request_json('POST', rest_path, params)
+
+	def _request_json(self, method, rest_path, params=None, raise_for_status=False):
+		(cache_policy, cache_key) = self._find_response_cache_key(method, rest_path, params)
+		content = RESPONSE_CACHE.get(cache_key) if cache_key else None
+		if content is not None:
+			return json.loads(content)
+
+		json_http_headers = {'Content-type': 'application/json'}
+		url = f'http://{self.node_host}:{self.node_port}/{rest_path}'
+		if 'GET' == method:
+			response = self.session.get(url, headers=json_http_headers)
+		else:
+			response = self.session.post(url, json=params, headers=json_http_headers)
+
+		if raise_for_status:
+			response.raise_for_status()
+
+		json_response = response.json()
+		if cache_key and response.ok:
+			RESPONSE_CACHE.put(cache_key, response.content, self._get_response_cache_lifetime(cache_policy, json_response))
+
+		return json_response
+
+	def _try_post_json(self, rest_path, params):
+		"""Posts params to an optional endpoint or returns None when the node does not support it; other failures are raised."""
+
+		try:
+			return self._request_json('POST', rest_path, params, True)
+		except HTTPError as ex:
+			if ex.response is None or ex.response.status_code not in UNSUPPORTED_ENDPOINT_STATUS_CODES:
+				raise
+
+			return None
@@ -1,21 +1,43 @@
 import socket
-import ssl
+import struct
 from binascii import unhexlify
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from symbolchain.BufferReader import BufferReader
-from symbolchain.BufferWriter import BufferWriter
 from symbolchain.CryptoTypes import Hash256, PublicKey
 from symbolchain.symbol.Network import Address, Network, NetworkTimestamp
 from zenlog import log
 
+from .AccountBatch import order_account_infos, split_account_batches
+from .AccountMatchContext import AccountMatchContext, AccountMatchContexts, parse_transactions
+from .AdaptivePageSize import PageSizeLimits
+from .BlockHeaderIndex import BLOCK_HEADER_INDEXES, FinalizedHeightTracker
+from .BlockMetadataCache import BLOCK_METADATA_CACHE, BlockMetadata
+from .JsonStream import ANY_INDEX
+from .PacketReader import MAX_PACKET_SIZE, PACKET_HEADER, PacketReader, receive_into
+from .PeerSslContext import PEER_SSL_CONTEXTS
 from .pod import TransactionSnapshot
-from .TimeoutHTTPAdapter import create_http_session
+from .ResponseCache import FINALIZED_POLICY, IMMUTABLE_POLICY, NODE_PER_BLOCK_POLICY, PER_BLOCK_POLICY, EndpointCachePolicies
+from .RestClientMixin import RestClientMixin
 
 FinalizationInfo = namedtuple('FinalizationInfo', ['epoch', 'point', 'height'])
 VotingPublicKey = namedtuple('VotingPublicKey', ['start_epoch', 'end_epoch', 'public_key'])
 
+# server side filter of history requests by (receipt or transaction) types and inclusive height range
+HistoryFilter = namedtuple('HistoryFilter', ['types', 'from_height', 'to_height'], defaults=(None, None, None))
+
+CHAIN_STATISTICS_PACKET_TYPE = 5
+NODE_INFO_PACKET_TYPE = 0x111
+PEERS_PACKET_TYPE = 0x113
+
+# height, finalized height, score high, score low
+CHAIN_STATISTICS_RESPONSE = struct.Struct('<QQQQ')
+
+# size, version, public key, network generation hash seed, roles, port, network identifier, host size, friendly name size
+NODE_INFO_RESPONSE = struct.Struct('<II32s32sIHBBB')
+NODE_INFO_SIZE = struct.Struct('<I')
+
 
 XYM_NETWORK_MOSAIC_IDS_MAP = {
 	0x68: '6BED913FA20223F8',
@@ -24,6 +46,9 @@ XYM_NETWORK_MOSAIC_IDS_MAP = {
 }
 
 MICROXYM_PER_XYM = 1000000.0
+MAX_TRANSACTIONS_PER_BATCH_REQUEST = 100
+MAX_PARALLEL_TRANSACTION_REQUESTS = 4
+PAGE_SIZE_LIMITS = PageSizeLimits(10, 100)
 RECEIPT_TYPES = {
 	'harvest': 0x2143,
 	'inflation': 0x5143,
@@ -38,8 +63,31 @@ TRANSACTION_TYPES = {
 	'aggregate_bonded': 0x4241
 }
 
+# receipts changing balances of harvesters
+HARVEST_RECEIPT_TYPES = tuple(RECEIPT_TYPES[name] for name in ('harvest', 'hashlock_expired', 'secretlock_expired'))
+
+RESPONSE_CACHE_POLICIES = EndpointCachePolicies([
+	('GET', r'blocks/\d+', FINALIZED_POLICY),
+	('GET', r'transactions/confirmed/\w+', FINALIZED_POLICY),
+	('POST', r'transactions/confirmed', FINALIZED_POLICY),
+	('GET', r'finalization/proof/epoch/\d+', IMMUTABLE_POLICY),
+	('GET', r'(accounts|statements/transaction|transactions/confirmed)\?.*', PER_BLOCK_POLICY),
+
+	# state of the queried node, which differs between nodes that are not synced
+	('GET', r'chain/info|accounts/\w+|node/(info|peers)', NODE_PER_BLOCK_POLICY)
+], 30)
+
+VOTERS_JSON_PATTERNS = [
+	('messageGroups', ANY_INDEX, 'stage'),
+	('messageGroups', ANY_INDEX, 'signatures', ANY_INDEX, 'root', 'parentPublicKey')
+]
+
 
 class AccountInfo:
+	__slots__ = (
+		'address', 'address_name', 'balance', 'public_key', 'importance', 'remote_status', 'linked_public_key', 'voting_public_keys'
+	)
+
 	def __init__(self, address):
 		self.address = address
 		self.address_name = address
@@ -59,96 +107,115 @@ class SymbolPeerClient:
 		self.certificate_directory = Path(kwargs.get('certificate_directory'))
 		self.timeout = kwargs.get('timeout', 10)
 
-		self.ssl_context = ssl.create_default_context()
-		self.ssl_context.check_hostname = False
-		self.ssl_context.verify_mode = ssl.CERT_NONE
-		self.ssl_context.load_cert_chain(
-			self.certificate_directory / 'node.full.crt.pem',
-			keyfile=self.certificate_directory / 'node.key.pem')
+		self.ssl_context = PEER_SSL_CONTEXTS.get(self.certificate_directory)
 
 	def get_chain_height(self):
-		return self._send_socket_request(5, self._parse_chain_statistics_response)['height']
+		return self._send_socket_request(CHAIN_STATISTICS_PACKET_TYPE, self._parse_chain_statistics_response)['height']
 
 	def get_finalization_info(self):
 		# epoch and point are zeroed for now
-		return FinalizationInfo(0, 0, self._send_socket_request(5, self._parse_chain_statistics_response)['finalizedHeight'])
+		chain_statistics = self._send_socket_request(CHAIN_STATISTICS_PACKET_TYPE, self._parse_chain_statistics_response)
+		return FinalizationInfo(0, 0, chain_statistics['finalizedHeight'])
 
 	def get_node_info(self):
-		return self._send_socket_request(0x111, self._parse_node_info_response)
+		return self._send_socket_request(NODE_INFO_PACKET_TYPE, self._parse_node_info_response)
 
-	@staticmethod
-	def get_peers():
-		# not implemented
-		return []
+	def get_peers(self):
+		return self._send_socket_request(PEERS_PACKET_TYPE, self._parse_peers_response)
 
 	def _send_socket_request(self, packet_type, parser):
 		try:
 			with socket.create_connection((self.node_host, self.node_port), self.timeout) as sock:
-				with self.ssl_context.wrap_socket(sock) as ssock:
+				with self.ssl_context.wrap_socket(sock, self.node_host, self.node_port) as ssock:
 					self._send_simple_request(ssock, packet_type)
-					return parser(self._read_simple_response(ssock))
+					reader = self._read_simple_response(ssock)
+					self.ssl_context.save_session(ssock, self.node_host, self.node_port)
+					return parser(reader)
 		except socket.timeout as ex:
 			raise ConnectionRefusedError from ex
 
+	@staticmethod
+	def parse_response(packet_type, reader):
+		"""Parses the payload of a response packet of any supported type."""
+
+		parser = {
+			CHAIN_STATISTICS_PACKET_TYPE: SymbolPeerClient._parse_chain_statistics_response,
+			NODE_INFO_PACKET_TYPE: SymbolPeerClient._parse_node_info_response,
+			PEERS_PACKET_TYPE: SymbolPeerClient._parse_peers_response
+		}[packet_type]
+		return parser(reader)
+
 	@staticmethod
 	def _send_simple_request(ssock, packet_type):
-		writer = BufferWriter()
-		writer.write_int(8, 4)
-		writer.write_int(packet_type, 4)
-		ssock.send(writer.buffer)
+		ssock.sendall(PACKET_HEADER.pack(PACKET_HEADER.size, packet_type))
 
 	def _read_simple_response(self, ssock):
-		read_buffer = ssock.read()
-
-		if 0 == len(read_buffer):
+		header_buffer = bytearray(PACKET_HEADER.size)
+		num_header_bytes = receive_into(ssock, header_buffer)
+		if 0 == num_header_bytes:
 			raise ConnectionRefusedError(f'socket returned empty data for {self.node_host}')
 
-		size = BufferReader(read_buffer).read_int(4)
+		(size, _) = PACKET_HEADER.unpack_from(header_buffer) if PACKET_HEADER.size == num_header_bytes else (0, 0)
+		if size < PACKET_HEADER.size or size > MAX_PACKET_SIZE:
+			raise ConnectionRefusedError(f'socket returned malformed packet header for {self.node_host}')
 
-		while len(read_buffer) < size:
-			read_buffer = b''.join([read_buffer, ssock.read()])
+		# allocate the payload once and fill it in place
+		payload_buffer = bytearray(size - PACKET_HEADER.size)
+		if receive_into(ssock, payload_buffer) != len(payload_buffer):
+			raise ConnectionRefusedError(f'socket returned truncated packet for {self.node_host}')
 
-		reader = BufferReader(read_buffer)
-		reader.read_int(8)  # packet header
-		return reader
+		return PacketReader(payload_buffer)
 
 	@staticmethod
 	def _parse_chain_statistics_response(reader):
-		chain_statistics = {}
-
-		chain_statistics['height'] = reader.read_int(8)
-		chain_statistics['finalizedHeight'] = reader.read_int(8)
-		chain_statistics['scoreHigh'] = reader.read_int(8)
-		chain_statistics['scoreLow'] = reader.read_int(8)
-
-		return chain_statistics
+		(height, finalized_height, score_high, score_low) = reader.read(CHAIN_STATISTICS_RESPONSE)
+		return {'height': height, 'finalizedHeight': finalized_height, 'scoreHigh': score_high, 'scoreLow': score_low}
 
 	@staticmethod
 	def _parse_node_info_response(reader):
-		reader.read_int(4)  # size
+		(_, version, public_key, generation_hash_seed, roles, port, network_identifier, host_size, name_size) = reader.read(
+			NODE_INFO_RESPONSE)
 
 		node_info = {}
 
-		node_info['version'] = reader.read_int(4)
-		node_info['publicKey'] = PublicKey(reader.read_bytes(32))
-		node_info['networkGenerationHashSeed'] = str(Hash256(reader.read_bytes(32)))
-		node_info['roles'] = reader.read_int(4)
-		node_info['port'] = reader.read_int(2)
-		node_info['networkIdentifier'] = reader.read_int(1)
-
-		host_size = reader.read_int(1)
-		name_size = reader.read_int(1)
-		node_info['host'] = reader.read_bytes(host_size).decode('utf8')
-		node_info['friendlyName'] = reader.read_bytes(name_size).decode('utf8')
+		node_info['version'] = version
+		node_info['publicKey'] = PublicKey(public_key)
+		node_info['networkGenerationHashSeed'] = str(Hash256(generation_hash_seed))
+		node_info['roles'] = roles
+		node_info['port'] = port
+		node_info['networkIdentifier'] = network_identifier
+		node_info['host'] = str(reader.read_bytes(host_size), 'utf8')
+		node_info['friendlyName'] = str(reader.read_bytes(name_size), 'utf8')
 
 		return node_info
 
+	@staticmethod
+	def _parse_peers_response(reader):
+		# payload is a sequence of size prefixed node infos with the same layout as a node info response
+		peers = []
+		while reader.remaining_size:
+			start_position = reader.position
+			(size,) = NODE_INFO_SIZE.unpack_from(reader.buffer, start_position)
+			if size < NODE_INFO_RESPONSE.size or size > reader.remaining_size:
+				raise struct.error(f'peer node info at position {start_position} has invalid size {size}')
+
+			peers.append(SymbolPeerClient._parse_node_info_response(reader))
+			reader.position = start_position + size
+
+		return peers
+
+
+class SymbolClient(RestClientMixin):
+	response_cache_policies = RESPONSE_CACHE_POLICIES
+	page_size_limits = PAGE_SIZE_LIMITS
 
-class SymbolClient:
 	def __init__(self, host, port=3000, **kwargs):
-		self.session = create_http_session(**kwargs)
+		super().__init__(**kwargs)
 		(self.node_host, self.node_port) = (host, port)
 		self.network = Network.MAINNET
+		self.finalized_height_tracker = FinalizedHeightTracker()
+		self.is_batch_transaction_lookup_supported = True
+		self.account_match_contexts = AccountMatchContexts(self._create_account_match_context)
 
 	@staticmethod
 	def from_node_info_dict(dict_node_info, **kwargs):
@@ -163,23 +230,17 @@ class SymbolClient:
 
 	def get_finalization_info(self):
 		json_response = self._get_json('chain/info')
-		json_finalization_info = json_response['latestFinalizedBlock']
-		return FinalizationInfo(
-			int(json_finalization_info['finalizationEpoch']),
-			int(json_finalization_info['finalizationPoint']),
-			int(json_finalization_info['height']))
+		return self._parse_finalization_info(json_response)
 
 	def get_harvester_signer_public_key(self, height):
-		json_response = self._get_json(f'blocks/{height}')
-		return PublicKey(json_response['block']['signerPublicKey'])
+		return self._get_block_metadata(height).signer_public_key
 
 	def get_node_info(self):
 		json_response = self._get_json('node/info')
 		return json_response
 
 	def get_peers(self):
-		json_response = self._get_json('node/peers')
-		return json_response
+		return [json_peer for (_, json_peer) in self._get_json_values('node/peers', [(ANY_INDEX,)])]
 
 	def get_account_info(self, address, mosaic_id=None):
 		json_response = self._get_json(f'accounts/{address}')
@@ -189,15 +250,54 @@ class SymbolClient:
 
 		return self._parse_account_info(json_response['account'], mosaic_id)
 
+	def get_account_infos(self, addresses, mosaic_id=None):
+		json_account_containers = []
+		for address_batch in split_account_batches(addresses):
+			json_response = self._try_post_json('accounts', {'addresses': address_batch})
+			if isinstance(json_response, list):
+				json_account_containers.extend(json_response)
+				continue
+
+			log.warning(f'{self.node_host} does not support batch account lookups, falling back to individual requests')
+			for address in address_batch:
+				json_response = self._get_json(f'accounts/{address}')
+				if 'code' not in json_response:
+					json_account_containers.append(json_response)
+
+		account_infos = [
+			self._parse_account_info(json_account_container['account'], mosaic_id) for json_account_container in json_account_containers
+		]
+		return order_account_infos(addresses, account_infos)
+
 	def get_richlist_account_infos(self, page_number, page_size, mosaic_id):
+		# account infos are yielded as they arrive, so callers can stop reading the page early
 		url = f'accounts?pageNumber={page_number}&pageSize={page_size}&order=desc&orderBy=balance&mosaicId={mosaic_id}'
-		json_response = self._get_json(url)
+		for (_, json_account_container) in self._get_json_values(url, [('data', ANY_INDEX)]):
+			yield self._parse_account_info(json_account_container['account'], mosaic_id)
+
+	def get_voters(self, finalization_epoch):
+		return self._parse_voters(self._get_json_values(f'finalization/proof/epoch/{finalization_epoch}', VOTERS_JSON_PATTERNS))
+
+	def get_harvests(self, address, start_id=None, page_size=None, page_number=None, history_filter=None):
+		json_response = self._get_json(self._get_harvests_rest_path(address, start_id, page_size, page_number, history_filter))
 
-		account_infos = []
-		for json_account_container in json_response['data']:
-			account_infos.append(self._parse_account_info(json_account_container['account'], mosaic_id))
+		height_to_block_metadata_map = {height: self._get_block_metadata(height) for height in self._get_harvest_heights(json_response)}
+		return self._parse_harvests(address, json_response, height_to_block_metadata_map)
 
-		return account_infos
+	def get_transfers(self, address, start_id=None, page_size=None, page_number=None, history_filter=None):
+		json_response = self._get_json(self._get_transfers_rest_path(address, start_id, page_size, page_number, history_filter))
+
+		aggregate_hash_to_embedded_transactions_map = self._get_embedded_transactions_map(self._get_aggregate_hashes(json_response))
+		height_to_block_metadata_map = {height: self._get_block_metadata(height) for height in self._get_transfer_heights(json_response)}
+		return self._parse_transfers(address, json_response, height_to_block_metadata_map, aggregate_hash_to_embedded_transactions_map)
+
+	@staticmethod
+	def _parse_finalization_info(json_response):
+		json_finalization_info = json_response['latestFinalizedBlock']
+		return FinalizationInfo(
+			int(json_finalization_info['finalizationEpoch']),
+			int(json_finalization_info['finalizationPoint']),
+			int(json_finalization_info['height']))
 
 	@staticmethod
 	def _parse_account_info(json_account, mosaic_id=None):
@@ -230,23 +330,50 @@ class SymbolClient:
 
 		return account_info
 
-	def get_voters(self, finalization_epoch):
-		json_response = self._get_json(f'finalization/proof/epoch/{finalization_epoch}')
-
+	@staticmethod
+	def _parse_voters(json_path_values):
 		voters_map = {}
-		for json_message_group in json_response['messageGroups']:
-			stage = 'PRECOMMIT' if 1 == json_message_group['stage'] else 'PREVOTE'
-			for json_signature in json_message_group['signatures']:
-				voting_public_key = PublicKey(json_signature['root']['parentPublicKey'])
+
+		def add_votes(json_stage, voting_public_keys):
+			stage = 'PRECOMMIT' if 1 == json_stage else 'PREVOTE'
+			for voting_public_key in voting_public_keys:
 				if voting_public_key not in voters_map:
 					voters_map[voting_public_key] = []
 
 				voters_map[voting_public_key].append(stage)
 
+		# (streamed) voting public keys are buffered per message group until the stage of the group is known
+		(message_group_index, json_stage, voting_public_keys) = (None, None, [])
+		for (path, value) in json_path_values:
+			if path[1] != message_group_index:
+				if message_group_index is not None:
+					add_votes(json_stage, voting_public_keys)
+
+				(message_group_index, json_stage, voting_public_keys) = (path[1], None, [])
+
+			if 'stage' == path[2]:
+				json_stage = value
+			else:
+				voting_public_keys.append(PublicKey(value))
+
+		if message_group_index is not None:
+			add_votes(json_stage, voting_public_keys)
+
 		return voters_map
 
-	def get_harvests(self, address, start_id=None):
-		json_response = self._get_page(f'statements/transaction?targetAddress={address}&order=desc', start_id)
+	@staticmethod
+	def _get_harvests_rest_path(address, start_id, page_size, page_number, history_filter=None):
+		rest_path = f'statements/transaction?targetAddress={address}&order=desc'
+		rest_path += SymbolClient._get_history_filter_query('receiptType', history_filter)
+		return SymbolClient._get_page_rest_path(rest_path, start_id, page_size, page_number)
+
+	@staticmethod
+	def _get_harvest_heights(json_response):
+		return list(dict.fromkeys(
+			int(json_statement_envelope['statement']['height']) for json_statement_envelope in json_response['data']))
+
+	def _parse_harvests(self, address, json_response, height_to_block_metadata_map):
+		account_match_context = self.account_match_contexts.get(address)
 
 		snapshots = []
 		for json_statement_envelope in json_response['data']:
@@ -254,12 +381,13 @@ class SymbolClient:
 
 			snapshot = TransactionSnapshot(address, 'harvest')
 			snapshot.height = int(json_statement['height'])
-			(snapshot.timestamp, _, snapshot.hash) = self._get_block_time_and_multiplier_and_hash(snapshot.height)
+			block_metadata = height_to_block_metadata_map[snapshot.height]
+			(snapshot.timestamp, snapshot.hash) = (block_metadata.timestamp, block_metadata.hash)
 
 			for json_receipt in json_statement['receipts']:
 				receipt_type = json_receipt['type']
-				if any(RECEIPT_TYPES[name] == receipt_type for name in ['harvest', 'hashlock_expired', 'secretlock_expired']):
-					if Address(address) == Address(unhexlify(json_receipt['targetAddress'])):
+				if receipt_type in HARVEST_RECEIPT_TYPES:
+					if account_match_context.is_address(json_receipt['targetAddress']):
 						snapshot.amount += int(json_receipt['amount'])
 				elif receipt_type not in RECEIPT_TYPES.values():
 					log.warn(f'detected receipt of unknown type 0x{receipt_type:X}')
@@ -271,92 +399,231 @@ class SymbolClient:
 
 		return snapshots
 
-	def get_transfers(self, address, start_id=None):
-		json_response = self._get_page(f'transactions/confirmed?address={address}&order=desc&embedded=true', start_id)
+	@staticmethod
+	def _get_transfers_rest_path(address, start_id, page_size, page_number, history_filter=None):
+		rest_path = f'transactions/confirmed?address={address}&order=desc&embedded=true'
+		rest_path += SymbolClient._get_history_filter_query('type', history_filter)
+		return SymbolClient._get_page_rest_path(rest_path, start_id, page_size, page_number)
+
+	@staticmethod
+	def _get_transfer_heights(json_response):
+		return list(dict.fromkeys(
+			int(json_transaction_and_meta['meta']['height']) for json_transaction_and_meta in json_response['data']))
 
-		snapshots = []
-		for json_transaction_and_meta in json_response['data']:
+	@staticmethod
+	def _get_aggregate_hashes(json_response):
+		return [
+			json_transaction_and_meta['meta']['hash'] for json_transaction_and_meta in json_response['data']
+			if SymbolClient._is_aggregate(json_transaction_and_meta['transaction']['type'])
+		]
+
+	def _parse_transfers(self, address, json_response, height_to_block_metadata_map, aggregate_hash_to_embedded_transactions_map):
+		def parse_transfer(account_match_context, json_transaction_and_meta):
 			json_transaction = json_transaction_and_meta['transaction']
 			json_meta = json_transaction_and_meta['meta']
 
 			snapshot = TransactionSnapshot(address, 'transfer')
 			snapshot.height = int(json_meta['height'])
-			(snapshot.timestamp, fee_multiplier, _) = self._get_block_time_and_multiplier_and_hash(snapshot.height)
+			block_metadata = height_to_block_metadata_map[snapshot.height]
+			snapshot.timestamp = block_metadata.timestamp
 
 			snapshot.hash = json_meta['hash']
-			(amount_microxym, fee_microxym) = self._process_xym_changes(snapshot, json_transaction, snapshot.hash, fee_multiplier)
+			(amount_microxym, fee_microxym) = self._process_xym_changes(
+				snapshot,
+				account_match_context,
+				json_transaction,
+				aggregate_hash_to_embedded_transactions_map.get(snapshot.hash),
+				block_metadata.fee_multiplier)
 
 			snapshot.amount = amount_microxym / MICROXYM_PER_XYM
 			snapshot.fee_paid = fee_microxym / MICROXYM_PER_XYM
 			snapshot.collation_id = json_transaction_and_meta['id']
-			snapshots.append(snapshot)
+			return snapshot
 
-		return snapshots
+		return parse_transactions(self.account_match_contexts.get(address), json_response, parse_transfer)
+
+	@staticmethod
+	def _get_embedded_transactions(json_aggregate_transaction_and_meta):
+		return [
+			json_embedded_transaction_and_meta['transaction']
+			for json_embedded_transaction_and_meta in json_aggregate_transaction_and_meta['transaction']['transactions']
+		]
+
+	def _process_xym_changes(self, snapshot, account_match_context, json_transaction, json_embedded_transactions, fee_multiplier):
+		# pylint: disable=too-many-arguments
 
-	def _process_xym_changes(self, snapshot, json_transaction, transaction_hash, fee_multiplier):
 		effective_fee = int(json_transaction['size'] * fee_multiplier)
 
 		amount_microxym = 0
 		fee_microxym = 0
 		transaction_type = json_transaction['type']
 		if self._is_aggregate(transaction_type):
-			json_aggregate_transaction = self._get_json(f'transactions/confirmed/{transaction_hash}')
-			json_embedded_transactions = [
-				json_embedded_transaction_and_meta['transaction']
-				for json_embedded_transaction_and_meta in json_aggregate_transaction['transaction']['transactions']
-			]
-			amount_microxym = self._calculate_transfer_amount(snapshot.address, json_embedded_transactions)
+			amount_microxym = self._calculate_transfer_amount(account_match_context, json_embedded_transactions)
 		elif TRANSACTION_TYPES['transfer'] == transaction_type:
-			amount_microxym = self._calculate_transfer_amount(snapshot.address, [json_transaction])
+			amount_microxym = self._calculate_transfer_amount(account_match_context, [json_transaction])
 		else:
 			snapshot.comments = f'unsupported transaction of type 0x{transaction_type:X}'
 
-		if self._is_signer(snapshot.address, json_transaction):
+		if account_match_context.is_signer(json_transaction['signerPublicKey']):
 			fee_microxym = -effective_fee
 
 		return (amount_microxym, fee_microxym)
 
-	def _calculate_transfer_amount(self, address, json_transactions):
+	@staticmethod
+	def _calculate_transfer_amount(account_match_context, json_transactions):
 		amount_microxym = 0
 		for json_transaction in json_transactions:
 			if TRANSACTION_TYPES['transfer'] != json_transaction['type']:
 				continue
 
 			direction = 0
-			if self._is_signer(address, json_transaction):
+			if account_match_context.is_signer(json_transaction['signerPublicKey']):
 				direction = -1
-			elif SymbolClient._is_recipient(address, json_transaction):
+			elif account_match_context.is_address(json_transaction['recipientAddress']):
 				direction = 1
 
+			if not direction:
+				continue
+
 			for json_mosaic in json_transaction['mosaics']:
-				if json_mosaic['id'] in (XYM_NETWORK_MOSAIC_IDS_MAP[Address(address).bytes[0]], XYM_NETWORK_MOSAIC_IDS_MAP['alias']):
+				if account_match_context.is_accepted_mosaic(json_mosaic['id']):
 					amount_microxym += int(json_mosaic['amount']) * direction
 
 		return amount_microxym
 
-	def _is_signer(self, address, json_transaction):
-		return Address(address) == self.network.public_key_to_address(PublicKey(json_transaction['signerPublicKey']))
-
-	@staticmethod
-	def _is_recipient(address, json_transaction):
-		return Address(address) == Address(unhexlify(json_transaction['recipientAddress']))
+	def _create_account_match_context(self, address):
+		address = Address(address)
+		mosaic_ids = (XYM_NETWORK_MOSAIC_IDS_MAP[address.bytes[0]], XYM_NETWORK_MOSAIC_IDS_MAP['alias'])
+		return AccountMatchContext(self.network, address, mosaic_ids)
 
 	@staticmethod
 	def _is_aggregate(transaction_type):
 		return any(TRANSACTION_TYPES[name] == transaction_type for name in ['aggregate_complete', 'aggregate_bonded'])
 
-	def _get_block_time_and_multiplier_and_hash(self, height):
-		json_block_and_meta = self._get_json(f'blocks/{height}')
+	@property
+	def _block_namespace(self):
+		return f'symbol.{self.network.name}'
+
+	@property
+	def _block_header_index(self):
+		return BLOCK_HEADER_INDEXES.get(self._block_namespace)
+
+	def _find_indexed_block_metadata(self, height):
+		block_header_index = self._block_header_index
+		record = block_header_index.find(height) if block_header_index else None
+		if not record or None in record:  # pylint: disable=unsupported-membership-test
+			return None
+
+		return BlockMetadata(
+			self.network.to_datetime(NetworkTimestamp(record.timestamp)),
+			record.fee_multiplier,
+			Hash256(record.hash),
+			PublicKey(record.signer_public_key))
+
+	def _parse_block_metadata(self, json_block_and_meta):
 		json_block = json_block_and_meta['block']
-		return (
+		return BlockMetadata(
 			self.network.to_datetime(NetworkTimestamp(int(json_block['timestamp']))),
 			json_block['feeMultiplier'],
-			Hash256(json_block_and_meta['meta']['hash'])
-		)
+			Hash256(json_block_and_meta['meta']['hash']),
+			PublicKey(json_block['signerPublicKey']))
+
+	def _index_block_metadata(self, height, json_block_and_meta):
+		# only finalized blocks are immutable and safe to persist, so callers must check finalization first
+		json_block = json_block_and_meta['block']
+		self._block_header_index.store(
+			height,
+			int(json_block['timestamp']),
+			json_block['feeMultiplier'],
+			Hash256(json_block_and_meta['meta']['hash']).bytes,
+			PublicKey(json_block['signerPublicKey']).bytes)
+
+	@staticmethod
+	def _get_history_filter_query(type_parameter_name, history_filter):
+		# filters are applied by the server, so that items that would be discarded never need to be downloaded
+		if not history_filter:
+			return ''
+
+		query = ''.join(f'&{type_parameter_name}={item_type}' for item_type in history_filter.types or [])
+		if history_filter.from_height:
+			query += f'&fromHeight={history_filter.from_height}'
+
+		if history_filter.to_height:
+			query += f'&toHeight={history_filter.to_height}'
+
+		return query
+
+	@staticmethod
+	def _get_page_rest_path(rest_path, start_id, page_size, page_number):
+		# pages are addressed either relative to the last item of the previous page (start_id) or absolutely (page_number)
+		if page_size:
+			rest_path += f'&pageSize={page_size}'
+
+		if page_number:
+			rest_path += f'&pageNumber={page_number}'
+
+		return rest_path if not start_id else f'{rest_path}&offset={start_id}'
+
+	@staticmethod
+	def _find_response_height(json_response):
+		# blocks, transactions or lists of transactions, which are only final when the highest of their heights is
+		heights = []
+		for json_item in json_response if isinstance(json_response, list) else [json_response]:
+			json_height = json_item.get('block', json_item.get('meta', {})).get('height')
+			if json_height is None:
+				return None
+
+			heights.append(int(json_height))
+
+		return max(heights) if heights else None
+
+	def _get_embedded_transactions_map(self, aggregate_hashes):
+		aggregate_hash_to_embedded_transactions_map = {}
+		if self.is_batch_transaction_lookup_supported:
+			for i in range(0, len(aggregate_hashes), MAX_TRANSACTIONS_PER_BATCH_REQUEST):
+				json_transactions_and_meta = self._try_post_json(
+					'transactions/confirmed',
+					{'transactionIds': aggregate_hashes[i:i + MAX_TRANSACTIONS_PER_BATCH_REQUEST]})
+				if not isinstance(json_transactions_and_meta, list):
+					log.warning(f'{self.node_host} does not support batch transaction lookups, falling back to individual requests')
+					self.is_batch_transaction_lookup_supported = False
+					break
+
+				for json_transaction_and_meta in json_transactions_and_meta:
+					aggregate_hash = json_transaction_and_meta['meta']['hash']
+					aggregate_hash_to_embedded_transactions_map[aggregate_hash] = self._get_embedded_transactions(json_transaction_and_meta)
+
+		# any aggregates that could not be resolved in batches are resolved individually
+		missing_aggregate_hashes = [
+			aggregate_hash for aggregate_hash in aggregate_hashes if aggregate_hash not in aggregate_hash_to_embedded_transactions_map
+		]
+		if missing_aggregate_hashes:
+			with ThreadPoolExecutor(max_workers=MAX_PARALLEL_TRANSACTION_REQUESTS) as executor:
+				json_transactions_and_meta = executor.map(
+					lambda aggregate_hash: self._get_json(f'transactions/confirmed/{aggregate_hash}'),
+					missing_aggregate_hashes)
+
+				for (aggregate_hash, json_transaction_and_meta) in zip(missing_aggregate_hashes, json_transactions_and_meta):
+					aggregate_hash_to_embedded_transactions_map[aggregate_hash] = self._get_embedded_transactions(json_transaction_and_meta)
+
+		return aggregate_hash_to_embedded_transactions_map
+
+	def _get_block_metadata(self, height):
+		return BLOCK_METADATA_CACHE.get((self._block_namespace, height), lambda: self._load_block_metadata(height))
+
+	def _load_block_metadata(self, height):
+		block_metadata = self._find_indexed_block_metadata(height)
+		if block_metadata:
+			return block_metadata
+
+		json_block_and_meta = self._get_json(f'blocks/{height}')
+		if self._block_header_index and self._is_finalized(height):
+			self._index_block_metadata(height, json_block_and_meta)
+
+		return self._parse_block_metadata(json_block_and_meta)
 
-	def _get_page(self, rest_path, start_id):
-		return self._get_json(rest_path if not start_id else f'{rest_path}&offset={start_id}')
+	def _is_finalized(self, height):
+		if self.finalized_height_tracker.should_refresh(height):
+			self.finalized_height_tracker.update(self.get_finalization_info().height)
 
-	def _get_json(self, rest_path):
-		json_http_headers = {'Content-type': 'application/json'}
-		return self.session.get(f'http://{self.node_host}:{self.node_port}/{rest_path}', headers=json_http_headers).json()
+		return self.finalized_height_tracker.is_finalized(height)
@@ -0,0 +1,203 @@
+import errno
+import selectors
+import socket
+import ssl
+import struct
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .PacketReader import MAX_PACKET_SIZE, PACKET_HEADER, PacketReader
+from .SymbolClient import CHAIN_STATISTICS_PACKET_TYPE, NODE_INFO_PACKET_TYPE, SymbolPeerClient
+
+PeerProbeResult = namedtuple('PeerProbeResult', ['responses', 'error'])
+
+DEFAULT_PROBE_PACKET_TYPES = (NODE_INFO_PACKET_TYPE, CHAIN_STATISTICS_PACKET_TYPE)
+MAX_RESOLVER_THREADS = 32
+
+
+class _PeerConnection:
+	# pylint: disable=too-many-instance-attributes
+
+	def __init__(self, endpoint, request_bytes, packet_types, deadline):
+		self.endpoint = endpoint
+		self.sock = None
+		self.is_connected = False
+		self.is_handshake_complete = False
+
+		self.request_view = memoryview(request_bytes)
+		self.deadline = deadline
+
+		self.pending_packet_types = set(packet_types)
+		self.responses = {}
+
+		self.header_buffer = bytearray(PACKET_HEADER.size)
+		self.packet_type = None
+		self.payload_buffer = None
+		self.num_bytes_received = 0
+
+
+class SymbolPeerProber:
+	"""
+	Probes many Symbol peer nodes concurrently from a single thread using non-blocking sockets.
+	All requested packets are sent over a single TLS connection per node and their responses are returned together.
+	"""
+
+	def __init__(self, ssl_context, timeout=10, max_connection_count=256):
+		self.ssl_context = ssl_context
+		self.timeout = timeout
+		self.max_connection_count = max_connection_count
+
+	def probe(self, endpoints, packet_types=DEFAULT_PROBE_PACKET_TYPES):
+		"""
+		Sends requests of all packet types to every (host, port) endpoint.
+		Returns one PeerProbeResult per endpoint, in order, mapping packet types to parsed responses or holding the error that occurred.
+		"""
+
+		endpoints = list(endpoints)
+		request_bytes = b''.join(PACKET_HEADER.pack(PACKET_HEADER.size, packet_type) for packet_type in packet_types)
+
+		# name resolution is blocking, so resolve all hosts upfront in parallel
+		with ThreadPoolExecutor(max(1, min(MAX_RESOLVER_THREADS, len(endpoints)))) as executor:
+			socket_addresses = list(executor.map(self._resolve, endpoints))
+
+		results = [None] * len(endpoints)
+		pending_indexes = []
+		for (index, socket_address) in enumerate(socket_addresses):
+			if isinstance(socket_address, Exception):
+				results[index] = PeerProbeResult({}, socket_address)
+			else:
+				pending_indexes.append(index)
+
+		pending_indexes.reverse()
+		with selectors.DefaultSelector() as selector:
+			while pending_indexes or selector.get_map():
+				while pending_indexes and len(selector.get_map()) < self.max_connection_count:
+					index = pending_indexes.pop()
+					connection = _PeerConnection(endpoints[index], request_bytes, packet_types, time.monotonic() + self.timeout)
+					self._start(selector, index, connection, socket_addresses[index], results)
+
+				for (key, _) in selector.select(self._get_select_timeout(selector)):
+					self._step(selector, key.data[0], key.data[1], results)
+
+				self._expire(selector, results)
+
+		return results
+
+	@staticmethod
+	def _resolve(endpoint):
+		try:
+			return socket.getaddrinfo(endpoint[0], endpoint[1], type=socket.SOCK_STREAM)[0]
+		except OSError as ex:
+			return ex
+
+	def _start(self, selector, index, connection, socket_address, results):
+		# pylint: disable=too-many-arguments
+
+		(family, socket_type, protocol, _, address) = socket_address
+		try:
+			connection.sock = socket.socket(family, socket_type, protocol)
+			connection.sock.setblocking(False)
+			error_code = connection.sock.connect_ex(address)
+			if error_code not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+				raise ConnectionRefusedError(error_code, f'unable to connect to {connection.endpoint[0]}')
+		except OSError as ex:
+			self._finish(None, index, connection, results, ex)
+			return
+
+		selector.register(connection.sock, selectors.EVENT_WRITE, (index, connection))
+
+	def _step(self, selector, index, connection, results):
+		try:
+			events = self._advance(connection)
+		except (OSError, ValueError, struct.error) as ex:
+			self._finish(selector, index, connection, results, ex)
+			return
+
+		if not events:
+			self.ssl_context.save_session(connection.sock, *connection.endpoint)
+			self._finish(selector, index, connection, results, None)
+		else:
+			selector.modify(connection.sock, events, (index, connection))
+
+	def _advance(self, connection):
+		"""Progresses the connection as far as possible and returns the events it is waiting for, or 0 when it is complete."""
+
+		if not connection.is_connected:
+			error_code = connection.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+			if error_code:
+				raise ConnectionRefusedError(error_code, f'unable to connect to {connection.endpoint[0]}')
+
+			connection.is_connected = True
+			connection.sock = self.ssl_context.wrap_socket(connection.sock, *connection.endpoint, do_handshake_on_connect=False)
+
+		try:
+			if not connection.is_handshake_complete:
+				connection.sock.do_handshake()
+				connection.is_handshake_complete = True
+				self.ssl_context.record_handshake(connection.sock)
+
+			while connection.request_view:
+				num_bytes_sent = connection.sock.send(connection.request_view)
+				connection.request_view = connection.request_view[num_bytes_sent:]
+
+			self._receive(connection)
+			return 0 if not connection.pending_packet_types else selectors.EVENT_READ
+		except ssl.SSLWantReadError:
+			return selectors.EVENT_READ
+		except ssl.SSLWantWriteError:
+			return selectors.EVENT_WRITE
+
+	@staticmethod
+	def _receive(connection):
+		while connection.pending_packet_types:
+			buffer = connection.header_buffer if connection.payload_buffer is None else connection.payload_buffer
+			view = memoryview(buffer)[connection.num_bytes_received:]
+			if view:
+				num_bytes = connection.sock.recv_into(view)
+				if not num_bytes:
+					raise ConnectionRefusedError(f'{connection.endpoint[0]} closed connection before all responses were received')
+
+				connection.num_bytes_received += num_bytes
+				if num_bytes < len(view):
+					continue
+
+			connection.num_bytes_received = 0
+			if connection.payload_buffer is None:
+				(size, connection.packet_type) = PACKET_HEADER.unpack_from(connection.header_buffer)
+				if size < PACKET_HEADER.size or size > MAX_PACKET_SIZE:
+					raise ConnectionRefusedError(f'{connection.endpoint[0]} returned malformed packet header')
+
+				# allocate the payload once and fill it in place
+				connection.payload_buffer = bytearray(size - PACKET_HEADER.size)
+			else:
+				if connection.packet_type in connection.pending_packet_types:
+					connection.pending_packet_types.remove(connection.packet_type)
+					reader = PacketReader(connection.payload_buffer)
+					connection.responses[connection.packet_type] = SymbolPeerClient.parse_response(connection.packet_type, reader)
+
+				connection.payload_buffer = None
+
+	@staticmethod
+	def _get_select_timeout(selector):
+		deadlines = [key.data[1].deadline for key in selector.get_map().values()]
+		return max(0, min(deadlines) - time.monotonic()) if deadlines else 0
+
+	def _expire(self, selector, results):
+		now = time.monotonic()
+		for key in list(selector.get_map().values()):
+			(index, connection) = key.data
+			if connection.deadline <= now:
+				self._finish(selector, index, connection, results, TimeoutError(f'{connection.endpoint[0]} timed out'))
+
+	@staticmethod
+	def _finish(selector, index, connection, results, error):
+		# pylint: disable=too-many-arguments
+
+		if connection.sock:
+			if selector:
+				selector.unregister(connection.sock)
+
+			connection.sock.close()
+
+		results[index] = PeerProbeResult(connection.responses if not error else {}, error)
@@ -1,6 +1,77 @@
+import time
+from urllib.parse import urlsplit
+
 import requests
+from urllib3.exceptions import MaxRetryError, ResponseError
 from urllib3.util.retry import Retry
 
+from .CircuitBreaker import CIRCUIT_BREAKERS, CircuitOpenError
+from .HttpMetrics import ERROR_STATUS, HTTP_METRICS, REJECTED_STATUS
+from .HttpRecorder import HTTP_RECORDER
+from .RateLimiter import RATE_LIMITERS
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRY_COUNT = 20
+RETRY_BACKOFF_FACTOR = 1
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# guarded hosts have alternatives, so failing requests to them are given up quickly instead of waiting out long backoffs
+GUARDED_RETRY_COUNT = 3
+GUARDED_MAX_BACKOFF = 2
+
+
+class InstrumentedRetry(Retry):
+	"""
+	Retry policy that records the retries and backoff time of each request in HTTP_METRICS.
+	Failed connections and reads of guarded hosts count towards their circuits in CIRCUIT_BREAKERS, and requests to them are retried
+	at most GUARDED_RETRY_COUNT times, with short backoffs, while their circuits are closed and the retry budget allows it.
+	Retries are also subject to RATE_LIMITERS, and time spent waiting for them counts as backoff.
+	"""
+
+	metrics_host = None
+	metrics_url = None
+
+	def increment(self, method=None, url=None, *args, **kwargs):
+		# pylint: disable=keyword-arg-before-vararg
+		pool = kwargs.get('_pool')
+		host = pool.host if pool else None
+		circuit_key = CIRCUIT_BREAKERS.find_circuit_key(pool.scheme, pool.host, pool.port) if pool else None
+
+		error = kwargs.get('error')
+		if circuit_key and error:
+			# unlike retryable status codes, which busy nodes return too, connection and read errors each count as a failure
+			CIRCUIT_BREAKERS.record_failure(circuit_key)
+
+		retries = super().increment(method, url, *args, **kwargs)
+		if circuit_key:
+			denial_reason = None
+			if len(retries.history) > GUARDED_RETRY_COUNT:
+				denial_reason = 'retry count'
+			elif CIRCUIT_BREAKERS.is_open(circuit_key):
+				denial_reason = 'open circuit'
+			elif not CIRCUIT_BREAKERS.allows_retry(circuit_key):
+				denial_reason = 'retry budget'
+
+			if denial_reason:
+				raise MaxRetryError(pool, url, error or ResponseError(f'retry denied by {denial_reason} of {circuit_key}')) from error
+
+			retries.backoff_max = min(retries.backoff_max, GUARDED_MAX_BACKOFF)
+
+		HTTP_METRICS.record_retry(host, url or '')
+
+		# urllib3 sleeps using the returned instance, so it needs to know which request it is retrying
+		retries.metrics_host = host
+		retries.metrics_url = url or ''
+		return retries
+
+	def sleep(self, response=None):
+		start_time = time.monotonic()
+		super().sleep(response)
+
+		if self.metrics_url is not None:
+			RATE_LIMITERS.acquire(self.metrics_host)
+			HTTP_METRICS.record_backoff(self.metrics_host, self.metrics_url, time.monotonic() - start_time)
+
 
 class TimeoutHTTPAdapter(requests.adapters.HTTPAdapter):
 	def __init__(self, *args, **kwargs):
@@ -16,16 +87,83 @@ class TimeoutHTTPAdapter(requests.adapters.HTTPAdapter):
 		if timeout is None:
 			kwargs['timeout'] = self.timeout
 
-		return super().send(request, **kwargs)
+		url_parts = urlsplit(request.url)
+		host = url_parts.hostname
+		circuit_key = CIRCUIT_BREAKERS.find_circuit_key(url_parts.scheme, host, url_parts.port)
+
+		# requests replayed by a mock server are still reported, and rate limited, under their original url
+		original_url = request.url
+		(request.url, replay_host) = HTTP_RECORDER.redirect(original_url)
+		if replay_host:
+			request.headers['Host'] = replay_host
+
+		start_time = time.monotonic()
+		try:
+			CIRCUIT_BREAKERS.before_request(circuit_key)
+
+			# time spent waiting for the rate limiter is not part of the latency of the request
+			start_time += RATE_LIMITERS.acquire(host)
+			response = super().send(request, **kwargs)
+		except CircuitOpenError:
+			HTTP_METRICS.record_request(host, original_url, REJECTED_STATUS, 0, 0)
+			raise
+		except requests.exceptions.RequestException as ex:
+			# requests failing with retryable status codes count once towards their circuits, however many times they were retried
+			# (failed connections and reads were already counted by InstrumentedRetry)
+			if isinstance(ex, requests.exceptions.RetryError):
+				CIRCUIT_BREAKERS.record_failure(circuit_key)
+
+			HTTP_METRICS.record_request(host, original_url, ERROR_STATUS, time.monotonic() - start_time, 0)
+			raise
+
+		if response.status_code not in RETRY_STATUS_CODES:
+			CIRCUIT_BREAKERS.record_success(circuit_key)
+		else:
+			CIRCUIT_BREAKERS.record_failure(circuit_key)
+
+		# latency is measured until the headers arrive, so streamed requests are comparable to buffered ones
+		HTTP_METRICS.record_request(host, original_url, response.status_code, time.monotonic() - start_time, 0)
+		if kwargs.get('stream'):
+			_count_streamed_bytes_received(host, request.method, original_url, request.body, response)
+		else:
+			HTTP_METRICS.record_bytes_received(host, original_url, len(response.content))
+			HTTP_RECORDER.record(request.method, original_url, request.body, response)
+
+		return response
+
+
+def _count_streamed_bytes_received(host, method, url, body, response):
+	raw = response.raw
+	stream = raw.stream
+
+	def counting_stream(*args, **kwargs):
+		chunks = []
+		try:
+			for chunk in stream(*args, **kwargs):
+				HTTP_METRICS.record_bytes_received(host, url, len(chunk))
+				if HTTP_RECORDER.outfile:
+					chunks.append(chunk)
+
+				yield chunk
+		finally:
+			# streams abandoned early are recorded up to where they were read
+			content_type = response.headers.get('content-type')
+			HTTP_RECORDER.record_content(method, url, body, response.status_code, content_type, b''.join(chunks))
+
+	raw.stream = counting_stream
 
 
 def create_http_session(**kwargs):
-	retries = Retry(
-		total=kwargs.get('retry_count', 20),
-		backoff_factor=1,
-		status_forcelist=(429, 500, 502, 503, 504),
+	retries = InstrumentedRetry(
+		total=kwargs.get('retry_count', DEFAULT_RETRY_COUNT),
+		backoff_factor=RETRY_BACKOFF_FACTOR,
+		status_forcelist=RETRY_STATUS_CODES,
 		allowed_methods=['GET', 'POST'] if not kwargs.get('retry_post', False) else ['GET', 'POST'])
-	adapter = TimeoutHTTPAdapter(max_retries=retries, timeout=kwargs.get('timeout', 30))
+	adapter = TimeoutHTTPAdapter(
+		max_retries=retries,
+		timeout=kwargs.get('timeout', DEFAULT_TIMEOUT),
+		pool_connections=kwargs.get('pool_connections', requests.adapters.DEFAULT_POOLSIZE),
+		pool_maxsize=kwargs.get('pool_size', requests.adapters.DEFAULT_POOLSIZE))
 
 	http = requests.Session()
 	http.mount('http://', adapter)
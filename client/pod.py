@@ -2,6 +2,9 @@ import datetime
 
 
 class PriceSnapshot():
+	__slots__ = ('date', 'price', 'volume', 'market_cap', 'comments')
+	FIELD_NAMES = __slots__
+
 	def __init__(self, date):
 		self.date = date
 		self.price = 0
@@ -9,6 +12,20 @@ class PriceSnapshot():
 		self.market_cap = 0
 		self.comments = None
 
+	@classmethod
+	def from_csv_row(cls, row):
+		# fields are assigned once from the row instead of first being defaulted by __init__; unknown columns are ignored
+		snapshot = cls.__new__(cls)
+		snapshot.date = row.get('date')
+		snapshot.price = row.get('price', 0)
+		snapshot.volume = row.get('volume', 0)
+		snapshot.market_cap = row.get('market_cap', 0)
+		snapshot.comments = row.get('comments')
+		return snapshot
+
+	def to_csv_row(self, field_names=None):
+		return [getattr(self, name) for name in field_names or self.FIELD_NAMES]
+
 	def fix_types(self):
 		self.date = datetime.datetime.fromisoformat(self.date).date()
 
@@ -20,6 +37,9 @@ class PriceSnapshot():
 class TransactionSnapshot():
 	# pylint: disable=too-many-instance-attributes
 
+	__slots__ = ('address', 'address_name', 'tag', 'timestamp', 'amount', 'fee_paid', 'height', 'collation_id', 'comments', 'hash')
+	FIELD_NAMES = __slots__
+
 	def __init__(self, address, tag):
 		self.address = address
 		self.address_name = address
@@ -35,6 +55,31 @@ class TransactionSnapshot():
 		self.comments = None
 		self.hash = None
 
+	@classmethod
+	def from_csv_row(cls, row):
+		# fields are assigned once from the row instead of first being defaulted by __init__; unknown columns are ignored
+		snapshot = cls.__new__(cls)
+		snapshot._assign_csv_row(row)
+		return snapshot
+
+	def _assign_csv_row(self, row):
+		self.address = row.get('address')
+		self.address_name = row.get('address_name')
+		self.tag = row.get('tag')
+
+		self.timestamp = row.get('timestamp')
+
+		self.amount = row.get('amount', 0)
+		self.fee_paid = row.get('fee_paid', 0)
+		self.height = row.get('height', 0)
+
+		self.collation_id = row.get('collation_id', 0)
+		self.comments = row.get('comments')
+		self.hash = row.get('hash')
+
+	def to_csv_row(self, field_names=None):
+		return [getattr(self, name) for name in field_names or self.FIELD_NAMES]
+
 	def fix_types(self, date_only=False):
 		self.timestamp = datetime.datetime.fromisoformat(self.timestamp)
 		if date_only:
@@ -50,12 +95,21 @@ class TransactionSnapshot():
 
 
 class AugmentedTransactionSnapshot(TransactionSnapshot):
+	__slots__ = ('price', 'fiat_amount', 'fiat_fee_paid')
+	FIELD_NAMES = TransactionSnapshot.FIELD_NAMES + __slots__
+
 	def __init__(self):
 		TransactionSnapshot.__init__(self, None, None)
 		self.price = 0.0
 		self.fiat_amount = 0.0
 		self.fiat_fee_paid = 0.0
 
+	def _assign_csv_row(self, row):
+		TransactionSnapshot._assign_csv_row(self, row)
+		self.price = row.get('price', 0.0)
+		self.fiat_amount = row.get('fiat_amount', 0.0)
+		self.fiat_fee_paid = row.get('fiat_fee_paid', 0.0)
+
 	def fix_types(self, date_only=False):
 		TransactionSnapshot.fix_types(self, date_only)
 		self.price = float(self.price)
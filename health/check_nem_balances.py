@@ -3,6 +3,7 @@ from collections import namedtuple
 from datetime import datetime
 
 from client.CoinGeckoClient import CoinGeckoClient
+from client.HttpOptions import add_http_arguments, configure_http
 from client.ResourceLoader import create_blockchain_api_client, load_resources
 
 NetworkDescriptor = namedtuple('NetworkDescriptor', [
@@ -87,7 +88,10 @@ class NetworkPrinter:
 			print()
 
 	def _print_accounts(self, addresses, description):
-		account_row_views = [self.row_view_factory(self.api_client.get_account_info(address)) for address in addresses]
+		# accounts that could not be retrieved are skipped (and logged when they are looked up)
+		account_row_views = [
+			self.row_view_factory(account_info) for account_info in self.api_client.get_account_infos(addresses) if account_info
+		]
 
 		has_printed_header = False
 		total_balance = 0
@@ -174,9 +178,11 @@ def main():
 	parser.add_argument('--groups', help='account groups to include', type=str, nargs='+')
 	parser.add_argument('--use-names', help='display friendly account names', action='store_true')
 	parser.add_argument('--show-zero-balances', help='show zero balance accounts', action='store_true')
+	add_http_arguments(parser, include_caches=True)
 	args = parser.parse_args()
 
 	resources = load_resources(args.resources)
+	configure_http(args)
 
 	coin_gecko_client = CoinGeckoClient()
 	token_price = coin_gecko_client.get_price_spot(resources.ticker_name, 'usd')
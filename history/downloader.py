@@ -1,27 +1,55 @@
 import argparse
 import csv
 import datetime
+import time
+from functools import partial
 from pathlib import Path
 from threading import Thread
 
+from requests.exceptions import RequestException, Timeout
+from urllib3.exceptions import ReadTimeoutError
 from zenlog import log
 
+from client.AdaptivePageSize import AdaptivePageSize
+from client.BlockMetadataCache import BLOCK_METADATA_CACHE
 from client.CoinGeckoClient import CoinGeckoClient
+from client.HttpOptions import add_http_arguments, configure_http
+from client.HttpSessionRegistry import HTTP_SESSIONS
+from client.ParallelPaginator import DEFAULT_PAGE_WINDOW_SIZE, ParallelPaginator
+from client.pod import PriceSnapshot
+from client.PrefetchingPager import PrefetchingPager
+from client.RateLimiter import RATE_LIMITERS
 from client.ResourceLoader import create_blockchain_api_client, load_resources
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import HARVEST_RECEIPT_TYPES, HistoryFilter
+
+ADAPTIVE_PAGE_SIZE = 'adaptive'
+CHAIN_ACTIVITY_FIELD_NAMES = ('timestamp', 'amount', 'fee_paid', 'height', 'address', 'address_name', 'tag', 'comments', 'hash')
 
 
 class ChainActivityDownloader:
-	def __init__(self, resources, account_descriptor):
+	def __init__(
+		self,
+		resources,
+		account_descriptor,
+		page_size=ADAPTIVE_PAGE_SIZE,
+		page_window_size=DEFAULT_PAGE_WINDOW_SIZE,
+		use_node_pool=False
+	):
+		# pylint: disable=too-many-arguments
+
 		self.resources = resources
 		self.account_descriptor = account_descriptor
+		self.use_node_pool = use_node_pool
+		self.page_size = page_size
+		self.page_window_size = page_window_size
 
 	def download(self, start_date, end_date, output_filepath):
 		log.info(f'[{output_filepath}] downloading chain activity from {start_date} to {end_date}')
 
 		with open(output_filepath, 'wt', encoding='utf8') as outfile:
-			column_names = ['timestamp', 'amount', 'fee_paid', 'height', 'address', 'address_name', 'tag', 'comments', 'hash']
-			csv_writer = csv.DictWriter(outfile, column_names, extrasaction='ignore')
-			csv_writer.writeheader()
+			csv_writer = csv.writer(outfile)
+			csv_writer.writerow(CHAIN_ACTIVITY_FIELD_NAMES)
 
 			num_rows_written = 0
 			for mode in ['harvests', 'transfers']:
@@ -35,16 +63,10 @@ class ChainActivityDownloader:
 	def _download_batch(self, mode, start_date, end_date, output_filepath, csv_writer):
 		# pylint: disable=too-many-arguments
 
-		api_client = create_blockchain_api_client(self.resources)
-		downloader = api_client.get_harvests if 'harvests' == mode else api_client.get_transfers
+		api_client = create_blockchain_api_client(self.resources, use_node_pool=self.use_node_pool)
 
 		num_rows_written = 0
-		start_id = None
-		while True:
-			snapshots = downloader(self.account_descriptor.address, start_id)
-			if not snapshots:
-				return num_rows_written
-
+		for snapshots in self._download_pages(api_client, mode, start_date):
 			for snapshot in snapshots:
 				if snapshot.timestamp.date() < start_date:
 					return num_rows_written
@@ -53,12 +75,116 @@ class ChainActivityDownloader:
 					continue
 
 				snapshot.address_name = self.account_descriptor.name
-				csv_writer.writerow(vars(snapshot))
+				csv_writer.writerow(snapshot.to_csv_row(CHAIN_ACTIVITY_FIELD_NAMES))
 				num_rows_written += 1
 
+			log.debug(f'[{output_filepath}::{mode}] finished processing {snapshots[-1].timestamp}')
+
+		return num_rows_written
+
+	def _download_pages(self, api_client, mode, start_date):
+		downloader = api_client.get_harvests if 'harvests' == mode else api_client.get_transfers
+		adaptive_page_size = AdaptivePageSize(api_client.page_size_limits) if ADAPTIVE_PAGE_SIZE == self.page_size else None
+
+		if 'symbol' == self.resources.friendly_name:
+			# statements without receipts changing the balance are skipped by the server instead of being downloaded;
+			# transfers are not filtered because fees are paid for transactions of all types
+			history_types = HARVEST_RECEIPT_TYPES if 'harvests' == mode else None
+			if self.page_window_size > 1:
+				yield from self._download_numbered_pages(api_client, downloader, history_types, start_date, adaptive_page_size)
+				return
+
+			if history_types:
+				downloader = partial(downloader, history_filter=HistoryFilter(history_types))
+
+		if 'nem' == self.resources.friendly_name:
+			# nem pages are addressed by the last id of the previous page, so instead of downloading pages in parallel,
+			# each next page is downloaded while the current one is enriched and written
+			if 'harvests' == mode:
+				(fetch_page, process_page) = (api_client.fetch_harvests_page, api_client.process_harvests_page)
+			else:
+				(fetch_page, process_page) = (api_client.fetch_transfers_page, api_client.process_transfers_page)
+
+			yield from PrefetchingPager(
+				lambda start_id: self._download_page(fetch_page, start_id, adaptive_page_size),
+				api_client.get_page_end_id,
+				lambda json_response: process_page(self.account_descriptor.address, json_response))
+			return
+
+		yield from self._download_sequential_pages(downloader, adaptive_page_size)
+
+	def _download_numbered_pages(self, api_client, downloader, history_types, start_date, adaptive_page_size):
+		# pylint: disable=too-many-arguments
+
+		# symbol pages can be addressed by number, so a window of them is downloaded at once (from different nodes with a node pool);
+		# numbered pages of nodes at different heights would not line up, so they are pinned to the finalized height,
+		# which all synced nodes have reached, and the few newer items are downloaded first by following page ids
+		finalized_height = api_client.get_finalization_info().height
+		yield from self._download_sequential_pages(
+			partial(downloader, history_filter=HistoryFilter(history_types, from_height=finalized_height + 1)),
+			adaptive_page_size)
+
+		# all numbered pages must have the same size for their numbers to line up, so adaptive page sizes are fixed
+		# while pages are downloaded in parallel and only change after a timeout, when downloading continues sequentially
+		finalized_history_filter = HistoryFilter(history_types, to_height=finalized_height)
+		page_size = adaptive_page_size.value if adaptive_page_size else self.page_size
+		last_collation_id = None
+		try:
+			for snapshots in ParallelPaginator(
+				lambda page_number: downloader(
+					self.account_descriptor.address,
+					page_size=page_size,
+					page_number=page_number,
+					history_filter=finalized_history_filter),
+				lambda snapshot: snapshot.collation_id,
+				lambda snapshots: snapshots[-1].timestamp.date() < start_date,
+				self.page_window_size
+			):
+				last_collation_id = snapshots[-1].collation_id
+				yield snapshots
+		except RequestException as ex:
+			if not adaptive_page_size or not _is_timeout(ex) or not adaptive_page_size.record_timeout():
+				raise
+
+			log.warning(f'[{self.account_descriptor.name}] page request timed out, continuing with page size {adaptive_page_size.value}')
+			yield from self._download_sequential_pages(
+				partial(downloader, history_filter=finalized_history_filter),
+				adaptive_page_size,
+				last_collation_id)
+
+	def _download_sequential_pages(self, downloader, adaptive_page_size, start_id=None):
+		while True:
+			snapshots = self._download_page(downloader, start_id, adaptive_page_size)
+			if not snapshots:
+				return
+
+			yield snapshots
 			start_id = snapshots[-1].collation_id
 
-			log.debug(f'[{output_filepath}::{mode}] finished processing {snapshots[-1].timestamp}')
+	def _download_page(self, downloader, start_id, adaptive_page_size):
+		if not adaptive_page_size:
+			return downloader(self.account_descriptor.address, start_id, self.page_size)
+
+		while True:
+			start_time = time.monotonic()
+			try:
+				page = downloader(self.account_descriptor.address, start_id, adaptive_page_size.value)
+			except RequestException as ex:
+				# large pages can take longer than slow nodes allow, so retry timed out pages with smaller sizes
+				if not _is_timeout(ex) or not adaptive_page_size.record_timeout():
+					raise
+
+				log.warning(f'[{self.account_descriptor.name}] page request timed out, reducing page size to {adaptive_page_size.value}')
+				continue
+
+			adaptive_page_size.record_latency(time.monotonic() - start_time)
+			return page
+
+
+def _is_timeout(error):
+	# timeouts of retried requests are reported by requests as connection errors caused by urllib3 read timeouts
+	reason = getattr(error.args[0], 'reason', None) if error.args else None
+	return isinstance(error, Timeout) or isinstance(reason, ReadTimeoutError)
 
 
 class PriceDownloader:
@@ -72,8 +198,8 @@ class PriceDownloader:
 		coin_gecko_client = CoinGeckoClient()
 
 		with open(output_filepath, 'wt', encoding='utf8') as outfile:
-			csv_writer = csv.DictWriter(outfile, ['date', 'price', 'volume', 'market_cap', 'comments'])
-			csv_writer.writeheader()
+			csv_writer = csv.writer(outfile)
+			csv_writer.writerow(PriceSnapshot.FIELD_NAMES)
 
 			current_date = start_date
 			while current_date <= end_date:
@@ -82,14 +208,20 @@ class PriceDownloader:
 					snapshot.price = self.resources.premarket_price
 					snapshot.comments = 'premarket price'
 
-				csv_writer.writerow(vars(snapshot))
+				csv_writer.writerow(snapshot.to_csv_row())
 
 				log.debug(f'[{output_filepath}] finished processing {current_date}')
 
 				current_date += datetime.timedelta(days=1)
 
 
+def _parse_page_size(value):
+	return value if ADAPTIVE_PAGE_SIZE == value else int(value)
+
+
 def main():
+	# pylint: disable=too-many-locals
+
 	parser = argparse.ArgumentParser(
 		description='download transactions from nem or symbol networks',
 		formatter_class=argparse.ArgumentDefaultsHelpFormatter)
@@ -98,6 +230,14 @@ def main():
 	parser.add_argument('--start-date', help='start date', required=True)
 	parser.add_argument('--end-date', help='end date', default=datetime.date.today().isoformat())
 	parser.add_argument('--fiat-currency', help='fiat currency', default='usd')
+	parser.add_argument('--page-size', help='history page size or \'adaptive\'', type=_parse_page_size, default=ADAPTIVE_PAGE_SIZE)
+	parser.add_argument(
+		'--page-window',
+		help='number of pages downloaded concurrently (symbol only)',
+		type=int,
+		default=DEFAULT_PAGE_WINDOW_SIZE)
+	parser.add_argument('--node-pool', help='spread requests over all nodes instead of a random one', action='store_true')
+	add_http_arguments(parser, include_caches=True)
 	args = parser.parse_args()
 
 	output_directory = Path(args.output)
@@ -110,12 +250,13 @@ def main():
 	output_directory.mkdir(parents=True)
 
 	resources = load_resources(args.input)
+	configure_http(args)
 	start_date = datetime.date.fromisoformat(args.start_date)
 	end_date = datetime.date.fromisoformat(args.end_date)
 
 	threads = []
 	for account_descriptor in resources.accounts.find_all_by_role(None):
-		chain_activity_downloader = ChainActivityDownloader(resources, account_descriptor)
+		chain_activity_downloader = ChainActivityDownloader(resources, account_descriptor, args.page_size, args.page_window, args.node_pool)
 		account_output_filepath = output_directory / f'{account_descriptor.name}.csv'
 		threads.append(Thread(target=chain_activity_downloader.download, args=(start_date, end_date, account_output_filepath)))
 
@@ -129,6 +270,26 @@ def main():
 	for thread in threads:
 		thread.join()
 
+	cache_statistics = BLOCK_METADATA_CACHE.statistics
+	log.info(
+		f'block metadata cache: {cache_statistics.hits} hits, {cache_statistics.misses} misses, {cache_statistics.coalesced} coalesced'
+		f' ({cache_statistics.hits + cache_statistics.coalesced} block requests saved)')
+
+	response_cache_statistics = RESPONSE_CACHE.statistics
+	log.info(
+		f'response cache: {response_cache_statistics.memory_hits} memory hits, {response_cache_statistics.disk_hits} disk hits,'
+		f' {response_cache_statistics.misses} misses')
+
+	session_statistics = HTTP_SESSIONS.statistics
+	log.info(
+		f'http sessions: {session_statistics.session_count} created, {session_statistics.reused_session_count} reused;'
+		f' {session_statistics.request_count} requests over {session_statistics.connection_count} connections')
+
+	rate_limiter_statistics = RATE_LIMITERS.statistics
+	log.info(
+		f'rate limiters: {rate_limiter_statistics.throttled_request_count} requests throttled'
+		f' for {rate_limiter_statistics.throttled_time:.1f}s')
+
 	log.info('all downloads complete!')
 
 
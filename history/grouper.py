@@ -33,8 +33,7 @@ class Grouper():
 			self.column_names = next(csv_reader)  # skip header
 
 			for row in csv_reader:
-				snapshot = AugmentedTransactionSnapshot()
-				snapshot.__dict__.update(row)
+				snapshot = AugmentedTransactionSnapshot.from_csv_row(row)
 				snapshot.fix_types(date_only=True)
 
 				group_key = self._make_group_key(snapshot)
@@ -91,11 +90,11 @@ class Grouper():
 		log.info(f'saving {self.mode} grouped report to {filename}')
 
 		with open(filename, 'wt', newline='', encoding='utf8') as outfile:
-			csv_writer = csv.DictWriter(outfile, self.field_names, extrasaction='ignore')
-			csv_writer.writerow(self.column_names)
+			csv_writer = csv.writer(outfile)
+			csv_writer.writerow([self.column_names.get(field_name) for field_name in self.field_names])
 
 			for value in sorted(self.map.values(), key=lambda snapshot: (snapshot.timestamp, snapshot.tag, snapshot.address)):
-				csv_writer.writerow(vars(value))
+				csv_writer.writerow(value.to_csv_row(self.field_names))
 
 
 def main():
@@ -27,8 +27,7 @@ class TransactionsLoader():
 			csv_reader = csv.DictReader(infile)
 
 			for row in csv_reader:
-				snapshot = client.pod.PriceSnapshot(None)
-				snapshot.__dict__.update(row)
+				snapshot = client.pod.PriceSnapshot.from_csv_row(row)
 				snapshot.fix_types()
 
 				self.price_map[snapshot.date] = snapshot
@@ -40,8 +39,7 @@ class TransactionsLoader():
 			csv_reader = csv.DictReader(infile)
 
 			for row in csv_reader:
-				snapshot = client.pod.AugmentedTransactionSnapshot()
-				snapshot.__dict__.update(row)
+				snapshot = client.pod.AugmentedTransactionSnapshot.from_csv_row(row)
 				raw_timestamp = snapshot.timestamp
 				snapshot.fix_types()
 
@@ -108,11 +106,11 @@ class TransactionsLoader():
 				field_names += ['address_name']
 				column_headers += ['address_name']
 
-			csv_writer = csv.DictWriter(outfile, field_names, extrasaction='ignore')
-			csv_writer.writerow(dict(zip(field_names, column_headers)))
+			csv_writer = csv.writer(outfile)
+			csv_writer.writerow(column_headers)
 
 			for snapshot in self.transaction_snapshots:
-				csv_writer.writerow(vars(snapshot))
+				csv_writer.writerow(snapshot.to_csv_row(field_names))
 
 
 def main():
@@ -8,6 +8,10 @@ from zenlog import log
 import client.pod
 
 
+class TaxBitTransactionSnapshot(client.pod.AugmentedTransactionSnapshot):
+	__slots__ = ('amount_sent', 'amount_received')
+
+
 class TransactionsLoader():
 	def __init__(self, ticker, start_date, end_date):
 		self.ticker = ticker
@@ -26,8 +30,7 @@ class TransactionsLoader():
 				self._process_row(row)
 
 	def _process_row(self, row):
-		snapshot = client.pod.AugmentedTransactionSnapshot()
-		snapshot.__dict__.update(row)
+		snapshot = TaxBitTransactionSnapshot.from_csv_row(row)
 		raw_timestamp = snapshot.timestamp
 		snapshot.fix_types()
 
@@ -4,6 +4,7 @@ import sys
 
 from zenlog import log
 
+from client.HttpOptions import add_http_arguments, configure_http
 from client.ResourceLoader import create_blockchain_api_client, load_resources
 
 
@@ -40,29 +41,36 @@ class Reconciler():
 		for account_name in self._account_names:
 			log.info(f'[*] verifying {self.mode} balances for {account_name}')
 			account_descriptor = self.resources.accounts.try_find_by_name(account_name)
+			height_to_balance_map = api_client.get_historical_balances(account_descriptor.address, [row['height'] for row in self.rows])
 
 			calculated_balance = 0
 			for row in self.rows:
 				calculated_balance += float(row[account_name])
 				calculated_balance = round(calculated_balance, 6)
 
-				reported_balance = api_client.get_historical_balance(account_descriptor.address, row['height'])
+				reported_balance = height_to_balance_map[int(row['height'])]
 
 				self._print_message(row, account_name, calculated_balance, reported_balance)
 
 	def _verify_spot(self):
 		api_client = create_blockchain_api_client(self.resources)
 
-		for account_name in self._account_names:
+		account_descriptors = [self.resources.accounts.try_find_by_name(account_name) for account_name in self._account_names]
+		account_infos = api_client.get_account_infos([account_descriptor.address for account_descriptor in account_descriptors])
+
+		for (account_name, account_info) in zip(self._account_names, account_infos):
 			log.info(f'[*] verifying {self.mode} balances for {account_name}')
-			account_descriptor = self.resources.accounts.try_find_by_name(account_name)
+			if not account_info:
+				log.error(f'[-] {account_name} could not be retrieved from the network')
+				self.num_errors += 1
+				continue
 
 			calculated_balance = 0
 			for row in self.rows:
 				calculated_balance += float(row[account_name])
 				calculated_balance = round(calculated_balance, 6)
 
-			reported_balance = api_client.get_account_info(account_descriptor.address).balance
+			reported_balance = account_info.balance
 
 			self._print_message(self.rows[-1], account_name, calculated_balance, reported_balance)
 
@@ -84,9 +92,12 @@ def main():
 	parser.add_argument('--input', help='input account balance table', required=True)
 	parser.add_argument('--resources', help='input resources file', required=True)
 	parser.add_argument('--mode', help='reconciliation mode', choices=('spot', 'all'), required=True)
+	add_http_arguments(parser)
 
 	args = parser.parse_args()
 
+	configure_http(args)
+
 	reconciler = Reconciler(args.resources, args.mode)
 	reconciler.load(args.input)
 	reconciler.verify()
@@ -26,8 +26,7 @@ class Loader():
 			next(csv_reader)  # skip header
 
 			for row in csv_reader:
-				snapshot = AugmentedTransactionSnapshot()
-				snapshot.__dict__.update(row)
+				snapshot = AugmentedTransactionSnapshot.from_csv_row(row)
 				snapshot.fix_types(date_only=True)
 				snapshots.append(snapshot)
 
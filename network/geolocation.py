@@ -2,14 +2,14 @@ import argparse
 import json
 import queue
 import threading
-import time
 from socket import error, gaierror, gethostbyname
 
 from zenlog import log
 
 from client.GeolocationClient import GeolocationClient
+from client.HttpOptions import add_http_arguments, configure_http
+from client.RateLimiter import RATE_LIMITERS
 
-REQUEST_RATE = 15  # 15 requests / 1 minute
 CHUNK_SIZE = 100  # up to 100 IPs per request
 
 
@@ -102,14 +102,15 @@ class NodeGeolocation:
 			if not request_geolocation_queue.empty():
 				ips = request_geolocation_queue.get()
 
+				# requests are spaced out by RATE_LIMITERS, which knows the limit of the geolocation service
 				self._process_ips(ips)
 
-				if total_queue > REQUEST_RATE:
-					time.sleep(60 / REQUEST_RATE)
-
 				log.info(f'queue progress: {total_queue - request_geolocation_queue.qsize()} / {total_queue}')
 			else:
-				log.info('completed')
+				rate_limiter_statistics = RATE_LIMITERS.statistics
+				log.info(
+					f'completed; {rate_limiter_statistics.throttled_request_count} requests throttled'
+					f' for {rate_limiter_statistics.throttled_time:.1f}s')
 				self.save(self.output_file_directory)
 				break
 
@@ -126,8 +127,11 @@ def main():
 	parser = argparse.ArgumentParser(description='downloads node information from a network')
 	parser.add_argument('--input', help='nodes json file', required=True)
 	parser.add_argument('--output', help='output file', required=True)
+	add_http_arguments(parser)
 	args = parser.parse_args()
 
+	configure_http(args)
+
 	node_geolocation = NodeGeolocation(args.input, args.output)
 	node_geolocation.get_nodes_geolocation()
 
@@ -1,12 +1,14 @@
 import argparse
 import csv
-import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock, Thread
 
 from zenlog import log
 
-from client.ResourceLoader import create_blockchain_facade, load_resources, locate_blockchain_client_class
+from client.HttpOptions import add_http_arguments, configure_http
+from client.HttpSessionRegistry import HTTP_SESSIONS
+from client.ResourceLoader import create_blockchain_api_client_for_nodes, create_blockchain_facade, load_resources
 
 from .PeersMapBuilder import EMPTY_NODE_DESCRIPTOR, PeersMapBuilder
 
@@ -25,25 +27,25 @@ class HarvesterDescriptor:
 class BatchDownloader:
 	# pylint: disable=too-many-instance-attributes
 
-	def __init__(self, resources, thread_count, mosaic_id):
+	def __init__(self, resources, thread_count, mosaic_id, use_node_pool):
 		self.resources = resources
 		self.thread_count = thread_count
+		self.use_node_pool = use_node_pool
 		self.nodes = self.resources.nodes.find_all_not_by_role('seed-only')
 
 		self.max_height = 0
 		self.next_height = 0
 
 		self.facade = create_blockchain_facade(self.resources)
-		self.api_clients = []
+		self.api_client = None
 		self.public_key_to_descriptor_map = {}
 		self.lock = Lock()
 		self.mosaic_id = mosaic_id
 
 	def download_all(self, num_blocks):
-		for node_descriptor in self.nodes:
-			self.api_clients.append(locate_blockchain_client_class(self.resources)(node_descriptor.host, timeout=60, retry_post=True))
+		self.api_client = create_blockchain_api_client_for_nodes(self.resources, self.nodes, self.use_node_pool, timeout=60, retry_post=True)
 
-		chain_height = random.choice(self.api_clients).get_chain_height()
+		chain_height = self.api_client.get_chain_height()
 
 		log.info(f'chain height is {chain_height}')
 		min_height = max(1, chain_height - num_blocks + 1)
@@ -59,6 +61,8 @@ class BatchDownloader:
 		for thread in threads:
 			thread.join()
 
+		self._resolve_harvesters()
+
 	def _download_thread(self):
 		while True:
 			with self.lock:
@@ -69,50 +73,72 @@ class BatchDownloader:
 
 				self.next_height += 1
 
-			api_client = random.choice(self.api_clients)
-
 			num_unique_harvesters = len(self.public_key_to_descriptor_map)
 			log.debug(f'processing block at {height} [{self.max_height - height} remaining, {num_unique_harvesters} unique harvesters]')
-			signer_public_key = api_client.get_harvester_signer_public_key(height)
+			signer_public_key = self.api_client.get_harvester_signer_public_key(height)
 
 			with self.lock:
-				if signer_public_key in self.public_key_to_descriptor_map:
-					continue
+				self.public_key_to_descriptor_map.setdefault(signer_public_key, None)
+
+	def _resolve_harvesters(self):
+		# balances are looked up once all harvesters are known, so that they can be retrieved in batches
+		signer_public_keys = list(self.public_key_to_descriptor_map.keys())
+		signer_addresses = [self.facade.network.public_key_to_address(signer_public_key) for signer_public_key in signer_public_keys]
 
-				self.public_key_to_descriptor_map[signer_public_key] = None
+		log.info(f'retrieving balances of {len(signer_addresses)} harvesters')
+		main_account_infos = self._get_main_account_infos(signer_addresses)
 
-			signer_address = self.facade.network.public_key_to_address(signer_public_key)
-			(main_address, main_public_key, balance) = self._get_balance_follow_links(api_client, signer_address)
+		for (signer_public_key, signer_address, account_info) in zip(signer_public_keys, signer_addresses, main_account_infos):
+			if not account_info:
+				log.warning(f'skipping signer {signer_address} because its main account could not be retrieved')
+				del self.public_key_to_descriptor_map[signer_public_key]
+				continue
 
-			log.debug(f'signer {signer_address} is linked to {main_address} with balance {balance}')
+			log.debug(f'signer {signer_address} is linked to {account_info.address} with balance {account_info.balance}')
 
 			descriptor = HarvesterDescriptor()
 			descriptor.signer_public_key = signer_public_key
 			descriptor.signer_address = signer_address
-			descriptor.main_public_key = main_public_key
-			descriptor.main_address = main_address
-			descriptor.balance = balance
-
-			with self.lock:
-				self.public_key_to_descriptor_map[signer_public_key] = descriptor
-
-	def _get_balance_follow_links(self, api_client, address):
-		account_info = api_client.get_account_info(address)
-
-		if 'REMOTE' == account_info.remote_status:  # nem
-			account_info = api_client.get_account_info(address, forwarded=True)
-		if 'Remote' == account_info.remote_status:  # symbol
-			main_address = self.facade.network.public_key_to_address(account_info.linked_public_key)
-			account_info = api_client.get_account_info(main_address, self.mosaic_id)
-
-		return (account_info.address, account_info.public_key, account_info.balance)
+			descriptor.main_public_key = account_info.public_key
+			descriptor.main_address = account_info.address
+			descriptor.balance = account_info.balance
+			self.public_key_to_descriptor_map[signer_public_key] = descriptor
+
+	def _get_main_account_infos(self, addresses):
+		account_infos = self.api_client.get_account_infos(addresses)
+
+		# nem has no batch endpoint for forwarded accounts, so remote accounts are forwarded individually
+		nem_remote_indexes = [
+			index for (index, account_info) in enumerate(account_infos) if account_info and 'REMOTE' == account_info.remote_status
+		]
+		with ThreadPoolExecutor(self.thread_count) as executor:
+			forwarded_account_infos = executor.map(
+				lambda index: self.api_client.get_account_info(addresses[index], forwarded=True),
+				nem_remote_indexes)
+
+			for (index, account_info) in zip(nem_remote_indexes, forwarded_account_infos):
+				account_infos[index] = account_info
+
+		symbol_remote_indexes = [
+			index for (index, account_info) in enumerate(account_infos) if account_info and 'Remote' == account_info.remote_status
+		]
+		if symbol_remote_indexes:
+			main_addresses = [
+				self.facade.network.public_key_to_address(account_infos[index].linked_public_key) for index in symbol_remote_indexes
+			]
+			main_account_infos = self.api_client.get_account_infos(main_addresses, self.mosaic_id)
+			for (index, account_info) in zip(symbol_remote_indexes, main_account_infos):
+				account_infos[index] = account_info
+
+		return account_infos
 
 
 class HarvesterDownloader:
-	def __init__(self, resources, num_blocks, nodes_input_filepath):
+	def __init__(self, resources, num_blocks, nodes_input_filepath, use_node_pool=False):
 		self.resources = resources
 		self.num_blocks = num_blocks
 		self.nodes_input_filepath = nodes_input_filepath
+		self.use_node_pool = use_node_pool
 
 		self.peers_map = {}
 
@@ -121,9 +147,14 @@ class HarvesterDownloader:
 
 		log.info(f'downloading harvester activity to {output_filepath} for last {self.num_blocks} blocks')
 
-		batch_downloader = BatchDownloader(self.resources, thread_count, mosaic_id)
+		batch_downloader = BatchDownloader(self.resources, thread_count, mosaic_id, self.use_node_pool)
 		batch_downloader.download_all(self.num_blocks)
 
+		session_statistics = HTTP_SESSIONS.statistics
+		log.info(
+			f'http sessions: {session_statistics.session_count} created, {session_statistics.reused_session_count} reused;'
+			f' {session_statistics.request_count} requests over {session_statistics.connection_count} connections')
+
 		with open(output_filepath, 'wt', encoding='utf8') as outfile:
 			column_names = ['signer_address', 'main_address', 'host', 'name', 'height', 'finalized_height', 'version', 'balance']
 			csv_writer = csv.DictWriter(outfile, column_names)
@@ -159,11 +190,15 @@ def main():
 	parser.add_argument('--output', help='output file', required=True)
 	parser.add_argument('--thread-count', help='number of threads', type=int, default=16)
 	parser.add_argument('--mosaic-id', help='mosaic id', default=MAINNET_XYM_MOSAIC_ID)
+	parser.add_argument('--node-pool', help='spread requests over all nodes instead of a random one', action='store_true')
+	add_http_arguments(parser, include_caches=True)
 	args = parser.parse_args()
 
 	resources = load_resources(args.resources)
+	configure_http(args)
+	HTTP_SESSIONS.configure(args.thread_count)
 	blocks_per_day = 60 if 'nem' == resources.friendly_name else 120
-	downloader = HarvesterDownloader(resources, int(args.days * 24 * blocks_per_day), args.nodes)
+	downloader = HarvesterDownloader(resources, int(args.days * 24 * blocks_per_day), args.nodes, args.node_pool)
 	downloader.download(args.thread_count, args.output, args.mosaic_id)
 
 
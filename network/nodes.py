@@ -1,7 +1,7 @@
 import argparse
 import json
-import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock, Thread
 
 from requests.exceptions import RequestException
@@ -11,13 +11,19 @@ from symbolchain.Network import NetworkLocator
 from symbolchain.symbol.Network import Network as SymbolNetwork
 from zenlog import log
 
-from client.ResourceLoader import load_resources, locate_blockchain_client_class
+from client.CircuitBreaker import CIRCUIT_BREAKERS
+from client.HttpOptions import add_http_arguments, configure_http
+from client.HttpSessionRegistry import HTTP_SESSIONS
+from client.PeerSslContext import PEER_SSL_CONTEXTS
+from client.ResourceLoader import create_blockchain_api_client_for_nodes, load_resources, locate_blockchain_client_class
+from client.SymbolClient import CHAIN_STATISTICS_PACKET_TYPE, NODE_INFO_PACKET_TYPE, PEERS_PACKET_TYPE, SymbolPeerClient
+from client.SymbolPeerProber import SymbolPeerProber
 
 
 class NodeDownloader:
 	# pylint: disable=too-many-instance-attributes
 
-	def __init__(self, resources, thread_count, timeout, network_name, certificate_directory):
+	def __init__(self, resources, thread_count, timeout, network_name, certificate_directory, use_node_pool=False):
 		# pylint: disable=too-many-arguments
 
 		self.resources = resources
@@ -25,11 +31,13 @@ class NodeDownloader:
 		self.timeout = timeout
 		self.network_name = network_name
 		self.certificate_directory = certificate_directory
+		self.use_node_pool = use_node_pool
 
 		self.api_client_class = locate_blockchain_client_class(resources)
 		self.visited_hosts = set()
 		self.remaining_api_clients = []
-		self.strong_api_clients = []
+		self.remaining_peer_api_clients = []
+		self.strong_api_client = None
 		self.public_key_to_node_info_map = {}
 		self.busy_thread_count = 0
 		self.lock = Lock()
@@ -43,20 +51,44 @@ class NodeDownloader:
 		self.remaining_api_clients = [
 			self.api_client_class(node_descriptor.host) for node_descriptor in self.resources.nodes.find_all_by_role(None)
 		]
-		self.strong_api_clients = [
-			self.api_client_class(node_descriptor.host) for node_descriptor in self.resources.nodes.find_all_not_by_role('seed-only')
-		]
+		self.strong_api_client = create_blockchain_api_client_for_nodes(
+			self.resources,
+			self.resources.nodes.find_all_not_by_role('seed-only'),
+			self.use_node_pool)
+
+		while True:
+			log.info(f'starting {self.thread_count} crawler threads')
+			threads = [Thread(target=self._discover_thread) for i in range(0, self.thread_count)]
+
+			for thread in threads:
+				thread.start()
 
-		log.info(f'starting {self.thread_count} crawler threads')
-		threads = [Thread(target=self._discover_thread) for i in range(0, self.thread_count)]
+			for thread in threads:
+				thread.join()
 
-		for thread in threads:
-			thread.start()
+			# peer-only nodes are probed all at once, which is much faster than tying up crawler threads with blocking sockets;
+			# their peer lists can queue more nodes, so crawling continues until no new nodes are found
+			if not self.remaining_peer_api_clients:
+				break
 
-		for thread in threads:
-			thread.join()
+			self._probe_peer_nodes()
 
 		log.info(f'crawling completed and discovered {len(self.public_key_to_node_info_map)} nodes')
+		self._add_balances()
+
+		circuit_breaker_statistics = CIRCUIT_BREAKERS.statistics
+		log.info(
+			f'circuit breakers: opened {circuit_breaker_statistics.open_count} times, rejected {circuit_breaker_statistics.rejected_request_count}'
+			f' requests and denied {circuit_breaker_statistics.denied_retry_count} retries')
+
+		session_statistics = HTTP_SESSIONS.statistics
+		log.info(
+			f'http sessions: {session_statistics.session_count} created, {session_statistics.reused_session_count} reused;'
+			f' {session_statistics.request_count} requests over {session_statistics.connection_count} connections')
+
+		if self.certificate_directory and not self.is_nem:
+			handshake_statistics = PEER_SSL_CONTEXTS.get(self.certificate_directory).statistics
+			log.info(f'peer tls handshakes: {handshake_statistics.full} full, {handshake_statistics.resumed} resumed')
 
 	def _discover_thread(self):
 		while self.remaining_api_clients or self.busy_thread_count:
@@ -76,6 +108,7 @@ class NodeDownloader:
 			)
 
 			is_reachable = False
+			main_public_key = None
 			try:
 				json_node = api_client.get_node_info()
 				json_node['extraData'] = {'balance': 0, 'height': 0, 'finalizedHeight': 0}
@@ -87,7 +120,7 @@ class NodeDownloader:
 
 					json_peers = api_client.get_peers()
 
-					self._add_supplemental_account_information(network, main_public_key, json_node, api_client)
+					self._add_supplemental_node_information(json_node, api_client)
 
 			except (RequestException, TimeoutError, ConnectionRefusedError) as ex:
 				log.warning(
@@ -105,6 +138,42 @@ class NodeDownloader:
 				if self.busy_thread_count < self.thread_count - 1:
 					log.debug(f'idling threads detected; only {self.busy_thread_count} busy')
 
+	def _probe_peer_nodes(self):
+		with self.lock:
+			peer_api_clients = []
+			for api_client in self.remaining_peer_api_clients:
+				if api_client.node_host not in self.visited_hosts:
+					self.visited_hosts.add(api_client.node_host)
+					peer_api_clients.append(api_client)
+
+			self.remaining_peer_api_clients = []
+
+		log.info(f'probing {len(peer_api_clients)} peer nodes')
+		prober = SymbolPeerProber(PEER_SSL_CONTEXTS.get(self.certificate_directory), self.timeout)
+		probe_results = prober.probe(
+			[(api_client.node_host, api_client.node_port) for api_client in peer_api_clients],
+			(NODE_INFO_PACKET_TYPE, CHAIN_STATISTICS_PACKET_TYPE, PEERS_PACKET_TYPE))
+
+		with ThreadPoolExecutor(self.thread_count) as executor:
+			list(executor.map(self._process_probe_result, peer_api_clients, probe_results))
+
+	def _process_probe_result(self, api_client, probe_result):
+		if probe_result.error:
+			log.warning(f'failed to probe peer {api_client.node_host}:{api_client.node_port}\n{probe_result.error}')
+			return
+
+		json_node = probe_result.responses[NODE_INFO_PACKET_TYPE]
+		chain_statistics = probe_result.responses[CHAIN_STATISTICS_PACKET_TYPE]
+		json_node['extraData'] = {'balance': 0, 'height': chain_statistics['height'], 'finalizedHeight': chain_statistics['finalizedHeight']}
+
+		network = self._get_and_check_network(json_node)
+		if not network:
+			return
+
+		main_public_key = self._find_main_public_key(network, json_node)
+		with self.lock:
+			self._update(main_public_key, json_node, probe_result.responses[PEERS_PACKET_TYPE])
+
 	def _get_and_check_network(self, json_node):
 		if self.is_nem:
 			networks = NemNetwork.NETWORKS
@@ -128,11 +197,9 @@ class NodeDownloader:
 		return None
 
 	def _find_main_public_key(self, network, json_node):
-		strong_api_client = random.choice(self.strong_api_clients)
-
 		if self.is_nem:
 			node_address = network.public_key_to_address(PublicKey(json_node['identity']['public-key']))
-			main_account_info = strong_api_client.get_account_info(node_address, forwarded=True)
+			main_account_info = self.strong_api_client.get_account_info(node_address, forwarded=True)
 
 			if 'ACTIVE' == main_account_info.remote_status:
 				json_node['identity']['node-public-key'] = json_node['identity']['public-key']
@@ -142,17 +209,30 @@ class NodeDownloader:
 
 		return PublicKey(json_node['publicKey'])
 
-	def _add_supplemental_account_information(self, network, main_public_key, json_node, api_client):
-		strong_api_client = random.choice(self.strong_api_clients)
-
-		main_account_info = strong_api_client.get_account_info(network.public_key_to_address(main_public_key))
-
-		json_node['extraData']['balance'] = main_account_info.balance if main_account_info else 0
+	def _add_supplemental_node_information(self, json_node, api_client):
 		json_node['extraData']['height'] = api_client.get_chain_height()
 
 		if not self.is_nem:
 			json_node['extraData']['finalizedHeight'] = api_client.get_finalization_info().height
 
+	def _add_balances(self):
+		# balances are looked up once all nodes are known, so that they can be retrieved in batches
+		networks = NemNetwork.NETWORKS if self.is_nem else SymbolNetwork.NETWORKS
+		network = NetworkLocator.find_by_name(networks, self.network_name)
+
+		main_public_keys = list(self.public_key_to_node_info_map.keys())
+		log.info(f'retrieving balances of {len(main_public_keys)} nodes')
+		try:
+			main_account_infos = self.strong_api_client.get_account_infos([
+				network.public_key_to_address(main_public_key) for main_public_key in main_public_keys
+			])
+		except RequestException as ex:
+			log.warning(f'failed to load node balances\n{ex}')
+			return
+
+		for (main_public_key, main_account_info) in zip(main_public_keys, main_account_infos):
+			self.public_key_to_node_info_map[main_public_key]['extraData']['balance'] = main_account_info.balance if main_account_info else 0
+
 	# this function must be called in context of self.lock
 	def _pop_next_api_client(self):
 		api_client = None
@@ -181,8 +261,13 @@ class NodeDownloader:
 				certificate_directory=self.certificate_directory)
 
 			if peer_api_client and peer_api_client.node_host not in self.visited_hosts:
-				if not any(peer_api_client.node_host == api_client.node_host for api_client in self.remaining_api_clients):
-					self.remaining_api_clients.append(peer_api_client)
+				# crawling does not depend on any single peer, so failing peers are skipped rather than waited for
+				CIRCUIT_BREAKERS.guard([peer_api_client.node_host])
+
+				is_peer_only = isinstance(peer_api_client, SymbolPeerClient)
+				remaining_api_clients = self.remaining_peer_api_clients if is_peer_only else self.remaining_api_clients
+				if not any(peer_api_client.node_host == api_client.node_host for api_client in remaining_api_clients):
+					remaining_api_clients.append(peer_api_client)
 
 	def save(self, output_filepath):
 		class PublicKeyAwareEncoder(json.JSONEncoder):
@@ -210,10 +295,15 @@ def main():
 	parser.add_argument('--timeout', help='peer timeout', type=int, default=20)
 	parser.add_argument('--network', help='network name filter', default='mainnet')
 	parser.add_argument('--certs', help='ssl certificate directory (required for Symbol peer node communication)')
+	parser.add_argument('--node-pool', help='spread account lookups over all non seed-only nodes instead of a random one', action='store_true')
+	add_http_arguments(parser)
 	args = parser.parse_args()
 
+	configure_http(args)
+
 	resources = load_resources(args.resources)
-	downloader = NodeDownloader(resources, args.thread_count, args.timeout, args.network, args.certs)
+	HTTP_SESSIONS.configure(args.thread_count)
+	downloader = NodeDownloader(resources, args.thread_count, args.timeout, args.network, args.certs, args.node_pool)
 	downloader.discover()
 	downloader.save(args.output)
 
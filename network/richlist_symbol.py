@@ -3,19 +3,25 @@ import csv
 
 from zenlog import log
 
+from client.HttpOptions import add_http_arguments, configure_http
+from client.ParallelPaginator import DEFAULT_PAGE_WINDOW_SIZE, ParallelPaginator
 from client.ResourceLoader import create_blockchain_api_client, load_resources
 
 from .PeersMapBuilder import EMPTY_NODE_DESCRIPTOR, PeersMapBuilder
 
 MAINNET_XYM_MOSAIC_ID = '6BED913FA20223F8'
+RICHLIST_PAGE_SIZE = 100
 
 
 class RichListDownloader:
-	def __init__(self, resources, min_balance, mosaic_id, nodes_input_filepath):
+	def __init__(self, resources, min_balance, mosaic_id, nodes_input_filepath, page_window_size=DEFAULT_PAGE_WINDOW_SIZE):
+		# pylint: disable=too-many-arguments
+
 		self.resources = resources
 		self.min_balance = min_balance
 		self.mosaic_id = mosaic_id
 		self.nodes_input_filepath = nodes_input_filepath
+		self.page_window_size = page_window_size
 		self.api_client = create_blockchain_api_client(self.resources)
 
 		self.finalization_epoch = 0
@@ -30,7 +36,6 @@ class RichListDownloader:
 		)
 		self._download_finalization_information()
 
-		page_number = 1
 		with open(output_filepath, 'wt', encoding='utf8') as outfile:
 			column_names = [
 				'address', 'balance', 'is_voting', 'has_ever_voted', 'voting_end_epoch', 'current_epoch_votes',
@@ -39,13 +44,26 @@ class RichListDownloader:
 			csv_writer = csv.DictWriter(outfile, column_names)
 			csv_writer.writeheader()
 
-			while True:
-				log.debug(f'processing page {page_number}')
+			paginator = ParallelPaginator(
+				self._fetch_page,
+				lambda account_info: account_info.address,
+				lambda account_infos: account_infos[-1].balance < self.min_balance,
+				self.page_window_size)
+			for (page_index, account_infos) in enumerate(paginator):
+				log.debug(f'processing page {page_index + 1}')
 
-				if not self._download_page(page_number, csv_writer):
+				if not self._process_page(account_infos, csv_writer):
 					return
 
-				page_number += 1
+	def _fetch_page(self, page_number):
+		# account infos are streamed in balance order, so reading (and downloading) a page stops at the first one below the minimum
+		account_infos = []
+		for account_info in self.api_client.get_richlist_account_infos(page_number, RICHLIST_PAGE_SIZE, self.mosaic_id):
+			account_infos.append(account_info)
+			if account_info.balance < self.min_balance:
+				break
+
+		return account_infos
 
 	def _prepare_nodes(self):
 		if not self.nodes_input_filepath:
@@ -61,8 +79,8 @@ class RichListDownloader:
 
 		log.info(f'finalization epoch is {self.finalization_epoch} ({len(self.voters_map)} participating voters)')
 
-	def _download_page(self, page_number, csv_writer):
-		for account_info in self.api_client.get_richlist_account_infos(page_number, 100, self.mosaic_id):
+	def _process_page(self, account_infos, csv_writer):
+		for account_info in account_infos:
 			if account_info.balance < self.min_balance:
 				log.info(f'found account {account_info.address} with balance {account_info.balance} less than min balance')
 				return False
@@ -104,10 +122,14 @@ def main():
 	parser.add_argument('--mosaic-id', help='mosaic id', default=MAINNET_XYM_MOSAIC_ID)
 	parser.add_argument('--nodes', help='(optional) nodes json file')
 	parser.add_argument('--output', help='output file', required=True)
+	parser.add_argument('--page-window', help='number of pages downloaded concurrently', type=int, default=DEFAULT_PAGE_WINDOW_SIZE)
+	add_http_arguments(parser)
 	args = parser.parse_args()
 
+	configure_http(args)
+
 	resources = load_resources(args.resources)
-	downloader = RichListDownloader(resources, args.min_balance, args.mosaic_id, args.nodes)
+	downloader = RichListDownloader(resources, args.min_balance, args.mosaic_id, args.nodes, args.page_window)
 	downloader.download(args.output)
 
 
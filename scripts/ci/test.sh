@@ -2,4 +2,4 @@
 
 set -ex
 
-echo "no tests to run"
+python3 -m unittest discover --start-directory tests --top-level-directory .
@@ -0,0 +1,83 @@
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+from symbolchain.CryptoTypes import PublicKey
+from symbolchain.facade.NemFacade import NemFacade
+
+from client.NemClient import NemClient
+from client.ResponseCache import RESPONSE_CACHE
+
+from .utils import start_json_server
+
+ADDRESSES = [str(NemFacade('mainnet').network.public_key_to_address(PublicKey(bytes([i] * 32)))) for i in range(1, 4)]
+
+
+def _create_json_account_and_meta(address, balance):
+	return {
+		'account': {
+			'address': address,
+			'vestedBalance': balance,
+			'balance': balance,
+			'publicKey': None,
+			'importance': 0,
+			'harvestedBlocks': 0
+		},
+		'meta': {'remoteStatus': 'INACTIVE'}
+	}
+
+
+def _create_nem_node(is_batch_lookup_supported):
+	# the second address is unknown to the node
+	address_to_balance_map = {ADDRESSES[0]: 1000000, ADDRESSES[2]: 3000000}
+
+	def respond(method, path, json_body):
+		if ('POST', '/account/get/batch') == (method, path) and is_batch_lookup_supported:
+			return (200, {'data': [
+				_create_json_account_and_meta(json_account['account'], address_to_balance_map[json_account['account']])
+				for json_account in reversed(json_body['data']) if json_account['account'] in address_to_balance_map
+			]})
+
+		url_parts = urlsplit(path)
+		if ('GET', '/account/get') == (method, url_parts.path):
+			address = parse_qs(url_parts.query)['address'][0]
+			if address in address_to_balance_map:
+				return (200, _create_json_account_and_meta(address, address_to_balance_map[address]))
+
+		return (404, {'error': 'Not Found'})
+
+	return start_json_server(respond)
+
+
+class AccountBatchTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		self.server = None
+
+	def tearDown(self):
+		self.server.close()
+
+	def _get_account_infos(self, is_batch_lookup_supported):
+		self.server = _create_nem_node(is_batch_lookup_supported)
+		return NemClient('127.0.0.1', self.server.port).get_account_infos(ADDRESSES)
+
+	def _assert_account_infos(self, account_infos):
+		self.assertEqual(3, len(account_infos))
+		self.assertEqual((ADDRESSES[0], 1), (str(account_infos[0].address), account_infos[0].balance))
+		self.assertIsNone(account_infos[1])
+		self.assertEqual((ADDRESSES[2], 3), (str(account_infos[2].address), account_infos[2].balance))
+
+	def test_nem_account_infos_are_retrieved_in_batches(self):
+		# Act:
+		account_infos = self._get_account_infos(True)
+
+		# Assert:
+		self._assert_account_infos(account_infos)
+		self.assertEqual([('POST', '/account/get/batch')], self.server.requests)
+
+	def test_nem_account_infos_fall_back_to_individual_requests(self):
+		# Act:
+		account_infos = self._get_account_infos(False)
+
+		# Assert:
+		self._assert_account_infos(account_infos)
+		self.assertEqual(['POST'] + ['GET'] * 3, [method for (method, _) in self.server.requests])
@@ -0,0 +1,76 @@
+import unittest
+
+from client.AdaptivePageSize import AdaptivePageSize, PageSizeLimits
+
+LIMITS = PageSizeLimits(10, 100)
+
+
+class AdaptivePageSizeTest(unittest.TestCase):
+	def test_initial_value_is_quarter_of_max(self):
+		self.assertEqual(25, AdaptivePageSize(LIMITS).value)
+		self.assertEqual(10, AdaptivePageSize(PageSizeLimits(10, 20)).value)
+
+	def test_value_grows_up_to_max_while_pages_are_fast(self):
+		# Arrange:
+		page_size = AdaptivePageSize(LIMITS, target_latency=4)
+
+		# Act:
+		values = []
+		for _ in range(4):
+			page_size.record_latency(1)
+			values.append(page_size.value)
+
+		# Assert:
+		self.assertEqual([50, 100, 100, 100], values)
+
+	def test_value_is_unchanged_while_pages_are_within_target(self):
+		# Arrange:
+		page_size = AdaptivePageSize(LIMITS, target_latency=4)
+
+		# Act:
+		page_size.record_latency(2)
+		page_size.record_latency(4)
+
+		# Assert:
+		self.assertEqual(25, page_size.value)
+
+	def test_value_shrinks_down_to_min_while_pages_are_slow(self):
+		# Arrange:
+		page_size = AdaptivePageSize(LIMITS, target_latency=4)
+
+		# Act:
+		values = []
+		for _ in range(3):
+			page_size.record_latency(5)
+			values.append(page_size.value)
+
+		# Assert:
+		self.assertEqual([12, 10, 10], values)
+
+	def test_timeout_shrinks_value_and_caps_growth(self):
+		# Arrange:
+		page_size = AdaptivePageSize(LIMITS, target_latency=4)
+		page_size.record_latency(1)
+
+		# Act:
+		is_reduced = page_size.record_timeout()
+		for _ in range(3):
+			page_size.record_latency(1)
+
+		# Assert:
+		self.assertTrue(is_reduced)
+		self.assertEqual(25, page_size.value)
+		self.assertEqual(25, page_size.max_value)
+
+	def test_timeout_at_min_is_not_recoverable(self):
+		# Arrange:
+		page_size = AdaptivePageSize(LIMITS)
+		for _ in range(2):
+			page_size.record_timeout()
+
+		# Act:
+		is_reduced = page_size.record_timeout()
+
+		# Assert:
+		self.assertFalse(is_reduced)
+		self.assertEqual(10, page_size.value)
@@ -0,0 +1,116 @@
+import unittest
+
+import requests
+
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import SymbolClient
+
+from .utils import start_json_server
+
+AGGREGATE_HASHES = ['AB' * 32, 'CD' * 32]
+
+
+def _make_aggregate(aggregate_hash):
+	return {
+		'meta': {'hash': aggregate_hash, 'height': '100'},
+		'transaction': {'transactions': [{'transaction': {'type': 0x4154, 'hash': aggregate_hash}}]}
+	}
+
+
+def _create_symbol_node(batch_statuses):
+	"""Creates a node that answers batch lookups with the next of batch_statuses (200 when exhausted)."""
+
+	batch_statuses = list(batch_statuses)
+
+	def respond(method, path, json_body):
+		if '/chain/info' == path:
+			return (200, {'height': '1000', 'latestFinalizedBlock': {'finalizationEpoch': 1, 'finalizationPoint': 1, 'height': '990'}})
+
+		if ('POST', '/transactions/confirmed') == (method, path):
+			status = batch_statuses.pop(0) if batch_statuses else 200
+			if 200 != status:
+				return (status, {'code': 'Failure', 'message': str(status)})
+
+			return (200, [_make_aggregate(aggregate_hash) for aggregate_hash in json_body['transactionIds']])
+
+		aggregate_hash = path.split('/')[-1]
+		if path.startswith('/transactions/confirmed/') and aggregate_hash in AGGREGATE_HASHES:
+			return (200, _make_aggregate(aggregate_hash))
+
+		return (404, {'code': 'ResourceNotFound'})
+
+	return start_json_server(respond)
+
+
+class BatchTransactionLookupTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		self.server = None
+
+	def tearDown(self):
+		if self.server:
+			self.server.close()
+
+	def _get_transaction_requests(self):
+		return [request for request in self.server.requests if '/chain/info' != request[1]]
+
+	def _get_embedded_transactions_map(self, client):
+		return client._get_embedded_transactions_map(AGGREGATE_HASHES)  # pylint: disable=protected-access
+
+	def _assert_embedded_transactions(self, aggregate_hash_to_embedded_transactions_map):
+		self.assertEqual(
+			{aggregate_hash: [{'type': 0x4154, 'hash': aggregate_hash}] for aggregate_hash in AGGREGATE_HASHES},
+			aggregate_hash_to_embedded_transactions_map)
+
+	def test_batch_lookup_is_used_when_supported(self):
+		# Arrange:
+		self.server = _create_symbol_node([])
+		client = SymbolClient('127.0.0.1', self.server.port)
+
+		# Act:
+		aggregate_hash_to_embedded_transactions_map = self._get_embedded_transactions_map(client)
+
+		# Assert:
+		self._assert_embedded_transactions(aggregate_hash_to_embedded_transactions_map)
+		self.assertEqual([('POST', '/transactions/confirmed')], self._get_transaction_requests())
+		self.assertTrue(client.is_batch_transaction_lookup_supported)
+
+	def _assert_unsupported_batch_lookup_falls_back_permanently(self, status):
+		# Arrange:
+		self.server = _create_symbol_node([status])
+		client = SymbolClient('127.0.0.1', self.server.port)
+
+		# Act:
+		maps = [self._get_embedded_transactions_map(client) for _ in range(2)]
+
+		# Assert: the batch endpoint was only tried once
+		for aggregate_hash_to_embedded_transactions_map in maps:
+			self._assert_embedded_transactions(aggregate_hash_to_embedded_transactions_map)
+
+		self.assertEqual(1, self.server.requests.count(('POST', '/transactions/confirmed')))
+		self.assertFalse(client.is_batch_transaction_lookup_supported)
+
+	def test_batch_lookup_falls_back_permanently_when_not_found(self):
+		self._assert_unsupported_batch_lookup_falls_back_permanently(404)
+
+	def test_batch_lookup_falls_back_permanently_when_method_not_allowed(self):
+		self._assert_unsupported_batch_lookup_falls_back_permanently(405)
+
+	def test_batch_lookup_falls_back_permanently_when_not_implemented(self):
+		self._assert_unsupported_batch_lookup_falls_back_permanently(501)
+
+	def test_transient_batch_lookup_failure_is_raised_and_batch_lookup_is_kept(self):
+		# Arrange: the batch lookup fails even after being retried once
+		self.server = _create_symbol_node([503, 503])
+		client = SymbolClient('127.0.0.1', self.server.port, retry_count=1)
+
+		# Act:
+		with self.assertRaises(requests.exceptions.RequestException):
+			self._get_embedded_transactions_map(client)
+
+		aggregate_hash_to_embedded_transactions_map = self._get_embedded_transactions_map(client)
+
+		# Assert:
+		self._assert_embedded_transactions(aggregate_hash_to_embedded_transactions_map)
+		self.assertEqual([('POST', '/transactions/confirmed')] * 3, self._get_transaction_requests())
+		self.assertTrue(client.is_batch_transaction_lookup_supported)
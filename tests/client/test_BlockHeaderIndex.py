@@ -0,0 +1,178 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from client.BlockHeaderIndex import GROWTH_RECORD_COUNT, BlockHeaderIndex, BlockHeaderIndexRegistry, FinalizedHeightTracker
+from client.BlockMetadataCache import BLOCK_METADATA_CACHE
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import SymbolClient
+
+from .utils import start_json_server
+
+BLOCK_HASH = bytes(range(32))
+SIGNER_PUBLIC_KEY = bytes(range(32, 64))
+
+
+class BlockHeaderIndexTest(unittest.TestCase):
+	def setUp(self):
+		self.temp_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+		self.filepath = Path(self.temp_directory.name) / 'index.dat'
+
+	def tearDown(self):
+		self.temp_directory.cleanup()
+
+	def test_missing_records_are_not_found(self):
+		# Arrange:
+		index = BlockHeaderIndex(self.filepath)
+
+		# Act + Assert:
+		self.assertIsNone(index.find(10))
+		self.assertIsNone(index.find(10 * GROWTH_RECORD_COUNT))
+		index.close()
+
+	def test_fields_are_merged_into_partial_records(self):
+		# Arrange:
+		index = BlockHeaderIndex(self.filepath)
+
+		# Act:
+		index.store(10, block_hash=BLOCK_HASH)
+		partial_record = index.find(10)
+		index.store(10, 1234, 100, signer_public_key=SIGNER_PUBLIC_KEY)
+		record = index.find(10)
+		index.close()
+
+		# Assert:
+		self.assertEqual((None, None, BLOCK_HASH, None), tuple(partial_record))
+		self.assertEqual((1234, 100, BLOCK_HASH, SIGNER_PUBLIC_KEY), tuple(record))
+
+	def test_index_grows_to_store_high_records(self):
+		# Arrange:
+		index = BlockHeaderIndex(self.filepath)
+		height = 3 * GROWTH_RECORD_COUNT + 5
+
+		# Act:
+		index.store(height, 1234, 100)
+		record = index.find(height)
+		capacity = index.capacity
+		index.close()
+
+		# Assert:
+		self.assertEqual((1234, 100, None, None), tuple(record))
+		self.assertEqual(4 * GROWTH_RECORD_COUNT, capacity)
+
+	def test_records_persist_across_instances(self):
+		# Arrange:
+		index = BlockHeaderIndex(self.filepath)
+		index.store(10, 1234, 100, BLOCK_HASH, SIGNER_PUBLIC_KEY)
+		index.close()
+
+		# Act:
+		reopened_index = BlockHeaderIndex(self.filepath)
+		record = reopened_index.find(10)
+		reopened_index.close()
+
+		# Assert:
+		self.assertEqual((1234, 100, BLOCK_HASH, SIGNER_PUBLIC_KEY), tuple(record))
+
+	def test_incompatible_file_is_rejected(self):
+		# Arrange:
+		self.filepath.write_bytes(b'\x00' * 1024)
+
+		# Act + Assert:
+		with self.assertRaises(ValueError):
+			BlockHeaderIndex(self.filepath)
+
+
+class FinalizedHeightTrackerTest(unittest.TestCase):
+	def test_refresh_is_only_requested_for_heights_above_finalized_height(self):
+		# Arrange:
+		tracker = FinalizedHeightTracker()
+		tracker.update(100)
+
+		# Act + Assert:
+		self.assertFalse(tracker.should_refresh(100))
+		self.assertTrue(tracker.is_finalized(100))
+		self.assertFalse(tracker.is_finalized(101))
+
+	def test_refresh_is_requested_at_most_once_per_interval(self):
+		# Arrange:
+		tracker = FinalizedHeightTracker(refresh_interval=15)
+
+		# Act:
+		with patch('client.BlockHeaderIndex.time.monotonic', side_effect=[100, 110, 116]):
+			should_refresh_results = [tracker.should_refresh(50) for _ in range(3)]
+
+		# Assert:
+		self.assertEqual([True, False, True], should_refresh_results)
+
+	def test_finalized_height_never_decreases(self):
+		# Arrange:
+		tracker = FinalizedHeightTracker()
+
+		# Act:
+		tracker.update(100)
+		tracker.update(90)
+
+		# Assert:
+		self.assertEqual(100, tracker.finalized_height)
+
+
+class SymbolClientBlockHeaderIndexTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		BLOCK_METADATA_CACHE.clear()
+
+		self.temp_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+		self.block_header_indexes = BlockHeaderIndexRegistry()
+		self.block_header_indexes.configure(self.temp_directory.name)
+		self.patcher = patch('client.SymbolClient.BLOCK_HEADER_INDEXES', self.block_header_indexes)
+		self.patcher.start()
+
+		def respond(_method, path, _json_body):
+			if '/chain/info' == path:
+				return (200, {'height': '1000', 'latestFinalizedBlock': {'finalizationEpoch': 1, 'finalizationPoint': 1, 'height': '990'}})
+
+			if path.startswith('/blocks/'):
+				return (200, {
+					'meta': {'hash': BLOCK_HASH.hex(), 'height': path.split('/')[-1]},
+					'block': {'timestamp': '1234', 'feeMultiplier': 100, 'signerPublicKey': SIGNER_PUBLIC_KEY.hex()}
+				})
+
+			return (404, {'code': 'ResourceNotFound'})
+
+		self.server = start_json_server(respond)
+
+	def tearDown(self):
+		self.server.close()
+		self.patcher.stop()
+		self.block_header_indexes.close()
+		self.temp_directory.cleanup()
+		BLOCK_METADATA_CACHE.clear()
+
+	def test_only_finalized_blocks_are_indexed(self):
+		# Arrange:
+		client = SymbolClient('127.0.0.1', self.server.port)
+
+		# Act:
+		for height in (5, 995):
+			client.get_harvester_signer_public_key(height)
+
+		index = self.block_header_indexes.get('symbol.mainnet')
+
+		# Assert:
+		self.assertEqual((1234, 100, BLOCK_HASH, SIGNER_PUBLIC_KEY), tuple(index.find(5)))
+		self.assertIsNone(index.find(995))
+
+	def test_indexed_blocks_are_not_requested_again(self):
+		# Arrange:
+		SymbolClient('127.0.0.1', self.server.port).get_harvester_signer_public_key(5)
+		RESPONSE_CACHE.clear()
+		BLOCK_METADATA_CACHE.clear()
+
+		# Act:
+		public_key = SymbolClient('127.0.0.1', self.server.port).get_harvester_signer_public_key(5)
+
+		# Assert:
+		self.assertEqual(SIGNER_PUBLIC_KEY, public_key.bytes)
+		self.assertEqual(1, self.server.requests.count(('GET', '/blocks/5')))
@@ -0,0 +1,104 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from client.BlockMetadataCache import BLOCK_METADATA_CACHE, BlockMetadataCache
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import SymbolClient
+
+from .utils import start_json_server
+
+SIGNER_PUBLIC_KEY = '3E82E1C1E4A75ADAA3CBA8C101C3CD31D9817A2EB966EB3B511FB2ED45B8E262'
+
+
+class BlockMetadataCacheTest(unittest.TestCase):
+	def test_concurrent_lookups_of_same_key_call_loader_once(self):
+		# Arrange:
+		cache = BlockMetadataCache()
+		loader_calls = []
+
+		def loader():
+			loader_calls.append(threading.get_ident())
+			time.sleep(0.1)
+			return 'metadata'
+
+		# Act:
+		with ThreadPoolExecutor(8) as executor:
+			values = list(executor.map(lambda _: cache.get(123, loader), range(8)))
+
+		# Assert:
+		self.assertEqual(['metadata'] * 8, values)
+		self.assertEqual(1, len(loader_calls))
+		self.assertEqual((0, 1, 7, 1), tuple(cache.statistics))
+
+	def test_failed_lookup_is_raised_to_all_waiters_and_not_cached(self):
+		# Arrange:
+		cache = BlockMetadataCache()
+
+		def failing_loader():
+			time.sleep(0.1)
+			raise RuntimeError('node unavailable')
+
+		# Act:
+		with ThreadPoolExecutor(4) as executor:
+			futures = [executor.submit(cache.get, 123, failing_loader) for _ in range(4)]
+			errors = [future.exception() for future in futures]
+
+		value = cache.get(123, lambda: 'metadata')
+
+		# Assert:
+		self.assertTrue(all(isinstance(error, RuntimeError) for error in errors))
+		self.assertEqual('metadata', value)
+
+	def test_least_recently_used_entries_are_evicted(self):
+		# Arrange:
+		cache = BlockMetadataCache(max_size=2)
+		cache.put(1, 'one')
+		cache.put(2, 'two')
+
+		# Act:
+		cache.find(1)
+		cache.put(3, 'three')
+
+		# Assert:
+		self.assertEqual('one', cache.find(1))
+		self.assertIsNone(cache.find(2))
+		self.assertEqual('three', cache.find(3))
+
+
+class SymbolClientBlockMetadataTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		BLOCK_METADATA_CACHE.clear()
+
+		def respond(_method, path, _json_body):
+			if '/chain/info' == path:
+				return (200, {'height': '1000', 'latestFinalizedBlock': {'finalizationEpoch': 1, 'finalizationPoint': 1, 'height': '990'}})
+
+			if path.startswith('/blocks/'):
+				time.sleep(0.1)
+				return (200, {
+					'meta': {'hash': 'AB' * 32, 'height': path.split('/')[-1]},
+					'block': {'timestamp': '1000', 'feeMultiplier': 100, 'signerPublicKey': SIGNER_PUBLIC_KEY}
+				})
+
+			return (404, {'code': 'ResourceNotFound'})
+
+		self.server = start_json_server(respond)
+
+	def tearDown(self):
+		self.server.close()
+		BLOCK_METADATA_CACHE.clear()
+
+	def test_concurrent_lookups_of_same_block_are_coalesced_across_clients(self):
+		# Arrange:
+		clients = [SymbolClient('127.0.0.1', self.server.port) for _ in range(4)]
+
+		# Act:
+		with ThreadPoolExecutor(len(clients)) as executor:
+			public_keys = list(executor.map(lambda client: client.get_harvester_signer_public_key(5), clients))
+
+		# Assert:
+		self.assertEqual([SIGNER_PUBLIC_KEY] * len(clients), [str(public_key) for public_key in public_keys])
+		self.assertEqual(1, self.server.requests.count(('GET', '/blocks/5')))
@@ -0,0 +1,144 @@
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from client.CircuitBreaker import CircuitBreakers, CircuitOpenError
+from client.TimeoutHTTPAdapter import create_http_session
+
+from .utils import start_json_server
+
+UNAVAILABLE_RESPONSE = (503, {'code': 'ServiceUnavailable'})
+
+
+def _start_flaky_server(failure_count):
+	def respond(_method, _path, _json_body):
+		return UNAVAILABLE_RESPONSE if len(server.requests) <= failure_count else (200, {'height': '100'})
+
+	server = start_json_server(respond)
+	return server
+
+
+class DeadServer:
+	"""Local server that accepts connections and closes them without responding, like a node that crashed mid request."""
+
+	def __init__(self):
+		self.socket = socket.create_server(('127.0.0.1', 0))
+		self.connection_count = 0
+		threading.Thread(target=self._accept_connections, daemon=True).start()
+
+	@property
+	def port(self):
+		return self.socket.getsockname()[1]
+
+	def _accept_connections(self):
+		while True:
+			try:
+				(connection, _) = self.socket.accept()
+			except OSError:
+				return
+
+			self.connection_count += 1
+			connection.close()
+
+	def close(self):
+		self.socket.close()
+
+
+class CircuitBreakerTest(unittest.TestCase):
+	def setUp(self):
+		self.circuit_breakers = CircuitBreakers()
+		self.patchers = [
+			patch('client.TimeoutHTTPAdapter.CIRCUIT_BREAKERS', self.circuit_breakers),
+			patch('client.TimeoutHTTPAdapter.RETRY_BACKOFF_FACTOR', 0)
+		]
+		for patcher in self.patchers:
+			patcher.start()
+
+		self.server = None
+
+	def tearDown(self):
+		for patcher in self.patchers:
+			patcher.stop()
+
+		if self.server:
+			self.server.close()
+
+	def _assert_request_completes_after_failures(self):
+		# Arrange:
+		self.server = _start_flaky_server(3)
+		session = create_http_session(retry_count=20)
+
+		# Act:
+		response = session.get(f'http://127.0.0.1:{self.server.port}/chain/info')
+
+		# Assert:
+		self.assertEqual(200, response.status_code)
+		self.assertEqual(4, len(self.server.requests))
+		self.assertEqual(0, self.circuit_breakers.statistics.open_count)
+
+	def test_unguarded_request_completes_after_failures(self):
+		self._assert_request_completes_after_failures()
+
+	def test_guarded_request_completes_after_failures(self):
+		self.circuit_breakers.guard(['127.0.0.1'])
+		self._assert_request_completes_after_failures()
+
+	def _send_failing_requests(self, request_count):
+		self.server = start_json_server(lambda _method, _path, _json_body: UNAVAILABLE_RESPONSE)
+		session = create_http_session(retry_count=2)
+
+		errors = []
+		for _ in range(request_count):
+			try:
+				session.get(f'http://127.0.0.1:{self.server.port}/chain/info')
+			except requests.exceptions.RequestException as ex:
+				errors.append(ex)
+
+		return errors
+
+	def test_guarded_circuit_opens_after_failed_requests(self):
+		# Arrange:
+		self.circuit_breakers.guard(['127.0.0.1'])
+
+		# Act:
+		errors = self._send_failing_requests(4)
+
+		# Assert: each of the first three requests was retried twice before the circuit opened
+		self.assertEqual(9, len(self.server.requests))
+		self.assertEqual([False, False, False, True], [isinstance(error, CircuitOpenError) for error in errors])
+		self.assertEqual(1, self.circuit_breakers.statistics.open_count)
+
+	def test_unguarded_circuit_never_opens(self):
+		# Act:
+		errors = self._send_failing_requests(4)
+
+		# Assert:
+		self.assertEqual(12, len(self.server.requests))
+		self.assertFalse(any(isinstance(error, CircuitOpenError) for error in errors))
+		self.assertEqual(0, self.circuit_breakers.statistics.open_count)
+
+	def test_guarded_dead_host_is_short_circuited_after_bounded_attempts(self):
+		# Arrange: real backoffs, which are capped for guarded hosts
+		self.circuit_breakers.guard(['127.0.0.1'])
+		self.server = DeadServer()
+		with patch('client.TimeoutHTTPAdapter.RETRY_BACKOFF_FACTOR', 10):
+			session = create_http_session(retry_count=20)
+
+		# Act:
+		start_time = time.monotonic()
+		errors = []
+		for _ in range(10):
+			try:
+				session.get(f'http://127.0.0.1:{self.server.port}/chain/info')
+			except requests.exceptions.RequestException as ex:
+				errors.append(ex)
+
+		# Assert: each failed attempt counted, so the circuit opened during the retries of the first request
+		self.assertEqual(3, self.server.connection_count)
+		self.assertEqual([False] + [True] * 9, [isinstance(error, CircuitOpenError) for error in errors])
+		self.assertEqual(1, self.circuit_breakers.statistics.open_count)
+		self.assertGreater(10, time.monotonic() - start_time)
@@ -0,0 +1,97 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from client.HttpMetrics import HttpMetrics, normalize_endpoint
+from client.TimeoutHTTPAdapter import create_http_session
+
+from .utils import start_json_server
+
+HASH = 'AB' * 32
+ADDRESS = 'NCXIQA4FF5JB6AMQ53NQ3ZMRD3X3PJEWDJJJIGHT'
+
+
+class HttpMetricsTest(unittest.TestCase):
+	def test_endpoint_values_are_replaced_by_placeholders(self):
+		self.assertEqual('/blocks/{number}', normalize_endpoint('http://node.example.com:3000/blocks/1234'))
+		self.assertEqual('/transactions/confirmed/{hash}', normalize_endpoint(f'/transactions/confirmed/{HASH}'))
+		self.assertEqual('/mosaics/{id}', normalize_endpoint('/mosaics/6BED913FA20223F8'))
+		self.assertEqual('/accounts/{address}', normalize_endpoint(f'/accounts/{ADDRESS}'))
+		self.assertEqual('/', normalize_endpoint('http://node.example.com'))
+
+	def test_only_query_parameter_names_are_kept_in_sorted_order(self):
+		self.assertEqual(
+			'/transactions/confirmed?address&order&pageNumber',
+			normalize_endpoint(f'/transactions/confirmed?pageNumber=2&address={ADDRESS}&order=desc'))
+
+	def test_requests_are_aggregated_per_host_and_endpoint(self):
+		# Arrange:
+		metrics = HttpMetrics()
+
+		# Act:
+		metrics.record_request('alpha', '/blocks/1', 200, 0.02, 100)
+		metrics.record_request('alpha', '/blocks/2', 404, 3, 10)
+		metrics.record_request('beta', '/blocks/3', 200, 0.02, 100)
+		metrics.record_retry('alpha', '/blocks/2')
+		metrics.record_backoff('alpha', '/blocks/2', 1.5)
+
+		# Assert:
+		json_metrics = metrics.to_json()
+		self.assertEqual([('alpha', '/blocks/{number}'), ('beta', '/blocks/{number}')], [
+			(json_endpoint_metrics['host'], json_endpoint_metrics['endpoint']) for json_endpoint_metrics in json_metrics
+		])
+		self.assertEqual({'200': 1, '404': 1}, json_metrics[0]['statusCodes'])
+		self.assertEqual((1, 1, 2), tuple(json_metrics[0]['latency']['buckets'][bound] for bound in ('0.025', '2.5', '+Inf')))
+		self.assertEqual((3.02, 2), (json_metrics[0]['latency']['sum'], json_metrics[0]['latency']['count']))
+		self.assertEqual((110, 1, 1.5), (json_metrics[0]['bytesReceived'], json_metrics[0]['retries'], json_metrics[0]['backoffSeconds']))
+
+	def test_metrics_can_be_written_in_prometheus_format(self):
+		# Arrange:
+		metrics = HttpMetrics()
+		metrics.record_request('alpha', '/blocks/1', 200, 0.02, 100)
+
+		with tempfile.TemporaryDirectory() as temp_directory:
+			output_filepath = Path(temp_directory) / 'metrics.prom'
+			metrics.configure(output_filepath, 'prometheus')
+
+			# Act:
+			metrics.dump()
+			lines = output_filepath.read_text(encoding='utf8').splitlines()
+
+		metrics.configure(None)
+
+		# Assert:
+		labels = 'host="alpha",endpoint="/blocks/{number}"'
+		self.assertIn(f'http_client_requests_total{{{labels},status="200"}} 1', lines)
+		self.assertIn(f'http_client_request_duration_seconds_bucket{{{labels},le="0.01"}} 0', lines)
+		self.assertIn(f'http_client_request_duration_seconds_bucket{{{labels},le="0.025"}} 1', lines)
+		self.assertIn(f'http_client_received_bytes_total{{{labels}}} 100', lines)
+		self.assertIn('# TYPE http_client_request_duration_seconds histogram', lines)
+
+	def test_unsupported_format_is_rejected(self):
+		with self.assertRaises(ValueError):
+			HttpMetrics().configure('metrics.txt', 'xml')
+
+	def test_hidden_retries_of_session_requests_are_recorded(self):
+		# Arrange:
+		statuses = [503, 503, 200]
+		server = start_json_server(lambda _method, _path, _json_body: (statuses.pop(0), {'height': '1'}))
+		metrics = HttpMetrics()
+
+		# Act:
+		try:
+			with patch('client.TimeoutHTTPAdapter.HTTP_METRICS', metrics), patch('client.TimeoutHTTPAdapter.RETRY_BACKOFF_FACTOR', 0):
+				session = create_http_session(timeout=5, retry_count=3)
+				response = session.get(f'http://127.0.0.1:{server.port}/chain/info?x=1')
+				response.json()
+		finally:
+			server.close()
+
+		# Assert: the retried request completes once
+		[json_endpoint_metrics] = metrics.to_json()
+		self.assertEqual(('127.0.0.1', '/chain/info?x'), (json_endpoint_metrics['host'], json_endpoint_metrics['endpoint']))
+		self.assertEqual((1, {'200': 1}, 2), (
+			json_endpoint_metrics['requests'], json_endpoint_metrics['statusCodes'], json_endpoint_metrics['retries']))
+		self.assertEqual(len(json.dumps({'height': '1'})), json_endpoint_metrics['bytesReceived'])
@@ -0,0 +1,121 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmark.mock_server import create_mock_server
+from client.HttpRecorder import HttpRecorder, load_fixtures, make_exchange_key
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import SymbolClient
+from client.TimeoutHTTPAdapter import create_http_session
+
+from .utils import start_json_server
+
+CHAIN_INFO = {'height': '1234', 'latestFinalizedBlock': {'finalizationEpoch': 1, 'finalizationPoint': 1, 'height': '1200'}}
+
+
+class HttpRecorderTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		self.temp_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+		self.fixtures_filepath = Path(self.temp_directory.name) / 'fixtures.jsonl.gz'
+
+	def tearDown(self):
+		self.temp_directory.cleanup()
+
+	def _record(self, action):
+		recorder = HttpRecorder()
+		recorder.configure(record_filepath=self.fixtures_filepath)
+		with patch('client.TimeoutHTTPAdapter.HTTP_RECORDER', recorder):
+			action()
+
+		recorder.close()
+		return recorder
+
+	def test_recording_and_replaying_at_same_time_is_rejected(self):
+		with self.assertRaises(ValueError):
+			HttpRecorder().configure(self.fixtures_filepath, 'http://127.0.0.1:3000')
+
+	def test_requests_are_only_redirected_when_replaying(self):
+		# Arrange:
+		recorder = HttpRecorder()
+		replaying_recorder = HttpRecorder()
+		replaying_recorder.configure(replay_url='http://127.0.0.1:3000/')
+
+		# Act + Assert:
+		self.assertEqual(('http://node.example.com:3001/chain/info', None), recorder.redirect('http://node.example.com:3001/chain/info'))
+		self.assertEqual(
+			('http://127.0.0.1:3000/accounts?pageSize=10', 'node.example.com:3001'),
+			replaying_recorder.redirect('http://node.example.com:3001/accounts?pageSize=10'))
+		self.assertEqual(('http://127.0.0.1:3000/', 'node.example.com'), replaying_recorder.redirect('http://node.example.com'))
+
+	def test_exchanges_are_recorded_in_order(self):
+		# Arrange:
+		responses = [(404, {'code': 'ResourceNotFound'}), (200, {'id': 1})]
+		server = start_json_server(lambda _method, _path, _json_body: responses.pop(0))
+		host = f'127.0.0.1:{server.port}'
+
+		def post_twice():
+			session = create_http_session(hosts=[host], timeout=5)
+			for _ in range(2):
+				session.post(f'http://{host}/transactions?type=1', json={'id': 1})
+
+		# Act:
+		try:
+			recorder = self._record(post_twice)
+		finally:
+			server.close()
+
+		fixtures = load_fixtures(self.fixtures_filepath)
+
+		# Assert:
+		self.assertEqual(2, recorder.record_count)
+		self.assertEqual({
+			make_exchange_key('POST', host, '/transactions?type=1', '{"id": 1}'): [
+				(404, 'application/json', b'{"code": "ResourceNotFound"}'),
+				(200, 'application/json', b'{"id": 1}')
+			]
+		}, fixtures)
+
+	def test_binary_content_is_recorded_losslessly(self):
+		# Arrange:
+		content = bytes(range(256))
+		recorder = HttpRecorder()
+		recorder.configure(record_filepath=self.fixtures_filepath)
+
+		# Act:
+		recorder.record_content('GET', 'http://127.0.0.1/x', None, 200, 'application/octet-stream', content)
+		recorder.close()
+
+		fixtures = load_fixtures(self.fixtures_filepath)
+
+		# Assert:
+		self.assertEqual({make_exchange_key('GET', '127.0.0.1', '/x', None): [(200, 'application/octet-stream', content)]}, fixtures)
+
+	def test_recorded_exchanges_can_be_replayed_by_mock_server(self):
+		# Arrange: record chain info from a node that is then shut down
+		server = start_json_server(lambda _method, _path, _json_body: (200, CHAIN_INFO))
+		port = server.port
+		try:
+			self._record(lambda: SymbolClient('127.0.0.1', port).get_chain_height())
+		finally:
+			server.close()
+
+		RESPONSE_CACHE.clear()
+		mock_server = create_mock_server(self.fixtures_filepath, None)
+		threading.Thread(target=mock_server.serve_forever, daemon=True).start()
+
+		# Act:
+		try:
+			replaying_recorder = HttpRecorder()
+			replaying_recorder.configure(replay_url=f'http://127.0.0.1:{mock_server.server_address[1]}')
+			with patch('client.TimeoutHTTPAdapter.HTTP_RECORDER', replaying_recorder):
+				height = SymbolClient('127.0.0.1', port).get_chain_height()
+		finally:
+			mock_server.shutdown()
+			mock_server.server_close()
+
+		# Assert:
+		self.assertEqual(1234, height)
+		self.assertEqual((1, 0, 0, 0), tuple(mock_server.statistics))
@@ -0,0 +1,95 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from requests.adapters import DEFAULT_POOLSIZE
+
+from client.HttpSessionRegistry import HttpSessionRegistry
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import SymbolClient
+
+from .utils import start_json_server
+
+
+def _get_adapter(session):
+	return session.get_adapter('http://127.0.0.1')
+
+
+class HttpSessionRegistryTest(unittest.TestCase):
+	def test_sessions_are_shared_by_hosts_and_options(self):
+		# Arrange:
+		registry = HttpSessionRegistry()
+
+		# Act:
+		session = registry.get('alpha.example.com', timeout=5)
+		same_sessions = [registry.get('alpha.example.com', timeout=5), registry.get(['alpha.example.com'], timeout=5)]
+		other_sessions = [
+			registry.get('beta.example.com', timeout=5),
+			registry.get('alpha.example.com', timeout=10),
+			registry.get('alpha.example.com', timeout=5, retry_count=1),
+			registry.get('alpha.example.com', timeout=5, retry_post=True)
+		]
+
+		# Assert:
+		self.assertTrue(all(session is same_session for same_session in same_sessions))
+		self.assertEqual(5, len({id(session) for session in [session] + other_sessions}))
+		self.assertEqual((5, 2, 0, 0), tuple(registry.statistics))
+
+	def test_host_groups_are_shared_independent_of_order(self):
+		# Arrange:
+		registry = HttpSessionRegistry()
+
+		# Act:
+		session = registry.get(['beta.example.com', 'alpha.example.com'])
+		same_session = registry.get(['alpha.example.com', 'beta.example.com', 'alpha.example.com'])
+
+		# Assert:
+		self.assertIs(session, same_session)
+
+	def test_pools_are_sized_for_configured_thread_count(self):
+		# Arrange:
+		registry = HttpSessionRegistry()
+		default_session = registry.get('alpha.example.com')
+
+		# Act:
+		registry.configure(DEFAULT_POOLSIZE + 22)
+		session = registry.get('beta.example.com')
+		hosts = [f'node{index}.example.com' for index in range(DEFAULT_POOLSIZE + 5)]
+		group_session = registry.get(hosts)
+
+		# Assert:
+		self.assertEqual(DEFAULT_POOLSIZE, _get_adapter(default_session)._pool_maxsize)  # pylint: disable=protected-access
+		self.assertEqual(DEFAULT_POOLSIZE + 22, _get_adapter(session)._pool_maxsize)  # pylint: disable=protected-access
+		self.assertEqual(DEFAULT_POOLSIZE + 5, _get_adapter(group_session)._pool_connections)  # pylint: disable=protected-access
+
+	def test_threaded_clients_of_same_node_share_connections(self):
+		# Arrange:
+		RESPONSE_CACHE.clear()
+		server = start_json_server(lambda _method, _path, _json_body: (200, {
+			'height': '1000',
+			'latestFinalizedBlock': {'finalizationEpoch': 1, 'finalizationPoint': 1, 'height': '990'}
+		}))
+		registry = HttpSessionRegistry()
+		registry.configure(4)
+
+		# Act:
+		try:
+			with patch('client.RestClientMixin.HTTP_SESSIONS', registry):
+				clients = [SymbolClient('127.0.0.1', server.port) for _ in range(8)]
+				with ThreadPoolExecutor(4) as executor:
+					for _ in range(3):
+						RESPONSE_CACHE.clear()
+						heights = list(executor.map(lambda client: client.get_chain_height(), clients))
+
+				sessions = [client.session for client in clients]
+		finally:
+			server.close()
+
+		# Assert: connections are reused across clients and rounds
+		statistics = registry.statistics
+		self.assertEqual([1000] * 8, heights)
+		self.assertTrue(all(sessions[0] is session for session in sessions))
+		self.assertEqual((1, 7), (statistics.session_count, statistics.reused_session_count))
+		self.assertEqual(len(server.requests), statistics.request_count)
+		self.assertLessEqual(statistics.connection_count, 4)
+		self.assertLess(statistics.connection_count, statistics.request_count)
@@ -0,0 +1,70 @@
+import json
+import unittest
+
+from requests.exceptions import RequestException
+
+from client.JsonStream import ANY_INDEX, iter_json_values
+from client.NemClient import NemClient
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import SymbolClient
+
+from .utils import start_json_server
+
+
+def _split(content, chunk_size):
+	return [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+
+
+class JsonStreamTest(unittest.TestCase):
+	def test_values_split_across_chunks_are_decoded(self):
+		# Arrange: split at every byte, including within numbers, escapes and multibyte characters
+		json_document = {'data': [12345, 'a\\"b', 'ünï', {'x': [True, None, -1.5e3]}], 'other': 7}
+		chunks = _split(json.dumps(json_document, ensure_ascii=False).encode('utf8'), 1)
+
+		# Act:
+		values = list(iter_json_values(chunks, [('data', ANY_INDEX), ('other',)]))
+
+		# Assert:
+		self.assertEqual([
+			(('data', 0), 12345),
+			(('data', 1), 'a\\"b'),
+			(('data', 2), 'ünï'),
+			(('data', 3), {'x': [True, None, -1.5e3]}),
+			(('other',), 7)
+		], values)
+
+	def test_large_value_is_decoded_once(self):
+		# Arrange:
+		json_value = [{'id': i, 'text': 'x' * 100} for i in range(20000)]
+		chunks = _split(json.dumps({'data': json_value}).encode('utf8'), 0x1000)
+
+		# Act:
+		values = list(iter_json_values(chunks, [('data',)]))
+
+		# Assert:
+		self.assertEqual([(('data',), json_value)], values)
+
+	def test_truncated_value_cannot_be_decoded(self):
+		# Act + Assert:
+		with self.assertRaises(json.JSONDecodeError):
+			list(iter_json_values([b'{"data": [1, 2'], [('data',)]))
+
+
+class StreamedErrorResponseTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		self.server = start_json_server(lambda _method, _path, _json_body: (409, {'code': 'InvalidArgument', 'message': 'peers unavailable'}))
+
+	def tearDown(self):
+		self.server.close()
+
+	def _assert_get_peers_fails(self, api_client):
+		# Act + Assert:
+		with self.assertRaisesRegex(RequestException, 'peers unavailable'):
+			api_client.get_peers()
+
+	def test_symbol_peers_error_is_raised(self):
+		self._assert_get_peers_fails(SymbolClient('127.0.0.1', self.server.port))
+
+	def test_nem_peers_error_is_raised(self):
+		self._assert_get_peers_fails(NemClient('127.0.0.1', self.server.port))
@@ -0,0 +1,132 @@
+import unittest
+
+import requests
+
+from client.BlockMetadataCache import BLOCK_METADATA_CACHE
+from client.NemClient import MAX_BLOCKS_PER_SEGMENT, NemClient
+from client.ResponseCache import RESPONSE_CACHE
+
+from .utils import start_json_server
+
+CHAIN_HEIGHT = 1000
+SIGNER_PUBLIC_KEY = 'AB' * 32
+
+
+def _make_block_hash(height):
+	return f'{height:064X}'
+
+
+def _make_block(height):
+	return {'height': height, 'timeStamp': 1000 + height, 'signer': SIGNER_PUBLIC_KEY, 'prevBlockHash': {'data': _make_block_hash(height - 1)}}
+
+
+def _create_nem_node(segment_status=200):
+	def respond(method, path, json_body):
+		if '/chain/height' == path:
+			return (200, {'height': CHAIN_HEIGHT})
+
+		if ('POST', '/local/chain/blocks-after') == (method, path):
+			if 200 != segment_status:
+				return (segment_status, {'error': 'Failure', 'status': segment_status})
+
+			heights = range(json_body['height'] + 1, min(CHAIN_HEIGHT, json_body['height'] + MAX_BLOCKS_PER_SEGMENT) + 1)
+			return (200, {'data': [{'block': _make_block(height), 'hash': _make_block_hash(height)} for height in heights]})
+
+		if ('POST', '/block/at/public') == (method, path):
+			return (200, _make_block(json_body['height']))
+
+		return (404, {'error': 'Not Found'})
+
+	return start_json_server(respond)
+
+
+class NemBlockHashesTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		BLOCK_METADATA_CACHE.clear()
+		self.server = None
+
+	def tearDown(self):
+		if self.server:
+			self.server.close()
+
+		BLOCK_METADATA_CACHE.clear()
+
+	def _create_client(self, segment_status=200, **kwargs):
+		self.server = _create_nem_node(segment_status)
+		return NemClient('127.0.0.1', self.server.port, **kwargs)
+
+	def _get_post_paths(self):
+		return [path for (method, path) in self.server.requests if 'POST' == method]
+
+	def _assert_block_hashes(self, heights, height_to_block_hash_map):
+		self.assertEqual({height: _make_block_hash(height) for height in heights}, {
+			height: str(block_hash) for (height, block_hash) in height_to_block_hash_map.items()
+		})
+
+	def test_nearby_heights_are_retrieved_in_shared_segments(self):
+		# Arrange:
+		client = self._create_client()
+		heights = [30, 5, 7, 14, 31]
+
+		# Act:
+		height_to_block_hash_map = client.get_block_hashes(heights)
+
+		# Assert: blocks 5 - 14 and 30 - 39 are each retrieved in a single segment
+		self._assert_block_hashes(heights, height_to_block_hash_map)
+		self.assertEqual(['/local/chain/blocks-after'] * 2, self._get_post_paths())
+		self.assertTrue(client.is_block_segment_lookup_supported)
+
+	def test_cached_heights_are_not_retrieved_again(self):
+		# Arrange:
+		client = self._create_client()
+		client.get_block_hashes([5, 7])
+
+		# Act:
+		height_to_block_hash_map = client.get_block_hashes([7, 9])
+
+		# Assert:
+		self._assert_block_hashes([7, 9], height_to_block_hash_map)
+		self.assertEqual(['/local/chain/blocks-after'], self._get_post_paths())
+
+	def test_nemesis_block_is_retrieved_individually(self):
+		# Arrange:
+		client = self._create_client()
+
+		# Act:
+		height_to_block_hash_map = client.get_block_hashes([1])
+
+		# Assert:
+		self._assert_block_hashes([1], height_to_block_hash_map)
+		self.assertEqual(['/block/at/public'], self._get_post_paths())
+
+	def _assert_unsupported_segment_lookup_falls_back_permanently(self, status):
+		# Arrange:
+		client = self._create_client(status)
+
+		# Act:
+		height_to_block_hash_maps = [client.get_block_hashes([5, 7]), client.get_block_hashes([20])]
+
+		# Assert: the segment endpoint was only tried once
+		self._assert_block_hashes([5, 7], height_to_block_hash_maps[0])
+		self._assert_block_hashes([20], height_to_block_hash_maps[1])
+		self.assertEqual(['/local/chain/blocks-after'] + ['/block/at/public'] * 3, self._get_post_paths())
+		self.assertFalse(client.is_block_segment_lookup_supported)
+
+	def test_segment_lookup_falls_back_permanently_when_not_found(self):
+		self._assert_unsupported_segment_lookup_falls_back_permanently(404)
+
+	def test_segment_lookup_falls_back_permanently_when_unauthorized(self):
+		# local endpoints are only available to clients connecting from the node host
+		self._assert_unsupported_segment_lookup_falls_back_permanently(401)
+
+	def test_transient_segment_lookup_failure_is_raised_and_segment_lookup_is_kept(self):
+		# Arrange:
+		client = self._create_client(503, retry_count=1)
+
+		# Act + Assert:
+		with self.assertRaises(requests.exceptions.RequestException):
+			client.get_block_hashes([5])
+
+		self.assertNotIn('/block/at/public', self._get_post_paths())
+		self.assertTrue(client.is_block_segment_lookup_supported)
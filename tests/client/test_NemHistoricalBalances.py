@@ -0,0 +1,88 @@
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from client.NemClient import MAX_HISTORICAL_BALANCES_PER_REQUEST, NemClient
+from client.ResponseCache import RESPONSE_CACHE
+
+from .utils import start_json_server
+
+ADDRESS = 'NCXIQA4FF5JB6AMQ53NQ3ZMRD3X3PJEWDJJJIGHT'
+
+
+def _respond(_method, path, _json_body):
+	if '/chain/height' == path:
+		return (200, {'height': 10000})
+
+	if path.startswith('/account/historical/get?'):
+		query = parse_qs(urlparse(path).query)
+		(start_height, end_height, increment) = (int(query[name][0]) for name in ('startHeight', 'endHeight', 'increment'))
+
+		# the node has no account state before height 10
+		heights = [height for height in range(start_height, end_height + 1, increment) if height >= 10]
+		return (200, {'data': [{'height': height, 'balance': height * 1000000, 'address': ADDRESS} for height in heights]})
+
+	return (404, {'error': 'Not Found'})
+
+
+class NemHistoricalBalancesTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		self.server = start_json_server(_respond)
+		self.client = NemClient('127.0.0.1', self.server.port)
+
+	def tearDown(self):
+		self.server.close()
+
+	def _get_requested_ranges(self):
+		ranges = []
+		for (_, path) in self.server.requests:
+			if '/chain/height' == path:
+				continue
+
+			query = parse_qs(urlparse(path).query)
+			ranges.append(tuple(int(query[name][0]) for name in ('startHeight', 'endHeight', 'increment')))
+
+		return ranges
+
+	def test_single_balance_is_retrieved_with_single_height_range(self):
+		# Act:
+		balance = self.client.get_historical_balance(ADDRESS, '123')
+
+		# Assert:
+		self.assertEqual(123, balance)
+		self.assertEqual([(123, 123, 1)], self._get_requested_ranges())
+
+	def test_heights_are_retrieved_in_single_range_with_greatest_common_increment(self):
+		# Act:
+		height_to_balance_map = self.client.get_historical_balances(ADDRESS, [400, 100, 250, 100])
+
+		# Assert:
+		self.assertEqual({100: 100, 250: 250, 400: 400}, height_to_balance_map)
+		self.assertEqual([(100, 400, 150)], self._get_requested_ranges())
+
+	def test_heights_are_split_into_ranges_within_server_limit(self):
+		# Arrange: consecutive heights force an increment of one, so the distant height needs its own range
+		last_height = 20 + MAX_HISTORICAL_BALANCES_PER_REQUEST
+
+		# Act:
+		height_to_balance_map = self.client.get_historical_balances(ADDRESS, [20, 21, 22, last_height])
+
+		# Assert:
+		self.assertEqual({20: 20, 21: 21, 22: 22, last_height: last_height}, height_to_balance_map)
+		self.assertEqual([(20, 22, 1), (last_height, last_height, 1)], self._get_requested_ranges())
+
+	def test_heights_without_account_state_have_zero_balance(self):
+		# Act:
+		height_to_balance_map = self.client.get_historical_balances(ADDRESS, [5, 15])
+
+		# Assert:
+		self.assertEqual({5: 0, 15: 15}, height_to_balance_map)
+		self.assertEqual([(5, 15, 10)], self._get_requested_ranges())
+
+	def test_no_heights_require_no_requests(self):
+		# Act:
+		height_to_balance_map = self.client.get_historical_balances(ADDRESS, [])
+
+		# Assert:
+		self.assertEqual({}, height_to_balance_map)
+		self.assertEqual([], self._get_requested_ranges())
@@ -0,0 +1,136 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from client.NodePool import NodePool, NodePoolClient, make_endpoint_key
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import SymbolClient
+
+from .utils import JsonServer, start_json_server
+
+AGGREGATE_HASH = 'AB' * 32
+JSON_AGGREGATE = {'meta': {'hash': AGGREGATE_HASH}, 'transaction': {'transactions': []}}
+
+
+SLOW_RESPONSE_DELAY = 0.5
+
+
+def _create_symbol_node_respond(height, is_batch_transaction_lookup_supported, is_slow=False):
+	def respond(method, path, _json_body):
+		if is_slow:
+			time.sleep(SLOW_RESPONSE_DELAY)
+
+		if '/chain/info' == path:
+			return (200, {'height': str(height)})
+
+		if ('POST', '/transactions/confirmed') == (method, path) and is_batch_transaction_lookup_supported:
+			return (200, [JSON_AGGREGATE])
+
+		if f'/transactions/confirmed/{AGGREGATE_HASH}' == path:
+			return (200, JSON_AGGREGATE)
+
+		return (404, {'code': 'ResourceNotFound'})
+
+	return respond
+
+
+class NodePoolClientTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+
+		# both nodes listen on the same port of different loopback addresses, so that they only differ by host
+		self.servers = [start_json_server(_create_symbol_node_respond(100, False, True))]
+		port = self.servers[0].port
+		self.servers.append(_start_json_server_at(('127.0.0.2', port), _create_symbol_node_respond(200, True)))
+
+		self.hosts = ['127.0.0.1', '127.0.0.2']
+		self.node_pool = NodePool(self.hosts)
+		self.api_client = NodePoolClient(self.node_pool, lambda host: SymbolClient(host, port))
+
+	def tearDown(self):
+		for server in self.servers:
+			server.close()
+
+	def test_node_state_is_not_shared_between_nodes(self):
+		# Act:
+		with patch.object(self.node_pool, 'select', side_effect=self.hosts):
+			heights = [self.api_client.get_chain_height(), self.api_client.get_chain_height()]
+
+		# Assert:
+		self.assertEqual([100, 200], heights)
+		self.assertEqual([1, 1], [len(server.requests) for server in self.servers])
+
+	def test_supported_lookups_are_tracked_per_node(self):
+		# Act:
+		with patch.object(self.node_pool, 'select', side_effect=self.hosts):
+			for _ in self.hosts:
+				self.api_client._get_embedded_transactions_map([AGGREGATE_HASH])  # pylint: disable=protected-access
+
+		# Assert:
+		self.assertFalse(self.api_client.get_api_client('127.0.0.1').is_batch_transaction_lookup_supported)
+		self.assertTrue(self.api_client.get_api_client('127.0.0.2').is_batch_transaction_lookup_supported)
+		self.assertEqual([('POST', '/transactions/confirmed')], self.servers[1].requests)
+
+	def _add_latency_samples(self, endpoint):
+		for _ in range(10):
+			self.node_pool.record_latency('127.0.0.1', endpoint, 0.01)
+
+	def test_slow_get_is_hedged_to_other_node(self):
+		# Arrange:
+		self._add_latency_samples('GET /chain/info')
+
+		# Act:
+		start_time = time.monotonic()
+		with patch.object(self.node_pool, 'select', side_effect=self.hosts):
+			height = self.api_client.get_chain_height()
+
+		elapsed_time = time.monotonic() - start_time
+
+		# Assert: the response of the second node was used without waiting for the first one
+		self.assertEqual(200, height)
+		self.assertEqual([('GET', '/chain/info')], self.servers[1].requests)
+		self.assertGreater(SLOW_RESPONSE_DELAY, elapsed_time)
+
+	def test_slow_post_is_not_hedged(self):
+		# Arrange:
+		self._add_latency_samples('POST /transactions/confirmed')
+
+		# Act:
+		with patch.object(self.node_pool, 'select', side_effect=self.hosts):
+			self.api_client._get_embedded_transactions_map([AGGREGATE_HASH])  # pylint: disable=protected-access
+
+		# Assert: the first node answered all requests, including its fallback lookup
+		self.assertEqual([('POST', '/transactions/confirmed'), ('GET', f'/transactions/confirmed/{AGGREGATE_HASH}')], self.servers[0].requests)
+		self.assertEqual([], self.servers[1].requests)
+
+	def test_properties_are_read_from_node_clients(self):
+		# Act + Assert:
+		self.assertEqual('mainnet', self.api_client.network.name)
+
+
+class NodePoolTest(unittest.TestCase):
+	def test_endpoint_key_ignores_resources_and_query(self):
+		# Act + Assert:
+		self.assertEqual('GET /blocks/{}', make_endpoint_key('GET', 'http://node:3000/blocks/1234'))
+		self.assertEqual('GET /transactions/confirmed/{}', make_endpoint_key('GET', f'http://node:3000/transactions/confirmed/{AGGREGATE_HASH}'))
+		self.assertEqual('GET /accounts', make_endpoint_key('GET', 'http://node:3000/accounts?pageSize=100'))
+		self.assertEqual('POST /transactions/confirmed', make_endpoint_key('POST', 'http://node:3000/transactions/confirmed'))
+
+	def test_hedge_delay_is_tracked_per_endpoint(self):
+		# Arrange:
+		node_pool = NodePool(['a', 'b'])
+		for index in range(10):
+			node_pool.record_latency('a', 'GET /chain/info', 0.1 * (index + 1))
+			node_pool.record_latency('a', 'GET /blocks/{}', 2 + index)
+
+		# Act + Assert:
+		self.assertAlmostEqual(1.0, node_pool.get_hedge_delay('a', 'GET /chain/info'))
+		self.assertEqual(11, node_pool.get_hedge_delay('a', 'GET /blocks/{}'))
+		self.assertIsNone(node_pool.get_hedge_delay('a', 'GET /node/info'))
+		self.assertIsNone(node_pool.get_hedge_delay('b', 'GET /chain/info'))
+
+
+def _start_json_server_at(server_address, respond):
+	server = JsonServer(respond, server_address)
+	server.start()
+	return server
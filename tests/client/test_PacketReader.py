@@ -0,0 +1,86 @@
+import socket
+import struct
+import threading
+import unittest
+
+from client.PacketReader import PACKET_HEADER, PacketReader, receive_into
+
+
+class PacketReaderTest(unittest.TestCase):
+	def test_fields_are_read_sequentially(self):
+		# Arrange:
+		reader = PacketReader(PACKET_HEADER.pack(24, 5) + struct.pack('<Q', 1234) + b'abcdefgh')
+
+		# Act:
+		header = reader.read(PACKET_HEADER)
+		height = reader.read(struct.Struct('<Q'))
+
+		# Assert:
+		self.assertEqual((24, 5), header)
+		self.assertEqual((1234,), height)
+		self.assertEqual(8, reader.remaining_size)
+
+	def test_bytes_are_read_without_copying(self):
+		# Arrange:
+		buffer = bytearray(b'abcdefgh')
+		reader = PacketReader(buffer)
+		reader.read_bytes(2)
+
+		# Act:
+		view = reader.read_bytes(3)
+		buffer[2] = ord('X')
+
+		# Assert:
+		self.assertIsInstance(view, memoryview)
+		self.assertEqual(b'Xde', bytes(view))
+		self.assertEqual(3, reader.remaining_size)
+
+	def test_reading_past_end_of_packet_raises(self):
+		# Arrange:
+		reader = PacketReader(b'abcd')
+		reader.read_bytes(2)
+
+		# Act + Assert:
+		with self.assertRaises(struct.error):
+			reader.read_bytes(3)
+
+		with self.assertRaises(struct.error):
+			reader.read(PACKET_HEADER)
+
+		self.assertEqual(2, reader.remaining_size)
+
+
+class ReceiveIntoTest(unittest.TestCase):
+	@staticmethod
+	def _send_in_chunks(sock, chunks):
+		for chunk in chunks:
+			sock.sendall(chunk)
+
+		sock.close()
+
+	def _receive(self, chunks, size):
+		buffer = bytearray(size)
+		sender, receiver = socket.socketpair()
+		with receiver:
+			thread = threading.Thread(target=self._send_in_chunks, args=(sender, chunks))
+			thread.start()
+			num_bytes_received = receive_into(receiver, buffer)
+			thread.join()
+
+		return num_bytes_received, bytes(buffer)
+
+	def test_view_is_filled_across_multiple_receives(self):
+		# Act:
+		num_bytes_received, buffer = self._receive([b'abc', b'de', b'fgh'], 8)
+
+		# Assert:
+		self.assertEqual(8, num_bytes_received)
+		self.assertEqual(b'abcdefgh', buffer)
+
+	def test_short_count_is_returned_when_connection_closes(self):
+		# Act:
+		num_bytes_received, buffer = self._receive([b'abc'], 8)
+
+		# Assert:
+		self.assertEqual(3, num_bytes_received)
+		self.assertEqual(b'abc' + bytes(5), buffer)
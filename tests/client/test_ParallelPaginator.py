@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+
+from client.ParallelPaginator import ParallelPaginator
+
+PAGE_SIZE = 3
+
+
+class PageSource:
+	"""Numbered pages of descending items, where earlier pages complete last so that pages are fetched out of order."""
+
+	def __init__(self, item_count, shift_page_number=None):
+		self.items = list(range(item_count, 0, -1))
+		self.shift_page_number = shift_page_number
+
+		self.lock = threading.Lock()
+		self.requested_page_numbers = []
+
+	def fetch_page(self, page_number):
+		with self.lock:
+			self.requested_page_numbers.append(page_number)
+
+		time.sleep(0.01 * max(0, 5 - page_number))
+
+		start_index = (page_number - 1) * PAGE_SIZE
+		if self.shift_page_number and page_number >= self.shift_page_number:
+			# a new item was added before this page was fetched, shifting all later items back by one
+			start_index -= 1
+
+		return self.items[start_index:start_index + PAGE_SIZE]
+
+
+class ParallelPaginatorTest(unittest.TestCase):
+	def test_pages_are_yielded_in_order_and_complete(self):
+		# Arrange:
+		source = PageSource(20)
+
+		# Act:
+		pages = list(ParallelPaginator(source.fetch_page, lambda item: item, window_size=4))
+
+		# Assert:
+		self.assertEqual([source.items[index:index + PAGE_SIZE] for index in range(0, 20, PAGE_SIZE)], pages)
+		self.assertEqual(list(range(20, 0, -1)), [item for page in pages for item in page])
+
+	def test_items_shifted_into_later_pages_are_yielded_once(self):
+		# Arrange:
+		source = PageSource(20, shift_page_number=3)
+
+		# Act:
+		pages = list(ParallelPaginator(source.fetch_page, lambda item: item, window_size=4))
+
+		# Assert:
+		self.assertEqual(list(range(20, 0, -1)), [item for page in pages for item in page])
+
+	def test_no_pages_are_requested_after_cutoff_window(self):
+		# Arrange:
+		source = PageSource(100)
+
+		# Act: page 4 (items 91 to 89) crosses the cutoff
+		pages = list(ParallelPaginator(source.fetch_page, lambda item: item, lambda page: page[-1] < 90, window_size=3))
+
+		# Assert: only the window following the page crossing the cutoff was requested
+		self.assertEqual([[100, 99, 98], [97, 96, 95], [94, 93, 92], [91, 90, 89]], pages)
+		self.assertEqual(6, max(source.requested_page_numbers))
+
+	def test_empty_page_ends_iteration(self):
+		# Arrange:
+		source = PageSource(6)
+
+		# Act:
+		pages = list(ParallelPaginator(source.fetch_page, lambda item: item, window_size=2))
+
+		# Assert:
+		self.assertEqual([[6, 5, 4], [3, 2, 1]], pages)
@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+
+from client.PeerSslContext import PEER_SSL_CONTEXTS
+from client.SymbolClient import CHAIN_STATISTICS_PACKET_TYPE, CHAIN_STATISTICS_RESPONSE, SymbolPeerClient
+
+from .utils import PeerServer, create_certificate_directory
+
+
+class PeerSslContextTest(unittest.TestCase):
+	def setUp(self):
+		self.temp_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+		self.certificate_directory = create_certificate_directory(self.temp_directory.name)
+		self.server = PeerServer(self.certificate_directory, lambda _: CHAIN_STATISTICS_RESPONSE.pack(100, 90, 0, 1))
+
+	def tearDown(self):
+		self.server.close()
+		self.temp_directory.cleanup()
+
+	def _create_client(self):
+		return SymbolPeerClient('127.0.0.1', self.server.port, certificate_directory=self.certificate_directory)
+
+	def test_context_is_shared_by_clients_with_same_certificates(self):
+		# Act:
+		clients = [self._create_client(), self._create_client()]
+
+		# Assert:
+		self.assertIs(clients[0].ssl_context, clients[1].ssl_context)
+		self.assertIs(PEER_SSL_CONTEXTS.get(self.certificate_directory), clients[0].ssl_context)
+
+	def test_subsequent_connections_to_node_resume_tls_session(self):
+		# Act:
+		heights = [self._create_client().get_chain_height() for _ in range(3)]
+
+		# Assert:
+		self.assertEqual([100] * 3, heights)
+		self.assertEqual([CHAIN_STATISTICS_PACKET_TYPE] * 3, self.server.requests)
+		self.assertEqual((1, 2), tuple(PEER_SSL_CONTEXTS.get(self.certificate_directory).statistics))
+
+	def test_discarded_session_is_not_resumed(self):
+		# Arrange:
+		client = self._create_client()
+		client.get_chain_height()
+
+		# Act:
+		client.ssl_context.discard_session('127.0.0.1', self.server.port)
+		client.get_chain_height()
+
+		# Assert:
+		self.assertEqual((2, 0), tuple(client.ssl_context.statistics))
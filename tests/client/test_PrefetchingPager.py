@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+
+from client.PrefetchingPager import PrefetchingPager
+
+PAGES = {None: [10, 9, 8], 8: [7, 6, 5], 5: [4, 3], 3: []}
+
+
+def _get_next_cursor(page):
+	return page[-1] if page else None
+
+
+class PageSource:
+	def __init__(self, delay=0):
+		self.delay = delay
+		self.events = []
+		self.lock = threading.Lock()
+
+	def _record(self, event):
+		with self.lock:
+			self.events.append(event)
+
+	def fetch_page(self, cursor):
+		self._record(('fetch start', cursor))
+		time.sleep(self.delay)
+		self._record(('fetch end', cursor))
+		return PAGES[cursor]
+
+	def process_page(self, page):
+		time.sleep(self.delay)
+		self._record(('process end', _get_next_cursor(page)))
+		return [str(item) for item in page]
+
+
+class PrefetchingPagerTest(unittest.TestCase):
+	def test_pages_are_yielded_in_cursor_order(self):
+		# Arrange:
+		source = PageSource()
+
+		# Act:
+		pages = list(PrefetchingPager(source.fetch_page, _get_next_cursor, source.process_page))
+
+		# Assert: the empty last page is not yielded
+		self.assertEqual([['10', '9', '8'], ['7', '6', '5'], ['4', '3']], pages)
+		self.assertEqual([None, 8, 5, 3], [cursor for (event, cursor) in source.events if 'fetch start' == event])
+
+	def test_iteration_starts_at_start_cursor(self):
+		# Arrange:
+		source = PageSource()
+
+		# Act:
+		pages = list(PrefetchingPager(source.fetch_page, _get_next_cursor, source.process_page, 8))
+
+		# Assert:
+		self.assertEqual([['7', '6', '5'], ['4', '3']], pages)
+
+	def test_next_page_is_fetched_while_current_page_is_processed(self):
+		# Arrange:
+		source = PageSource(0.05)
+
+		# Act:
+		start_time = time.monotonic()
+		list(PrefetchingPager(source.fetch_page, _get_next_cursor, source.process_page))
+		elapsed_time = time.monotonic() - start_time
+
+		# Assert: each next page is requested before processing of the page holding its cursor completes
+		for cursor in (8, 5, 3):
+			self.assertLess(source.events.index(('fetch start', cursor)), source.events.index(('process end', cursor)))
+
+		self.assertLess(elapsed_time, 0.05 * 8)
+
+	def test_fetch_error_is_raised(self):
+		# Arrange:
+		def fetch_page(cursor):
+			if 5 == cursor:
+				raise ConnectionError('node unavailable')
+
+			return PAGES[cursor]
+
+		pager = PrefetchingPager(fetch_page, _get_next_cursor, lambda page: page)
+
+		# Act:
+		pages = []
+		with self.assertRaises(ConnectionError):
+			for page in pager:
+				pages.append(page)
+
+		# Assert:
+		self.assertEqual([[10, 9, 8], [7, 6, 5]], pages)
@@ -0,0 +1,123 @@
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from client.RateLimiter import RateLimit, RateLimiters, TokenBucket
+from client.TimeoutHTTPAdapter import create_http_session
+
+from .utils import start_json_server
+
+
+class TokenBucketTest(unittest.TestCase):
+	def test_burst_is_available_immediately_and_later_requests_are_spaced(self):
+		# Arrange: one token per second
+		with patch('client.RateLimiter.time.monotonic', return_value=100):
+			bucket = TokenBucket(RateLimit(60, 2))
+
+			# Act:
+			wait_times = [bucket.reserve() for _ in range(4)]
+
+		# Assert:
+		self.assertEqual([0, 0, 1, 2], wait_times)
+
+	def test_tokens_refill_over_time_up_to_burst(self):
+		# Arrange:
+		with patch('client.RateLimiter.time.monotonic', side_effect=[100, 100, 100, 101.5, 200, 200, 200]):
+			bucket = TokenBucket(RateLimit(60, 2))
+			bucket.reserve()
+			bucket.reserve()
+
+			# Act:
+			partial_wait_time = bucket.reserve()
+			full_wait_times = [bucket.reserve(), bucket.reserve(), bucket.reserve()]
+
+		# Assert:
+		self.assertEqual(0, partial_wait_time)
+		self.assertEqual([0, 0, 1], full_wait_times)
+
+	def test_try_take_does_not_take_unavailable_token(self):
+		# Arrange:
+		with patch('client.RateLimiter.time.monotonic', return_value=100):
+			bucket = TokenBucket(RateLimit(30, 1))
+
+			# Act:
+			wait_times = [bucket.try_take() for _ in range(3)]
+
+		# Assert:
+		self.assertEqual([0, 2, 2], wait_times)
+		self.assertEqual(0, bucket.tokens)
+
+
+class RateLimitersTest(unittest.TestCase):
+	def test_unlimited_hosts_are_not_throttled(self):
+		# Arrange:
+		rate_limiters = RateLimiters({'limited.example.com': RateLimit(1, 1)})
+
+		# Act:
+		wait_times = [rate_limiters.acquire('other.example.com') for _ in range(5)]
+
+		# Assert:
+		self.assertEqual([0] * 5, wait_times)
+		self.assertEqual((0, 0), tuple(rate_limiters.statistics))
+
+	def test_hosts_are_throttled_independently_and_recorded(self):
+		# Arrange:
+		rate_limiters = RateLimiters({'alpha.example.com': RateLimit(60, 1), 'default': RateLimit(30, 1)})
+
+		# Act:
+		with patch('client.RateLimiter.time.monotonic', return_value=100), patch('client.RateLimiter.time.sleep') as sleep:
+			wait_times = [rate_limiters.acquire(host) for host in ('alpha.example.com', 'beta.example.com') * 2]
+
+		# Assert: hosts without their own limit share the default limit, but not its bucket
+		self.assertEqual([0, 0, 1, 2], wait_times)
+		self.assertEqual([1, 2], [call.args[0] for call in sleep.call_args_list])
+		self.assertEqual((2, 3), tuple(rate_limiters.statistics))
+
+	def test_configuration_overrides_and_removes_limits(self):
+		# Arrange:
+		rate_limiters = RateLimiters()
+		with tempfile.TemporaryDirectory() as temp_directory:
+			config_filepath = Path(temp_directory) / 'rate_limits.yaml'
+			config_filepath.write_text('\n'.join([
+				'api.coingecko.com:',
+				'  requests_per_minute: 30',
+				'  burst: 5',
+				'ip-api.com:',
+				'default:',
+				'  requests_per_minute: 600'
+			]), encoding='utf8')
+
+			# Act:
+			rate_limiters.configure(config_filepath)
+
+		# Assert:
+		self.assertEqual({
+			'api.coingecko.com': RateLimit(30, 5),
+			'default': RateLimit(600, 1)
+		}, rate_limiters.rate_limits)
+
+	def test_concurrent_http_requests_to_limited_host_are_spaced(self):
+		# Arrange: ten requests per second with no burst
+		server = start_json_server(lambda _method, _path, _json_body: (200, {}))
+		rate_limiters = RateLimiters({'127.0.0.1': RateLimit(600, 1)})
+
+		try:
+			with patch('client.TimeoutHTTPAdapter.RATE_LIMITERS', rate_limiters):
+				session = create_http_session(hosts=['127.0.0.1'], timeout=5)
+
+				# Act:
+				start_time = time.monotonic()
+				with ThreadPoolExecutor(4) as executor:
+					statuses = list(executor.map(lambda _: session.get(f'http://127.0.0.1:{server.port}/').status_code, range(4)))
+
+				elapsed_time = time.monotonic() - start_time
+		finally:
+			server.close()
+
+		# Assert:
+		self.assertEqual([200] * 4, statuses)
+		self.assertGreaterEqual(elapsed_time, 0.29)
+		self.assertEqual(3, rate_limiters.statistics.throttled_request_count)
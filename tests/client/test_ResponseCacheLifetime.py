@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+
+from client.NemClient import NemClient
+from client.ResponseCache import ResponseCache
+from client.SymbolClient import SymbolClient
+
+from .utils import start_json_server
+
+
+def _create_symbol_node(height, finalized_height):
+	def respond(_method, path, _json_body):
+		if '/chain/info' == path:
+			return (200, {
+				'height': str(height),
+				'latestFinalizedBlock': {'finalizationEpoch': 1, 'finalizationPoint': 1, 'height': str(finalized_height)}
+			})
+
+		if path.startswith('/blocks/'):
+			return (200, {'meta': {'height': path.split('/')[-1]}, 'block': {'height': path.split('/')[-1]}})
+
+		return (404, {'code': 'ResourceNotFound'})
+
+	return start_json_server(respond)
+
+
+def _create_nem_node(height):
+	def respond(_method, path, json_body):
+		if '/chain/height' == path:
+			return (200, {'height': height})
+
+		if '/block/at/public' == path:
+			return (200, {'height': json_body['height']})
+
+		return (404, {'error': 'Not Found'})
+
+	return start_json_server(respond)
+
+
+class ResponseCacheLifetimeTest(unittest.TestCase):
+	def setUp(self):
+		self.response_cache = ResponseCache()
+		self.patcher = patch('client.RestClientMixin.RESPONSE_CACHE', self.response_cache)
+		self.patcher.start()
+		self.server = None
+
+	def tearDown(self):
+		self.patcher.stop()
+		if self.server:
+			self.server.close()
+
+	def _find_expiry_time(self, rest_path_part):
+		return next(entry.expiry_time for (key, entry) in self.response_cache.entries.items() if rest_path_part in key)
+
+	def test_symbol_finalized_block_is_cached_as_immutable(self):
+		# Arrange: no block header index is configured
+		self.server = _create_symbol_node(1000, 990)
+		client = SymbolClient('127.0.0.1', self.server.port)
+
+		# Act:
+		client._get_json('blocks/5')  # pylint: disable=protected-access
+		client._get_json('blocks/995')  # pylint: disable=protected-access
+
+		# Assert: only blocks above the finalized height expire
+		self.assertIsNone(self._find_expiry_time('blocks/5'))
+		self.assertIsNotNone(self._find_expiry_time('blocks/995'))
+
+	def test_nem_block_beyond_rollback_depth_is_cached_as_immutable(self):
+		# Arrange:
+		self.server = _create_nem_node(1000)
+		client = NemClient('127.0.0.1', self.server.port)
+
+		# Act:
+		client._post_json('block/at/public', {'height': 5})  # pylint: disable=protected-access
+		client._post_json('block/at/public', {'height': 995})  # pylint: disable=protected-access
+
+		# Assert:
+		self.assertIsNone(self._find_expiry_time('"height": 5}'))
+		self.assertIsNotNone(self._find_expiry_time('"height": 995}'))
@@ -0,0 +1,78 @@
+import unittest
+
+from client.NemClient import NemClient
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import SymbolClient
+
+from .utils import start_json_server
+
+
+def _create_symbol_node(height):
+	def respond(_method, path, _json_body):
+		if '/chain/info' == path:
+			return (200, {
+				'height': str(height),
+				'latestFinalizedBlock': {'finalizationEpoch': height // 10, 'finalizationPoint': 1, 'height': str(height - 10)}
+			})
+
+		return (404, {'code': 'ResourceNotFound'})
+
+	return start_json_server(respond)
+
+
+def _create_nem_node(height):
+	def respond(_method, path, _json_body):
+		if '/chain/height' == path:
+			return (200, {'height': height})
+
+		return (404, {'error': 'Not Found'})
+
+	return start_json_server(respond)
+
+
+class ResponseCacheScopeTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		self.servers = []
+
+	def tearDown(self):
+		for server in self.servers:
+			server.close()
+
+	def _start(self, server):
+		self.servers.append(server)
+		return server
+
+	def test_symbol_node_state_is_cached_per_node(self):
+		# Arrange:
+		clients = [SymbolClient('127.0.0.1', self._start(_create_symbol_node(height)).port) for height in (100, 200)]
+
+		# Act:
+		heights = [client.get_chain_height() for client in clients]
+		finalized_heights = [client.get_finalization_info().height for client in clients]
+
+		# Assert:
+		self.assertEqual([100, 200], heights)
+		self.assertEqual([90, 190], finalized_heights)
+
+	def test_symbol_node_state_is_cached_within_node(self):
+		# Arrange:
+		server = self._start(_create_symbol_node(100))
+		client = SymbolClient('127.0.0.1', server.port)
+
+		# Act:
+		heights = [client.get_chain_height(), client.get_chain_height()]
+
+		# Assert:
+		self.assertEqual([100, 100], heights)
+		self.assertEqual(1, len(server.requests))
+
+	def test_nem_node_state_is_cached_per_node(self):
+		# Arrange:
+		clients = [NemClient('127.0.0.1', self._start(_create_nem_node(height)).port) for height in (100, 200)]
+
+		# Act:
+		heights = [client.get_chain_height() for client in clients]
+
+		# Assert:
+		self.assertEqual([100, 200], heights)
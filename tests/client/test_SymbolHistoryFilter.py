@@ -0,0 +1,91 @@
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from symbolchain.CryptoTypes import PublicKey
+from symbolchain.symbol.Network import Network
+
+from client.BlockMetadataCache import BLOCK_METADATA_CACHE
+from client.ResponseCache import RESPONSE_CACHE
+from client.SymbolClient import HARVEST_RECEIPT_TYPES, RECEIPT_TYPES, TRANSACTION_TYPES, HistoryFilter, SymbolClient
+
+from .utils import start_json_server
+
+ADDRESS = Network.MAINNET.public_key_to_address(PublicKey(bytes(range(32))))
+
+
+def _respond(_method, path, _json_body):
+	if '/chain/info' == path:
+		return (200, {'height': '1000', 'latestFinalizedBlock': {'finalizationEpoch': 1, 'finalizationPoint': 1, 'height': '990'}})
+
+	if path.startswith('/blocks/'):
+		return (200, {
+			'meta': {'hash': 'AB' * 32, 'height': path.split('/')[-1]},
+			'block': {'timestamp': '1000', 'feeMultiplier': 100, 'signerPublicKey': 'CD' * 32}
+		})
+
+	if path.startswith('/statements/transaction?'):
+		return (200, {'data': [{
+			'id': 'STATEMENT1',
+			'statement': {'height': '100', 'receipts': [
+				{'type': RECEIPT_TYPES['harvest'], 'targetAddress': ADDRESS.bytes.hex(), 'amount': '2500000'}
+			]}
+		}]})
+
+	if path.startswith('/transactions/confirmed?'):
+		return (200, {'data': []})
+
+	return (404, {'code': 'ResourceNotFound'})
+
+
+class SymbolHistoryFilterTest(unittest.TestCase):
+	def setUp(self):
+		RESPONSE_CACHE.clear()
+		BLOCK_METADATA_CACHE.clear()
+		self.server = start_json_server(_respond)
+		self.client = SymbolClient('127.0.0.1', self.server.port)
+
+	def tearDown(self):
+		self.server.close()
+		BLOCK_METADATA_CACHE.clear()
+
+	def _get_query(self, path_prefix):
+		[path] = [path for (_, path) in self.server.requests if path.startswith(path_prefix)]
+		return parse_qs(urlparse(path).query)
+
+	def test_unfiltered_harvests_are_not_restricted(self):
+		# Act:
+		self.client.get_harvests(ADDRESS, page_size=50)
+
+		# Assert:
+		query = self._get_query('/statements/transaction?')
+		self.assertEqual({'targetAddress', 'order', 'pageSize'}, set(query))
+
+	def test_harvests_are_filtered_by_receipt_type_and_height_range(self):
+		# Arrange:
+		history_filter = HistoryFilter(HARVEST_RECEIPT_TYPES, from_height=10, to_height=990)
+
+		# Act:
+		snapshots = self.client.get_harvests(ADDRESS, page_size=50, page_number=2, history_filter=history_filter)
+
+		# Assert:
+		query = self._get_query('/statements/transaction?')
+		self.assertEqual([str(receipt_type) for receipt_type in HARVEST_RECEIPT_TYPES], query['receiptType'])
+		self.assertEqual((['10'], ['990']), (query['fromHeight'], query['toHeight']))
+		self.assertEqual((['50'], ['2']), (query['pageSize'], query['pageNumber']))
+
+		self.assertEqual(1, len(snapshots))
+		self.assertEqual((100, 2.5, 'STATEMENT1'), (snapshots[0].height, snapshots[0].amount, snapshots[0].collation_id))
+
+	def test_transfers_are_filtered_by_transaction_type_and_open_height_range(self):
+		# Arrange:
+		history_filter = HistoryFilter([TRANSACTION_TYPES['transfer'], TRANSACTION_TYPES['aggregate_complete']], from_height=991)
+
+		# Act:
+		self.client.get_transfers(ADDRESS, start_id='ABC', history_filter=history_filter)
+
+		# Assert:
+		query = self._get_query('/transactions/confirmed?')
+		self.assertEqual([str(TRANSACTION_TYPES['transfer']), str(TRANSACTION_TYPES['aggregate_complete'])], query['type'])
+		self.assertEqual(['991'], query['fromHeight'])
+		self.assertNotIn('toHeight', query)
+		self.assertEqual((['true'], ['ABC']), (query['embedded'], query['offset']))
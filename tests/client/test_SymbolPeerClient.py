@@ -0,0 +1,85 @@
+import struct
+import tempfile
+import unittest
+
+from client.SymbolClient import NODE_INFO_PACKET_TYPE, PEERS_PACKET_TYPE, SymbolPeerClient
+
+from .utils import PeerServer, create_certificate_directory, make_node_info_payload
+
+PEER_NAMES = ['alpha', 'beta', 'gamma']
+
+
+class SymbolPeerClientTest(unittest.TestCase):
+	def setUp(self):
+		self.temp_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+		self.certificate_directory = create_certificate_directory(self.temp_directory.name)
+		self.server = None
+
+	def tearDown(self):
+		if self.server:
+			self.server.close()
+
+		self.temp_directory.cleanup()
+
+	def _create_client(self, respond):
+		self.server = PeerServer(self.certificate_directory, respond)
+		return SymbolPeerClient('127.0.0.1', self.server.port, certificate_directory=self.certificate_directory, timeout=5)
+
+	def test_can_get_node_info(self):
+		# Arrange:
+		client = self._create_client(lambda _: make_node_info_payload('alpha.example.com', 'alpha', 7901, 5))
+
+		# Act:
+		node_info = client.get_node_info()
+
+		# Assert:
+		self.assertEqual([NODE_INFO_PACKET_TYPE], self.server.requests)
+		self.assertEqual(0x01000300, node_info['version'])
+		self.assertEqual(bytes(range(32)), node_info['publicKey'].bytes)
+		self.assertEqual(bytes(range(32, 64)).hex().upper(), node_info['networkGenerationHashSeed'])
+		self.assertEqual(5, node_info['roles'])
+		self.assertEqual(7901, node_info['port'])
+		self.assertEqual(0x68, node_info['networkIdentifier'])
+		self.assertEqual('alpha.example.com', node_info['host'])
+		self.assertEqual('alpha', node_info['friendlyName'])
+
+	def test_can_get_peers(self):
+		# Arrange:
+		client = self._create_client(lambda _: b''.join(
+			make_node_info_payload(f'{name}.example.com', name, 7900 + index) for (index, name) in enumerate(PEER_NAMES)))
+
+		# Act:
+		peers = client.get_peers()
+
+		# Assert:
+		self.assertEqual([PEERS_PACKET_TYPE], self.server.requests)
+		self.assertEqual(PEER_NAMES, [peer['friendlyName'] for peer in peers])
+		self.assertEqual([f'{name}.example.com' for name in PEER_NAMES], [peer['host'] for peer in peers])
+		self.assertEqual([7900, 7901, 7902], [peer['port'] for peer in peers])
+
+	def test_can_get_empty_peers(self):
+		# Arrange:
+		client = self._create_client(lambda _: b'')
+
+		# Act:
+		peers = client.get_peers()
+
+		# Assert:
+		self.assertEqual([], peers)
+
+	def _assert_peers_with_invalid_size_are_rejected(self, size_delta):
+		# Arrange:
+		payload = bytearray(make_node_info_payload('alpha.example.com', 'alpha') + make_node_info_payload('beta.example.com', 'beta'))
+		(size,) = struct.unpack_from('<I', payload)
+		struct.pack_into('<I', payload, size, size + size_delta)
+		client = self._create_client(lambda _: bytes(payload))
+
+		# Act + Assert:
+		with self.assertRaises(struct.error):
+			client.get_peers()
+
+	def test_cannot_get_peers_with_node_info_smaller_than_header(self):
+		self._assert_peers_with_invalid_size_are_rejected(-len('beta.example.com') - len('beta') - 1)
+
+	def test_cannot_get_peers_with_node_info_larger_than_payload(self):
+		self._assert_peers_with_invalid_size_are_rejected(1)
@@ -0,0 +1,103 @@
+import socket
+import tempfile
+import time
+import unittest
+
+from client.PeerSslContext import PeerSslContext
+from client.SymbolClient import CHAIN_STATISTICS_PACKET_TYPE, CHAIN_STATISTICS_RESPONSE, NODE_INFO_PACKET_TYPE
+from client.SymbolPeerProber import SymbolPeerProber
+
+from .utils import PeerServer, create_certificate_directory, make_node_info_payload
+
+
+def _create_respond(name, height):
+	def respond(packet_type):
+		if NODE_INFO_PACKET_TYPE == packet_type:
+			return make_node_info_payload(f'{name}.example.com', name)
+
+		return CHAIN_STATISTICS_RESPONSE.pack(height, height - 10, 0, height)
+
+	return respond
+
+
+def _find_closed_port():
+	with socket.create_server(('127.0.0.1', 0)) as sock:
+		return sock.getsockname()[1]
+
+
+class SymbolPeerProberTest(unittest.TestCase):
+	def setUp(self):
+		self.temp_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+		self.certificate_directory = create_certificate_directory(self.temp_directory.name)
+		self.ssl_context = PeerSslContext(self.certificate_directory)
+		self.servers = []
+
+	def tearDown(self):
+		for server in self.servers:
+			server.close()
+
+		self.temp_directory.cleanup()
+
+	def _start_server(self, respond):
+		server = PeerServer(self.certificate_directory, respond)
+		self.servers.append(server)
+		return server
+
+	def test_all_packet_types_are_received_over_single_connection(self):
+		# Arrange:
+		server = self._start_server(_create_respond('alpha', 100))
+		prober = SymbolPeerProber(self.ssl_context, timeout=5)
+
+		# Act:
+		[result] = prober.probe([('127.0.0.1', server.port)])
+
+		# Assert:
+		self.assertIsNone(result.error)
+		self.assertEqual('alpha', result.responses[NODE_INFO_PACKET_TYPE]['friendlyName'])
+		self.assertEqual('alpha.example.com', result.responses[NODE_INFO_PACKET_TYPE]['host'])
+		self.assertEqual(100, result.responses[CHAIN_STATISTICS_PACKET_TYPE]['height'])
+		self.assertEqual(90, result.responses[CHAIN_STATISTICS_PACKET_TYPE]['finalizedHeight'])
+		self.assertEqual(sorted([NODE_INFO_PACKET_TYPE, CHAIN_STATISTICS_PACKET_TYPE]), sorted(server.requests))
+		self.assertEqual((1, 0), tuple(self.ssl_context.statistics))
+
+	def test_results_are_returned_in_endpoint_order_with_per_endpoint_errors(self):
+		# Arrange: one live node before and after a closed port, a node that never handshakes and a node that drops requests
+		alpha_server = self._start_server(_create_respond('alpha', 100))
+		beta_server = self._start_server(_create_respond('beta', 200))
+		dropping_server = self._start_server(lambda _: None)
+		with socket.create_server(('127.0.0.1', 0)) as silent_socket:
+			endpoints = [
+				('127.0.0.1', alpha_server.port),
+				('127.0.0.1', _find_closed_port()),
+				('127.0.0.1', silent_socket.getsockname()[1]),
+				('127.0.0.1', dropping_server.port),
+				('127.0.0.1', beta_server.port)
+			]
+			prober = SymbolPeerProber(self.ssl_context, timeout=1, max_connection_count=2)
+
+			# Act:
+			start_time = time.monotonic()
+			results = prober.probe(endpoints, [CHAIN_STATISTICS_PACKET_TYPE])
+			elapsed_time = time.monotonic() - start_time
+
+		# Assert:
+		self.assertEqual(5, len(results))
+		self.assertEqual(
+			[100, None, None, None, 200],
+			[result.responses[CHAIN_STATISTICS_PACKET_TYPE]['height'] if not result.error else None for result in results])
+		self.assertIsInstance(results[1].error, ConnectionRefusedError)
+		self.assertIsInstance(results[2].error, TimeoutError)
+		self.assertIsInstance(results[3].error, ConnectionRefusedError)
+		self.assertTrue(all(not result.responses for result in results[1:4]))
+		self.assertLess(elapsed_time, 3)
+
+	def test_unresolvable_host_is_reported_without_connecting(self):
+		# Arrange:
+		prober = SymbolPeerProber(self.ssl_context, timeout=1)
+
+		# Act:
+		[result] = prober.probe([('invalid.invalid', 7900)])
+
+		# Assert:
+		self.assertEqual({}, result.responses)
+		self.assertIsInstance(result.error, OSError)
@@ -0,0 +1,116 @@
+import csv
+import datetime
+import io
+import unittest
+
+from client.NemClient import AccountInfo as NemAccountInfo
+from client.pod import AugmentedTransactionSnapshot, PriceSnapshot, TransactionSnapshot
+from client.SymbolClient import AccountInfo as SymbolAccountInfo
+
+TRANSACTION_ROW = {
+	'address': 'TADDRESS',
+	'address_name': 'alice',
+	'tag': 'transfer',
+	'timestamp': '2023-01-02 03:04:05',
+	'amount': '-12.5',
+	'fee_paid': '-0.25',
+	'height': '1234',
+	'collation_id': '55',
+	'comments': '',
+	'hash': 'ABCD'
+}
+
+
+def _write_csv(field_names, snapshots):
+	outfile = io.StringIO()
+	csv_writer = csv.writer(outfile)
+	csv_writer.writerow(field_names)
+	for snapshot in snapshots:
+		csv_writer.writerow(snapshot.to_csv_row(field_names))
+
+	return outfile.getvalue()
+
+
+def _read_csv(text, snapshot_class):
+	return [snapshot_class.from_csv_row(row) for row in csv.DictReader(io.StringIO(text))]
+
+
+class PodTest(unittest.TestCase):
+	def test_snapshots_have_no_instance_dict(self):
+		for instance in (
+			PriceSnapshot(None),
+			TransactionSnapshot(None, None),
+			AugmentedTransactionSnapshot(),
+			NemAccountInfo(None),
+			SymbolAccountInfo(None)
+		):
+			self.assertFalse(hasattr(instance, '__dict__'), type(instance).__name__)
+
+	def test_transaction_snapshot_csv_round_trip_is_identical(self):
+		# Arrange:
+		text = _write_csv(TransactionSnapshot.FIELD_NAMES, [TransactionSnapshot.from_csv_row(TRANSACTION_ROW)])
+
+		# Act:
+		round_trip_text = _write_csv(TransactionSnapshot.FIELD_NAMES, _read_csv(text, TransactionSnapshot))
+
+		# Assert:
+		self.assertEqual(text, round_trip_text)
+		self.assertEqual([list(TRANSACTION_ROW.keys()), list(TRANSACTION_ROW.values())], list(csv.reader(io.StringIO(text))))
+
+	def test_augmented_snapshot_csv_round_trip_is_identical(self):
+		# Arrange:
+		row = {**TRANSACTION_ROW, 'price': '2.0', 'fiat_amount': '-25.0', 'fiat_fee_paid': '-0.5'}
+		text = _write_csv(AugmentedTransactionSnapshot.FIELD_NAMES, [AugmentedTransactionSnapshot.from_csv_row(row)])
+
+		# Act:
+		round_trip_text = _write_csv(AugmentedTransactionSnapshot.FIELD_NAMES, _read_csv(text, AugmentedTransactionSnapshot))
+
+		# Assert:
+		self.assertEqual(text, round_trip_text)
+		self.assertEqual(TransactionSnapshot.FIELD_NAMES + ('price', 'fiat_amount', 'fiat_fee_paid'), AugmentedTransactionSnapshot.FIELD_NAMES)
+
+	def test_csv_row_can_select_and_order_fields(self):
+		# Arrange:
+		snapshot = TransactionSnapshot.from_csv_row(TRANSACTION_ROW)
+
+		# Act:
+		csv_row = snapshot.to_csv_row(['height', 'tag', 'amount'])
+
+		# Assert:
+		self.assertEqual(['1234', 'transfer', '-12.5'], csv_row)
+
+	def test_missing_columns_are_defaulted_and_unknown_columns_are_ignored(self):
+		# Act:
+		snapshot = AugmentedTransactionSnapshot.from_csv_row({'address': 'TADDRESS', 'unknown': 'value'})
+
+		# Assert:
+		self.assertEqual(AugmentedTransactionSnapshot().to_csv_row()[3:], snapshot.to_csv_row()[3:])
+		self.assertEqual(['TADDRESS', None, None], snapshot.to_csv_row()[:3])
+
+	def test_csv_row_types_can_be_fixed(self):
+		# Arrange:
+		snapshot = AugmentedTransactionSnapshot.from_csv_row({**TRANSACTION_ROW, 'price': '2'})
+
+		# Act:
+		snapshot.fix_types()
+		snapshot.set_price(snapshot.price)
+
+		# Assert:
+		self.assertEqual(datetime.datetime(2023, 1, 2, 3, 4, 5), snapshot.timestamp)
+		self.assertEqual((-12.5, -0.25, 1234), (snapshot.amount, snapshot.fee_paid, snapshot.height))
+		self.assertEqual((2.0, -25.0, -0.5), (snapshot.price, snapshot.fiat_amount, snapshot.fiat_fee_paid))
+
+	def test_price_snapshot_csv_round_trip_is_identical(self):
+		# Arrange:
+		row = {'date': '2023-01-02', 'price': '0.05', 'volume': '1000', 'market_cap': '2000000', 'comments': 'estimated'}
+		text = _write_csv(PriceSnapshot.FIELD_NAMES, [PriceSnapshot.from_csv_row(row)])
+
+		# Act:
+		snapshots = _read_csv(text, PriceSnapshot)
+		round_trip_text = _write_csv(PriceSnapshot.FIELD_NAMES, snapshots)
+		snapshots[0].fix_types()
+
+		# Assert:
+		self.assertEqual(text, round_trip_text)
+		self.assertEqual(datetime.date(2023, 1, 2), snapshots[0].date)
+		self.assertEqual((0.05, 1000.0, 2000000.0), (snapshots[0].price, snapshots[0].volume, snapshots[0].market_cap))
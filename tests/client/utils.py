@@ -0,0 +1,166 @@
+import datetime
+import json
+import socket
+import ssl
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from client.SymbolClient import NODE_INFO_RESPONSE
+
+
+class JsonRequestHandler(BaseHTTPRequestHandler):
+	protocol_version = 'HTTP/1.1'
+
+	def do_GET(self):
+		# pylint: disable=invalid-name
+		self._respond(None)
+
+	def do_POST(self):
+		# pylint: disable=invalid-name
+		content_length = int(self.headers.get('Content-Length', 0))
+		self._respond(json.loads(self.rfile.read(content_length)) if content_length else None)
+
+	def _respond(self, json_body):
+		(status, json_response) = self.server.respond(self.command, self.path, json_body)
+		content = json.dumps(json_response).encode('utf8')
+		self.send_response(status)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(content)))
+		self.end_headers()
+		self.wfile.write(content)
+
+	def log_message(self, format, *args):
+		# pylint: disable=redefined-builtin
+		pass
+
+
+class JsonServer(ThreadingHTTPServer):
+	"""Local HTTP server responding to each request with the (status, json) returned by respond(method, path, json_body)."""
+
+	daemon_threads = True
+
+	def __init__(self, respond, server_address=('127.0.0.1', 0)):
+		super().__init__(server_address, JsonRequestHandler)
+		self.requests = []
+		self.respond_to_request = respond
+
+	def respond(self, method, path, json_body):
+		self.requests.append((method, path))
+		return self.respond_to_request(method, path, json_body)
+
+	@property
+	def port(self):
+		return self.server_address[1]
+
+	def start(self):
+		threading.Thread(target=self.serve_forever, daemon=True).start()
+
+	def close(self):
+		self.shutdown()
+		self.server_close()
+
+
+def start_json_server(respond):
+	"""Starts a local json server in a background thread; requests received are appended to its requests list."""
+
+	server = JsonServer(respond)
+	server.start()
+	return server
+
+
+def create_certificate_directory(directory):
+	"""Creates a self-signed node certificate and key in directory, named like the certificates of catapult nodes."""
+
+	private_key = ec.generate_private_key(ec.SECP256R1())
+	name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'test node')])
+	now = datetime.datetime.now(datetime.timezone.utc)
+	certificate_builder = x509.CertificateBuilder(
+		issuer_name=name,
+		subject_name=name,
+		public_key=private_key.public_key(),
+		serial_number=x509.random_serial_number(),
+		not_valid_before=now - datetime.timedelta(days=1),
+		not_valid_after=now + datetime.timedelta(days=1))
+	certificate = certificate_builder.sign(private_key, hashes.SHA256())
+
+	directory = Path(directory)
+	(directory / 'node.full.crt.pem').write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+	(directory / 'node.key.pem').write_bytes(private_key.private_bytes(
+		serialization.Encoding.PEM,
+		serialization.PrivateFormat.PKCS8,
+		serialization.NoEncryption()))
+	return directory
+
+
+class PeerServer:
+	"""
+	Local TLS server speaking the Symbol peer protocol, answering each request packet with the payload returned by respond(packet_type).
+	Connections are closed without a response when respond returns None.
+	"""
+
+	def __init__(self, certificate_directory, respond):
+		self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+		self.ssl_context.load_cert_chain(certificate_directory / 'node.full.crt.pem', certificate_directory / 'node.key.pem')
+		self.respond = respond
+
+		self.socket = socket.create_server(('127.0.0.1', 0))
+		self.requests = []
+		threading.Thread(target=self._accept_connections, daemon=True).start()
+
+	@property
+	def port(self):
+		return self.socket.getsockname()[1]
+
+	def _accept_connections(self):
+		while True:
+			try:
+				(connection, _) = self.socket.accept()
+			except OSError:
+				return
+
+			threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+	def _serve(self, connection):
+		try:
+			with self.ssl_context.wrap_socket(connection, server_side=True) as ssock:
+				while True:
+					header = ssock.recv(8)
+					if len(header) < 8:
+						return
+
+					packet_type = int.from_bytes(header[4:], 'little')
+					self.requests.append(packet_type)
+					payload = self.respond(packet_type)
+					if payload is None:
+						return
+
+					ssock.sendall((8 + len(payload)).to_bytes(4, 'little') + packet_type.to_bytes(4, 'little') + payload)
+		except OSError:
+			pass
+
+	def close(self):
+		self.socket.close()
+
+
+def make_node_info_payload(host, name, port=7900, roles=3):
+	"""Packs a Symbol node info packet payload with fixed keys and version."""
+
+	host_bytes = host.encode('utf8')
+	name_bytes = name.encode('utf8')
+	size = NODE_INFO_RESPONSE.size + len(host_bytes) + len(name_bytes)
+	return NODE_INFO_RESPONSE.pack(
+		size,
+		0x01000300,
+		bytes(range(32)),
+		bytes(range(32, 64)),
+		roles,
+		port,
+		0x68,
+		len(host_bytes),
+		len(name_bytes)) + host_bytes + name_bytes